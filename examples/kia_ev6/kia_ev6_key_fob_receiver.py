@@ -1,15 +1,8 @@
-import os
-import sys
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
-
-
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from cc1101 import Cc1101
-from rpi_driver import Driver
-import presets
+from epCC1101 import Cc1101, Driver, presets, KiaEv6_Protocol
 
 driver = Driver(spi_bus=0, cs_pin=0, gdo0=23)
 
@@ -30,49 +23,18 @@ cc1101.configurator.set_packet_length(136)
 cc1101.set_configuration()
 
 # Print the configuration
-cc1101.configurator.print_description()
-
-payload_length = 24
-
-def get_payload(packet):
-    return packet.payload[0:payload_length]
-
-def check_payload_quality(packet):
-    # check if the payload is always the same
-    quality = 0
-    payload = get_payload(packet)
-    for i in range(1,6):
-        if payload == packet.payload[i*(4+payload_length):i*(4+payload_length)+payload_length]:
-            quality += 1
-    return quality
-
-def manchester_decode(payload):
-    # create a binary string from the payload
-    raw_binary = "".join([f"{x:08b}" for x in payload])
-    raw_binary = raw_binary[1:]
-
-    # decode manchester (01 -> 0, 10 -> 1)
-    raw_binary_manchester = ""
-    for i in range(0, len(raw_binary), 2):
-        if raw_binary[i:i+2] == "01":
-            raw_binary_manchester += "0"
-        elif raw_binary[i:i+2] == "10":
-            raw_binary_manchester += "1"
-        else:
-            pass
-
-    decoded = bytes([int(raw_binary_manchester[i:i+8], 2) for i in range(0, len(raw_binary_manchester), 8)])
-    return decoded
+cc1101.configurator.print_descriptioprotocol = KiaEv6_Protocol()
 
 for i in range(5):
     logger.info("Waiting for Packet...")
     packet = cc1101.receive(timeout_ms=10000)
+    if packet is None:
+        continue
     logger.info("raw data: " + " ".join([f"{x:02x}" for x in packet.payload]))
-    payload = get_payload(packet)
-    logger.info("payload: " + " ".join([f"{x:02x}" for x in payload]))
-    logger.info(f"quality: {check_payload_quality(packet)}/4") # how many times the payload is the same
-    decoded = manchester_decode(payload)
-    if decoded is not None:
-        logger.info("decoded: " + " ".join([f"{x:02x}" for x in decoded]))
-    else:
-        logger.error("decoding failed")
+    logical_values = protocol.decode(packet)
+    if logical_values is None:
+        logger.error("invalid Manchester symbols in the payload")
+        continue
+    logger.info("payload: " + " ".join([f"{x:02x}" for x in logical_values["payload"]]))
+    logger.info(f"quality: {logical_values['quality']}/4") # how many times the payload is the same
+    logger.info("decoded: " + " ".join([f"{x:02x}" for x in logical_values["data"]]))
@@ -2,7 +2,8 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from epCC1101 import Cc1101, Driver, presets, Princeton25bit_Protocol
+from concurrent.futures import ThreadPoolExecutor
+from epCC1101 import Cc1101, Driver, presets, Princeton25bit_Protocol, DecodePipeline
 
 # Create a driver object
 driver = Driver(spi_bus=0, cs_pin=0, gdo0=5, gdo2=6)
@@ -22,15 +23,14 @@ cc1101.configurator.print_description()
 
 packets = []
 
-for i in range(50):
-    logger.info("Waiting for Packet...")
-    packet = cc1101.receive(timeout_ms=10000, max_same_bits=4)
-    logical_values = protocol.parse(packet.get_bitstream())
-    print(len(protocol._logical_bits), protocol._logical_bits)
-    if logical_values:
+# decoding runs in the pool, the radio keeps receiving meanwhile
+with ThreadPoolExecutor() as executor, DecodePipeline(["princeton25bit"], executor=executor) as pipeline:
+    logger.info("Waiting for Packets...")
+    for result in pipeline.results(cc1101.receive_bursts(timeout_ms=10000, max_same_bits=4)):
+        logical_values = result.values
         logger.info(f"Address: {logical_values['address']:06x}, Data: {logical_values['data']:02x}")
         packets.append(logical_values)
-    logger.info(packet)
+        if len(packets) >= 50:
+            break
 
 print(len(packets))
-
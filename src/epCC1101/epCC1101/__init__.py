@@ -1,12 +1,17 @@
 import sys
 
 from .cc1101 import Cc1101
+from .async_cc1101 import AsyncCc1101
 from .packet import *
+from .bits import PackedBits
+from .decoders import DecodePipeline, DecodeResult, register_decoder, get_decoder
+from .tracing import Tracer
+from .bus import BusArbiter
 
 if sys.implementation.name == "micropython":
     raise NotImplementedError("This library is not compatible with MicroPython")
 elif sys.implementation.name == "cpython":
     if sys.platform == "linux":
-        from .rpi_driver import Driver
+        from .rpi_driver import Driver, RustDriver
     if sys.platform.startswith("win"):
         from .stubs.driver import Driver
\ No newline at end of file
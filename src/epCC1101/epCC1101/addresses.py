@@ -67,6 +67,7 @@ RCCTRL0_STATUS = 0x3D  # Last RC oscillator calibration result
 # FIFO access
 RXFIFO = 0x3F  # Read access to the RX FIFO
 TXFIFO = 0x3F  # Write access to the TX FIFO
+FIFO_SIZE = 64  # Size of the RX and TX FIFO in bytes
 
 # PATABLE values
 PATABLE = 0x3E
@@ -116,3 +117,18 @@ MARCSTATE_TX = 0x13
 MARCSTATE_TX_END = 0x14
 MARCSTATE_RXTX_SWITCH = 0x15
 MARCSTATE_TXFIFO_UNDERFLOW = 0x16
+
+# Chip status byte, returned with every header byte (see 10.1 Chip Status Byte)
+STATUS_CHIP_RDYN_MASK = 0x80
+STATUS_STATE_MASK = 0x70
+STATUS_FIFO_BYTES_MASK = 0x0F
+
+# Main states in the chip status byte
+STATUS_STATE_IDLE = 0x00
+STATUS_STATE_RX = 0x01
+STATUS_STATE_TX = 0x02
+STATUS_STATE_FSTXON = 0x03
+STATUS_STATE_CALIBRATE = 0x04
+STATUS_STATE_SETTLING = 0x05
+STATUS_STATE_RXFIFO_OVERFLOW = 0x06
+STATUS_STATE_TXFIFO_UNDERFLOW = 0x07
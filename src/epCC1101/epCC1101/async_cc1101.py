@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import sys
+import time
+import epCC1101.addresses as addresses
+from epCC1101.cc1101 import Cc1101
+from epCC1101.tracing import TRACE_STATE
+from epCC1101.packet import RxPacket, NormalRxPacket, TxPacket
+
+if sys.implementation.name == "cpython":
+    if sys.platform == "linux":
+        import RPi.GPIO as GPIO
+    if sys.platform.startswith("win"):
+        from epCC1101.stubs import GPIO
+
+try:
+    import gpiod
+    from gpiod.line import Direction, Edge, Value
+except ImportError:
+    gpiod = None
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class GpiodEdges:
+    """Edge events of the GDO pins from the GPIO character device (libgpiod v2).
+
+    The file descriptor of the line request is watched by the event loop, so waiting
+    for an edge doesn't block a thread. Edges nobody waits for are dropped, like with
+    RPi.GPIO.wait_for_edge.
+    """
+    def __init__(self, gpio_chip:str, pins:list, loop:asyncio.AbstractEventLoop):
+        if gpiod is None:
+            raise ImportError("gpiod (libgpiod v2 Python bindings) is required for edge events from the GPIO character device")
+        self._loop = loop
+        self._request = gpiod.request_lines(
+            gpio_chip,
+            consumer="epCC1101",
+            config={tuple(pins): gpiod.LineSettings(direction=Direction.INPUT, edge_detection=Edge.BOTH)})
+        self._waiters = []
+        self._loop.add_reader(self._request.fd, self._on_readable)
+
+    def _on_readable(self):
+        for event in self._request.read_edge_events():
+            level = 1 if event.event_type == event.Type.RISING_EDGE else 0
+            for waiter in list(self._waiters):
+                pin, edge, future = waiter
+                if pin != event.line_offset or future.done():
+                    continue
+                if edge == GPIO.BOTH or (edge == GPIO.RISING and level == 1) or (edge == GPIO.FALLING and level == 0):
+                    future.set_result(pin)
+                    self._waiters.remove(waiter)
+
+    async def wait_for_edge(self, pin:int, edge:int, timeout:int=1000):
+        """Waits for an edge on a pin.
+
+        Args:
+            pin (int): The GPIO line offset.
+            edge (int): GPIO.RISING, GPIO.FALLING or GPIO.BOTH.
+            timeout (int): Timeout in milliseconds.
+
+        Returns:
+            int: The pin, or None on timeout.
+        """
+        waiter = (pin, edge, self._loop.create_future())
+        self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(waiter[2], timeout / 1000)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def read(self, pin:int) -> int:
+        return 1 if self._request.get_value(pin) == Value.ACTIVE else 0
+
+    def close(self):
+        self._loop.remove_reader(self._request.fd)
+        self._request.release()
+
+
+class AsyncCc1101:
+    """asyncio interface to a Cc1101.
+
+    Waiting for the radio doesn't block the event loop: GDO edges come either from
+    the GPIO character device (if gpio_chip is given, needs gpiod) or from the
+    driver's wait_for_edge in the default executor. The delays after state changes
+    are asyncio.sleep. Register accesses are short and stay in the event loop thread.
+
+    The serial modes use the blocking capture functions of the driver, they run in
+    the default executor.
+
+    Only one operation runs at a time per radio.
+
+    Example:
+        >>> radio = AsyncCc1101(Cc1101(driver), gpio_chip="/dev/gpiochip0")
+        >>> await radio.transmit(NormalTxPacket([1, 2, 3]))
+        >>> async for packet in radio.packets():
+        ...     print(packet)
+    """
+    def __init__(self, cc1101:Cc1101, gpio_chip:str=None):
+        """Initializes a new instance of the AsyncCc1101 class.
+
+        Must be called with a running event loop if gpio_chip is given.
+
+        Args:
+            cc1101 (Cc1101): The configured radio.
+            gpio_chip (str): GPIO character device with the GDO pins, e.g.
+                "/dev/gpiochip0". If None, edges are waited for in the executor.
+        """
+        self.cc1101 = cc1101
+        self.driver = cc1101.driver
+        self._lock = asyncio.Lock()
+        self._edges = None
+        if gpio_chip is not None:
+            pins = [pin for pin in [self.driver.gdo0, self.driver.gdo2] if pin is not None]
+            self._edges = GpiodEdges(gpio_chip, pins, asyncio.get_running_loop())
+
+    def close(self):
+        """Releases the GPIO lines.
+        """
+        if self._edges is not None:
+            self._edges.close()
+            self._edges = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    async def _wait_for_edge(self, pin:int, edge:int, timeout:int):
+        if self._edges is not None:
+            return await self._edges.wait_for_edge(pin, edge, timeout)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.driver.wait_for_edge, pin, edge, timeout)
+
+    def _read_gdo0(self) -> int:
+        if self._edges is not None:
+            return self._edges.read(self.driver.gdo0)
+        return self.driver.read_gdo0()
+
+    def _read_gdo2(self) -> int:
+        if self._edges is not None:
+            return self._edges.read(self.driver.gdo2)
+        return self.driver.read_gdo2()
+
+    async def set_receive_mode(self):
+        """Sends the SRX strobe and waits 10ms, see Cc1101.set_receive_mode.
+        """
+        self.driver.command_strobe(addresses.SRX)
+        await asyncio.sleep(0.01)
+
+    async def set_transmit_mode(self):
+        """Sends the STX strobe and waits 10ms, see Cc1101.set_transmit_mode.
+        """
+        self.driver.command_strobe(addresses.STX)
+        await asyncio.sleep(0.01)
+
+    async def transmit(self, packet:TxPacket):
+        """Transmits a packet, see Cc1101.transmit.
+
+        Args:
+            packet (TxPacket): The packet to transmit.
+        """
+        async with self._lock:
+            if self.cc1101.configurator.get_packet_format() != 0:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, self.cc1101.transmit, packet)
+
+            if self.driver.tracer is not None:
+                self.driver.tracer.record(TRACE_STATE, info=f"transmit {packet}")
+            self.cc1101._start_transmit()
+            try:
+                await asyncio.sleep(0.01)
+                data = self.cc1101._get_tx_data(packet)
+                # the TX FIFO was flushed before entering TX
+                for _ in self.cc1101._tx_fifo_writer(data, free=addresses.FIFO_SIZE):
+                    await asyncio.sleep(self.driver.fifo_rw_interval)
+                await self._wait_for_end_of_transmission()
+            finally:
+                self.cc1101.set_idle_mode()
+
+    async def _wait_for_end_of_transmission(self):
+        if self.driver.gdo0 is not None:
+            if self._edges is None:
+                self.driver.set_pin_mode(self.driver.gdo0, GPIO.IN)
+            await self._wait_for_edge(self.driver.gdo0, GPIO.FALLING, 1000)
+            if self._edges is None:
+                self.driver.reset_pin_mode(self.driver.gdo0)
+        else:
+            deadline = time.time() + 1
+            while self.driver.read_chip_status().state == addresses.STATUS_STATE_TX and time.time() < deadline:
+                await asyncio.sleep(self.driver.fifo_rw_interval)
+
+    async def receive(self, timeout_ms:int=1000, max_same_bits:int=16) -> RxPacket:
+        """Receives a packet, see Cc1101.receive.
+
+        Args:
+            timeout_ms (int): Timeout waiting for the start of the packet.
+            max_same_bits (int): See Cc1101.receive, synchronous serial mode only.
+
+        Returns:
+            RxPacket: The received packet, or None on timeout.
+        """
+        async with self._lock:
+            if self.cc1101.configurator.get_packet_format() != 0:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, self.cc1101.receive, timeout_ms, max_same_bits)
+
+            if self.driver.tracer is not None:
+                self.driver.tracer.record(TRACE_STATE, info="receive")
+            self.cc1101._start_receive()
+            try:
+                return await self._receive_packet_mode(timeout_ms)
+            finally:
+                self.cc1101.set_idle_mode()
+
+    async def _receive_packet_mode(self, timeout_ms:int) -> NormalRxPacket:
+        cc1101 = self.cc1101
+        assert cc1101.configurator.get_GDOx_config(0) == 0x06, "GDO0 must be configured for sync word detection (0x06) in fixed/variable length mode"
+        assert self.driver.gdo0 is not None, "GDO0 must be connected to an interrupt pin for fixed/variable length mode"
+
+        # same reader as Cc1101.receive, the waits for GDO edges don't block the loop
+        pins = [self.driver.gdo0] + ([self.driver.gdo2] if cc1101._use_rx_threshold() else [])
+        if self._edges is None:
+            for pin in pins:
+                self.driver.set_pin_mode(pin, GPIO.IN)
+        try:
+            reader = cc1101._rx_packet_reader(timeout_ms, self._read_gdo0, self._read_gdo2)
+            request = next(reader)
+            while True:
+                request = reader.send(await self._wait_for_edge(*request))
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            if self._edges is None:
+                for pin in reversed(pins):
+                    self.driver.reset_pin_mode(pin)
+
+    async def packets(self, timeout_ms:int=1000, max_same_bits:int=16):
+        """Receives packets until the consumer stops iterating.
+
+        Timeouts are not reported, reception is restarted right away.
+
+        Args:
+            timeout_ms (int): Timeout of a single reception.
+            max_same_bits (int): See Cc1101.receive, synchronous serial mode only.
+
+        Yields:
+            RxPacket: The received packets.
+        """
+        while True:
+            packet = await self.receive(timeout_ms, max_same_bits)
+            if packet is not None:
+                yield packet
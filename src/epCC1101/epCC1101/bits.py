@@ -0,0 +1,135 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# bits of each byte value, first bit in the most significant bit
+_BYTE_BITS = [tuple((value >> (7 - i)) & 1 for i in range(8)) for value in range(256)]
+
+
+class PackedBits:
+    """Read-only sequence of bits, packed 8 per byte.
+
+    The first bit is the most significant bit of the first byte, like the bits are
+    received in synchronous serial mode. Slicing, comparing and searching work on the
+    bits as a whole (int and str operations), not on a Python int per bit.
+
+    Example:
+        >>> bits = PackedBits(b"\\xe8\\x80", 12)
+        >>> bits[0], bits[4:8], int(bits)
+        (1, PackedBits('1000'), 3720)
+        >>> bits.find([1, 0, 0, 0])
+        4
+    """
+    __slots__ = ("_data", "_length")
+
+    def __init__(self, data=b"", length:int=None):
+        """Initializes a new instance of the PackedBits class.
+
+        Args:
+            data (bytes | bytearray | memoryview): The packed bits.
+            length (int): Number of bits, default all bits of data.
+        """
+        data = bytes(data)
+        if length is None:
+            length = len(data) * 8
+        assert 0 <= length <= len(data) * 8, "length exceeds the packed data"
+        self._data = data[:(length + 7) // 8]
+        self._length = length
+
+    @classmethod
+    def from_int(cls, value:int, length:int) -> "PackedBits":
+        """Creates the bits from the length lowest bits of an int, most significant bit first.
+        """
+        value &= (1 << length) - 1
+        padding = -length % 8
+        return cls((value << padding).to_bytes((length + padding) // 8, "big"), length)
+
+    @classmethod
+    def from_bits(cls, bits) -> "PackedBits":
+        """Creates the bits from a sequence of 0 and 1, or a str of "0" and "1".
+        """
+        if isinstance(bits, PackedBits):
+            return bits
+        if not isinstance(bits, str):
+            bits = "".join("1" if bit else "0" for bit in bits)
+        if not bits:
+            return cls(b"", 0)
+        return cls.from_int(int(bits, 2), len(bits))
+
+    @property
+    def data(self) -> bytes:
+        """The packed bits, the unused bits of the last byte are 0.
+        """
+        return self._data
+
+    def __len__(self):
+        return self._length
+
+    def __int__(self):
+        return int.from_bytes(self._data, "big") >> (-self._length % 8)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return PackedBits.from_bits(list(self)[index])
+            length = max(0, stop - start)
+            return PackedBits.from_int(int(self) >> (self._length - start - length), length)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("PackedBits index out of range")
+        return (self._data[index >> 3] >> (7 - (index & 7))) & 1
+
+    def __iter__(self):
+        full, rest = divmod(self._length, 8)
+        for byte in self._data[:full]:
+            yield from _BYTE_BITS[byte]
+        if rest:
+            yield from _BYTE_BITS[self._data[full]][:rest]
+
+    def __eq__(self, other):
+        if isinstance(other, PackedBits):
+            return self._length == other._length and self._data == other._data
+        try:
+            return self._length == len(other) and list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __hash__(self):
+        return hash((self._length, self._data))
+
+    def __contains__(self, pattern):
+        return self.find(pattern) >= 0
+
+    def to_str(self) -> str:
+        """Returns the bits as a str of "0" and "1".
+        """
+        if self._length == 0:
+            return ""
+        return format(int(self), f"0{self._length}b")
+
+    def to_numpy(self):
+        """Returns the bits as a NumPy uint8 array, one bit per item. Needs numpy.
+        """
+        if numpy is None:
+            raise ImportError("numpy is required for PackedBits.to_numpy")
+        return numpy.unpackbits(numpy.frombuffer(self._data, dtype=numpy.uint8), count=self._length)
+
+    def find(self, pattern, start:int=0) -> int:
+        """Returns the index of the first occurrence of a bit pattern, or -1.
+
+        Args:
+            pattern (PackedBits | list | str | int): The bits to search for, an int is
+                a single bit.
+            start (int): Index to start the search at.
+        """
+        if isinstance(pattern, int):
+            pattern = "1" if pattern else "0"
+        elif not isinstance(pattern, str):
+            pattern = PackedBits.from_bits(pattern).to_str()
+        return self.to_str().find(pattern, start)
+
+    def __repr__(self):
+        return f"PackedBits('{self.to_str()}')"
@@ -0,0 +1,141 @@
+import threading
+import time
+
+
+class BusArbiter:
+    """Serializes the access to one SPI bus, shared by all drivers on that bus.
+
+    The arbiter is a reentrant lock with first come, first served ordering: each
+    thread draws a ticket and threads are served in ticket order, so a radio that
+    polls in a tight loop can't starve the others. The same thread can acquire the
+    arbiter several times, e.g. a single transfer inside a FIFO drain that holds the
+    bus as a whole.
+
+    Contention is measured while the arbiter is in use, see get_metrics().
+
+    Example:
+        >>> arbiter = BusArbiter.get(0)
+        >>> with arbiter:
+        ...     rx_bytes = driver.read_status_register(addresses.RXBYTES)
+        ...     data = driver.read_burst(addresses.RXFIFO, rx_bytes)
+        >>> arbiter.get_metrics()
+    """
+    _arbiters = {}
+    _arbiters_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, spi_bus:int) -> "BusArbiter":
+        """Returns the arbiter of an SPI bus, created on first use.
+
+        Args:
+            spi_bus (int): The SPI bus number.
+
+        Returns:
+            BusArbiter: The arbiter shared by all drivers on this bus.
+        """
+        with cls._arbiters_lock:
+            arbiter = cls._arbiters.get(spi_bus)
+            if arbiter is None:
+                arbiter = cls(spi_bus)
+                cls._arbiters[spi_bus] = arbiter
+            return arbiter
+
+    def __init__(self, spi_bus:int):
+        """Initializes a new instance of the BusArbiter class.
+
+        Use BusArbiter.get() to get the arbiter shared by all drivers on a bus.
+
+        Args:
+            spi_bus (int): The SPI bus number.
+        """
+        self.spi_bus = spi_bus
+        self._condition = threading.Condition(threading.Lock())
+        self._next_ticket = 0
+        self._now_serving = 0
+        self._owner = None
+        self._depth = 0
+        self._acquired_ns = 0
+        self.reset_metrics()
+
+    def acquire(self):
+        """Waits until it is this thread's turn and takes the bus.
+        """
+        thread = threading.get_ident()
+        with self._condition:
+            if self._owner == thread:
+                self._depth += 1
+                return
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            if ticket != self._now_serving:
+                start = time.monotonic_ns()
+                while ticket != self._now_serving:
+                    self._condition.wait()
+                wait_ns = time.monotonic_ns() - start
+                self._contentions += 1
+                self._wait_ns += wait_ns
+                self._max_wait_ns = max(self._max_wait_ns, wait_ns)
+            self._owner = thread
+            self._depth = 1
+            self._acquisitions += 1
+            self._acquired_ns = time.monotonic_ns()
+
+    def release(self):
+        """Releases the bus, the next thread in line gets it.
+
+        Raises:
+            RuntimeError: If the calling thread doesn't hold the bus.
+        """
+        with self._condition:
+            if self._owner != threading.get_ident():
+                raise RuntimeError(f"SPI bus {self.spi_bus} released by a thread that doesn't hold it")
+            self._depth -= 1
+            if self._depth > 0:
+                return
+            self._hold_ns += time.monotonic_ns() - self._acquired_ns
+            self._owner = None
+            self._now_serving += 1
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+    def get_metrics(self) -> dict:
+        """Returns the contention metrics since the last reset.
+
+        Returns:
+            dict: With the keys
+                - acquisitions: number of times the bus was taken (nested acquisitions not counted)
+                - contentions: number of times a thread had to wait for the bus
+                - wait_ns: total time threads waited for the bus
+                - max_wait_ns: longest single wait
+                - hold_ns: total time the bus was held
+                - waiting: number of threads waiting right now
+        """
+        with self._condition:
+            return {
+                "acquisitions": self._acquisitions,
+                "contentions": self._contentions,
+                "wait_ns": self._wait_ns,
+                "max_wait_ns": self._max_wait_ns,
+                "hold_ns": self._hold_ns,
+                "waiting": self._next_ticket - self._now_serving - (1 if self._owner is not None else 0),
+            }
+
+    def reset_metrics(self):
+        """Resets the contention metrics.
+        """
+        with self._condition:
+            self._acquisitions = 0
+            self._contentions = 0
+            self._wait_ns = 0
+            self._max_wait_ns = 0
+            self._hold_ns = 0
+
+    def __repr__(self):
+        return f"BusArbiter(spi_bus={self.spi_bus}, acquisitions={self._acquisitions}, contentions={self._contentions})"
@@ -2,6 +2,8 @@ import sys
 import epCC1101.addresses as addresses
 from epCC1101.configurator import Cc1101Configurator
 from epCC1101.driver import Abstract_Driver
+from epCC1101.tracing import TRACE_STATE
+from epCC1101.bits import PackedBits
 from epCC1101.packet import RxPacket, NormalRxPacket, SyncRxPacket, AsyncRxPacket, TxPacket, SyncTxPacket, AsyncTxPacket, NormalTxPacket
 import logging
 import time
@@ -24,6 +26,9 @@ class Cc1101:
     _sampling_active = False
     _packet_start = 0
     _packet_end = 0
+    _shadow_registers = None
+    _shadow_patable = None
+    _rx_buffer = None
 
     def __init__(self, driver:Abstract_Driver):
         """Initialize a CC1101 device.
@@ -53,6 +58,9 @@ class Cc1101:
         if version not in [0x04, 0x14]:
             logger.warning(f"Unexpected chip version: 0x{version:02X}")
 
+        # receive buffer for packet mode: length byte, up to 255 bytes payload, 2 status bytes
+        self._rx_buffer = bytearray(258)
+
         self.configurator = Cc1101Configurator()
         self.get_configuration()
     
@@ -67,6 +75,9 @@ class Cc1101:
         """
         logger.debug("Resetting CC1101 device")
         self.driver.command_strobe(addresses.SRES)
+        # SRES restores the chip defaults, so whatever we wrote before is gone
+        self._shadow_registers = None
+        self._shadow_patable = None
 
     def get_chip_partnum(self):
         """
@@ -126,9 +137,10 @@ class Cc1101:
             use get_rssi_dbm() instead.
         """
         logger.debug("Reading raw RSSI value")
-        if self.get_marc_state() not in [addresses.MARCSTATE_RX, addresses.MARCSTATE_RX_END]:
-            logger.error(f"Device must be in state RX(0x0D) or RX_END(0x0E) before reading RSSI. Current state: 0x{self.get_marc_state():02X}")
-            raise ValueError(f"Device must be in state RX(0x0D) or RX_END(0x0E) before reading RSSI. Current state: 0x{self.get_marc_state():02X}")
+        if self.driver.read_chip_status().state != addresses.STATUS_STATE_RX:
+            marc_state = self.get_marc_state()
+            logger.error(f"Device must be in state RX(0x0D) or RX_END(0x0E) before reading RSSI. Current state: 0x{marc_state:02X}")
+            raise ValueError(f"Device must be in state RX(0x0D) or RX_END(0x0E) before reading RSSI. Current state: 0x{marc_state:02X}")
         return self.driver.read_status_register(addresses.RSSI)
     
     def get_rssi_dbm(self):
@@ -176,31 +188,76 @@ class Cc1101:
         patable = self.driver.read_burst(addresses.PATABLE, 8)
         self.configurator._registers = registers
         self.configurator._patable = patable
+        self._shadow_registers = list(registers)
+        self._shadow_patable = list(patable)
         return registers, patable
     
-    def set_configuration(self):
+    def set_configuration(self, force:bool=False):
         """
         Writes the current configuration to the CC1101 device.
 
-        This method performs two operations:
-        1. Writes the configuration registers using burst mode
-        2. Writes the PA (Power Amplifier) table using burst mode
+        The driver keeps a shadow copy of the registers and the PA table as they were
+        last written to (or read from) the chip. Only registers that differ from the
+        shadow copy are written, grouped into contiguous ranges so that each range is
+        a single burst write. The PA table is written as a whole if any entry changed.
 
         The configuration values are taken from the internal configurator object 
         which holds the register values and PA table settings.
 
-        No parameters are required as it uses the internal configuration state.
+        Args:
+            force (bool): If True, all 47 registers and the PA table are written,
+                regardless of the shadow copy.
 
         Returns:
             None
 
         Example:
-            >>> cc1101.configurator.set_data_rate_baud(9600)
-            >>> cc1101.set_configuration()
+            >>> cc1101.configurator.set_channel_number(5)
+            >>> cc1101.set_configuration() # writes CHANNR only
+        """
+        registers = self.configurator._registers
+        patable = self.configurator._patable
+
+        if force or self._shadow_registers is None:
+            logger.debug("Writing configuration to device")
+            self.driver.write_burst(addresses.IOCFG2, list(registers))
+        else:
+            for start, end in self._get_dirty_register_ranges(self._shadow_registers, registers):
+                logger.debug(f"Writing registers 0x{start:02X}-0x{end-1:02X} to device")
+                self.driver.write_burst(start, list(registers[start:end]))
+        self._shadow_registers = list(registers)
+
+        if force or self._shadow_patable is None or list(patable) != self._shadow_patable:
+            logger.debug("Writing PATABLE to device")
+            self.driver.write_burst(addresses.PATABLE, list(patable))
+        self._shadow_patable = list(patable)
+
+    @staticmethod
+    def _get_dirty_register_ranges(shadow, registers, max_gap:int=1):
+        """Compares the registers with the shadow copy and returns the ranges to write.
+
+        Ranges separated by at most `max_gap` unchanged registers are merged, because
+        rewriting a single unchanged register costs one byte, same as the header byte
+        of an additional burst, but saves a transaction.
+
+        Args:
+            shadow (list): Register values last written to the chip.
+            registers (list): Register values to be written.
+            max_gap (int): Maximum number of unchanged registers between two ranges
+                that are merged into one burst.
+
+        Returns:
+            list: List of (start, end) tuples, end is exclusive.
         """
-        logger.debug("Writing configuration to device")
-        self.driver.write_burst(addresses.IOCFG2, self.configurator._registers)
-        self.driver.write_burst(addresses.PATABLE, self.configurator._patable)
+        ranges = []
+        for i in range(len(registers)):
+            if shadow[i] == registers[i]:
+                continue
+            if ranges and i - ranges[-1][1] <= max_gap:
+                ranges[-1][1] = i + 1
+            else:
+                ranges.append([i, i + 1])
+        return [(start, end) for start, end in ranges]
 
     def load_preset(self, preset):
         """
@@ -238,7 +295,8 @@ class Cc1101:
         Returns:
             None
         """
-        logger.info("Setting device to IDLE state")
+        if self.driver.tracer is not None:
+            self.driver.tracer.record(TRACE_STATE, addresses.SIDLE, info="idle")
         self.driver.command_strobe(addresses.SIDLE)
 
     def set_receive_mode(self):
@@ -252,7 +310,8 @@ class Cc1101:
         Returns:
             None
         """
-        logger.info("Setting device to receive mode")
+        if self.driver.tracer is not None:
+            self.driver.tracer.record(TRACE_STATE, addresses.SRX, info="receive mode")
         self.driver.command_strobe(addresses.SRX)
         time.sleep(0.01)
 
@@ -267,7 +326,8 @@ class Cc1101:
         Returns:
             None
         """
-        logger.info("Setting device to transmit mode")
+        if self.driver.tracer is not None:
+            self.driver.tracer.record(TRACE_STATE, addresses.STX, info="transmit mode")
         self.driver.command_strobe(addresses.STX)
         time.sleep(0.01)
 
@@ -282,7 +342,6 @@ class Cc1101:
         Returns:
             None
         """
-        logger.info("Flushing RX FIFO")
         self.driver.command_strobe(addresses.SFRX)
 
     def flush_tx_fifo(self):
@@ -296,14 +355,54 @@ class Cc1101:
         Returns:
             None
         """
-        logger.info("Flushing TX FIFO")
         self.driver.command_strobe(addresses.SFTX)
 
-    def _write_data_to_tx_fifo(self, data:bytes):
-        for i in range(0, len(data)//self.driver.chunk_size + 1):
-            while self._get_tx_bytes() > 55-self.driver.chunk_size:
-                time.sleep(self.driver.fifo_rw_interval)
-            self.driver.write_burst(addresses.TXFIFO, list(data[self.driver.chunk_size*i: min(self.driver.chunk_size*(i+1), len(data))])) # write the data to the TX FIFO
+    def _write_data_to_tx_fifo(self, data:bytes, free:int=None):
+        """Writes data to the TX FIFO, in chunks as space becomes available.
+
+        Args:
+            data (bytes): The data to write.
+            free (int): Free bytes in the TX FIFO, if known (e.g. after SFTX).
+        """
+        for _ in self._tx_fifo_writer(data, free):
+            self.driver.sleep(self.driver.fifo_rw_interval)
+
+    def _tx_fifo_writer(self, data:bytes, free:int=None):
+        """Generator writing data to the TX FIFO, yields whenever the FIFO is full.
+
+        The caller waits fifo_rw_interval between the iterations, blocking or in an
+        event loop. The free space is tracked from the status bytes returned by the
+        burst writes, instead of reading TXBYTES before each chunk. The status byte
+        saturates at 15, so that is only a lower bound.
+
+        Args:
+            data (bytes): The data to write.
+            free (int): Free bytes in the TX FIFO, if known (e.g. after SFTX).
+        """
+        view = memoryview(data)
+        if free is None:
+            free = addresses.FIFO_SIZE - self._get_tx_bytes()
+        offset = 0
+        while offset < len(data):
+            count = min(free, self.driver.chunk_size, len(data) - offset)
+            if count <= 0:
+                yield
+                status = self.driver.read_chip_status()
+                if status.state == addresses.STATUS_STATE_TXFIFO_UNDERFLOW:
+                    logger.error(f"TX FIFO underflow after {offset} of {len(data)} bytes")
+                    return
+                free = status.fifo_bytes
+                continue
+            self.driver.write_burst(addresses.TXFIFO, view[offset:offset+count]) # write the data to the TX FIFO
+            offset += count
+            status = self.driver.chip_status
+            if status is None:
+                free = addresses.FIFO_SIZE - self._get_tx_bytes()
+            elif status.fifo_bytes < 15:
+                # status of the last byte is the free space before it was written
+                free = status.fifo_bytes - 1
+            else:
+                free = max(free - count, 14)
     
     def _get_rx_bytes(self):
         return self.driver.read_status_register(addresses.RXBYTES)&0x7F
@@ -311,7 +410,9 @@ class Cc1101:
     def _get_tx_bytes(self):
         return self.driver.read_status_register(addresses.TXBYTES)&0x7F
 
-    def _transmit_packet_mode(self, packet:NormalTxPacket):
+    def _get_tx_data(self, packet:NormalTxPacket) -> bytes:
+        """Checks the payload length and returns the bytes for the TX FIFO.
+        """
         packet_length_mode = self.configurator.get_packet_length_mode()
         expected_packet_length = self.configurator.get_packet_length()
         data = bytes(packet.payload)
@@ -325,19 +426,36 @@ class Cc1101:
                 logger.error(f"Data length {len(data)} exceeds the maximum packet length {expected_packet_length}")
                 raise ValueError(f"Data length {len(data)} exceeds the maximum packet length {expected_packet_length}")
             data = bytes([len(data)]) + data
+        return data
 
-        self._write_data_to_tx_fifo(data)
+    def _transmit_packet_mode(self, packet:NormalTxPacket):
+        data = self._get_tx_data(packet)
+        # the TX FIFO was flushed before entering TX
+        self._write_data_to_tx_fifo(data, free=addresses.FIFO_SIZE)
         if self.driver.gdo0 is not None:
             # End of transmission
             self.driver.set_pin_mode(self.driver.gdo0, GPIO.IN)
             self.driver.wait_for_edge(self.driver.gdo0, GPIO.FALLING, 1000)
             self.driver.reset_pin_mode(self.driver.gdo0)
+        else:
+            # no interrupt pin, poll the chip status until the chip leaves TX
+            deadline = time.time() + 1
+            while self.driver.read_chip_status().state == addresses.STATUS_STATE_TX and time.time() < deadline:
+                self.driver.sleep(self.driver.fifo_rw_interval)
 
     def _transmit_sync_serial_mode(self, packet:SyncTxPacket):
-        self.driver.synchronous_serial_write(self.driver.gdo2, self.driver.gdo0, [int(i) for i in packet.payload])
+        self.driver.synchronous_serial_write(self.driver.gdo2, self.driver.gdo0, bytes(packet.payload))
         
     def _transmit_async_serial_mode(self, packet:AsyncTxPacket):
-        self.driver.asynchronous_serial_write(self.driver.gdo0, self.configurator.get_data_rate_baud(), [int(i) for i in packet.payload])
+        if packet.is_edge_list():
+            edges = [(level, round(duration * 1e9)) for level, duration in packet.payload]
+            report = self.driver.asynchronous_serial_write_edges(self.driver.gdo0, edges)
+        else:
+            report = self.driver.asynchronous_serial_write(self.driver.gdo0, self.configurator.get_data_rate_baud(), bytes(packet.payload))
+        if report is not None:
+            logger.debug("Asynchronous serial transmission: max jitter %d ns, mean %.0f ns, realtime %s",
+                         report.max_jitter_ns, report.mean_jitter_ns, report.realtime)
+        return report
 
     def transmit(self, packet:TxPacket):
         """Transmit the data.
@@ -349,17 +467,12 @@ class Cc1101:
             data (bytes): The data to transmit.
             blocking (bool): If True, the function will block until the transmission is complete.
         """
-        logger.info(f"Transmitting packet {packet}")
+        if self.driver.tracer is not None:
+            self.driver.tracer.record(TRACE_STATE, info=f"transmit {packet}")
 
         packet_format = self.configurator.get_packet_format()
-            
-        marc_state = self.get_marc_state()
-        if marc_state != addresses.MARCSTATE_IDLE:
-            logger.error(f"Device must be in state IDLE(0x01) before transmitting. Current state: 0x{marc_state:02X}")
-            raise ValueError(f"Device must be in state IDLE(0x01) before transmitting. Current state: 0x{marc_state:02X}")
-        
-        self.flush_tx_fifo()
-        self.set_transmit_mode()
+        self._start_transmit()
+        time.sleep(0.01)
         
         if packet_format == 0:  # normal mode, use the TX FIFO
             self._transmit_packet_mode(packet)
@@ -375,26 +488,350 @@ class Cc1101:
         
         self.set_idle_mode()
 
+    def transmit_many(self, packets:list, txoff_mode:int=2) -> list:
+        """Transmits several packets back to back, without returning to IDLE in between.
+
+        TXOFF_MODE is set to stay in TX (2) or to FSTXON (1) while the packets are sent.
+        The packets are written to the TX FIFO as one stream, so the next packet is
+        queued while the current one is on air. With TXOFF_MODE TX the chip sends
+        preamble until the next packet is in the FIFO, with FSTXON each packet is
+        started with STX once the previous one ended.
+
+        The end of each packet is taken from GDO0 (0x06, deasserts at the end of the
+        packet). Edges that are missed while writing the FIFO are recovered from the
+        number of bytes that left the TX FIFO.
+
+        Args:
+            packets (list): List of NormalTxPacket.
+            txoff_mode (int): 2 to stay in TX, 1 for FSTXON between the packets.
+
+        Returns:
+            list: Completion time (time.time()) of each packet, fewer entries if the
+                transmission was aborted.
+
+        Example:
+            >>> timestamps = cc1101.transmit_many([NormalTxPacket([i]) for i in range(10)])
+        """
+        assert self.configurator.get_packet_format() == 0, "transmit_many only supports normal packet mode"
+        assert self.configurator.get_packet_length_mode() in [0, 1], "transmit_many only supports fixed/variable length mode"
+        assert self.configurator.get_GDOx_config(0) == 0x06, "GDO0 must be configured for sync word detection (0x06)"
+        assert self.driver.gdo0 is not None, "GDO0 must be connected to an interrupt pin"
+        assert txoff_mode in [1, 2], f"Invalid TXOFF mode for transmit_many: {txoff_mode}. Must be 1 (FSTXON) or 2 (TX)"
+
+        datas = [self._get_tx_data(packet) for packet in packets]
+        data = b"".join(datas)
+        # stream offset after the last byte of each packet
+        ends = []
+        for packet_data in datas:
+            ends.append((ends[-1] if ends else 0) + len(packet_data))
+        if self.driver.tracer is not None:
+            self.driver.tracer.record(TRACE_STATE, info=f"transmit {len(datas)} packets")
+
+        previous_txoff_mode = self.configurator.get_txoff_mode()
+        self.configurator.set_txoff_mode(txoff_mode)
+        self.set_configuration()
+        timestamps = []
+        try:
+            self.driver.set_pin_mode(self.driver.gdo0, GPIO.IN)
+            self._start_transmit()
+            view = memoryview(data)
+            written = 0
+            free = addresses.FIFO_SIZE
+            level = self.driver.read_gdo0()
+            while len(timestamps) < len(datas):
+                edge = None
+                timed_out = False
+                if written < len(data) and free > 0:
+                    count = min(free, self.driver.chunk_size, len(data) - written)
+                    self.driver.write_burst(addresses.TXFIFO, view[written:written+count])
+                    written += count
+                    status = self.driver.chip_status
+                    if status is None:
+                        free = addresses.FIFO_SIZE - self._get_tx_bytes()
+                    elif status.fifo_bytes < 15:
+                        free = status.fifo_bytes - 1
+                    else:
+                        free = max(free - count, 14)
+                elif written < len(data):
+                    # FIFO full, wait a bit for the current packet
+                    edge = self.driver.wait_for_edge(self.driver.gdo0, GPIO.FALLING, timeout=max(1, round(self.driver.fifo_rw_interval*1000)))
+                    status = self.driver.read_chip_status()
+                    if status.state == addresses.STATUS_STATE_TXFIFO_UNDERFLOW:
+                        logger.error(f"TX FIFO underflow in packet {len(timestamps)} of {len(datas)}")
+                        break
+                    free = status.fifo_bytes
+                else:
+                    # all packets queued, wait for the end of the current one
+                    edge = self.driver.wait_for_edge(self.driver.gdo0, GPIO.FALLING, timeout=1000)
+                    timed_out = edge is None
+
+                new_level = self.driver.read_gdo0()
+                ended = edge is not None or (level == GPIO.HIGH and new_level == GPIO.LOW)
+                level = new_level
+                if not ended and not timed_out:
+                    continue
+                now = time.time()
+                sent = written - self._get_tx_bytes()
+                done = len(timestamps)
+                while len(timestamps) < len(datas) and ((ended and len(timestamps) == done) or ends[len(timestamps)] <= sent):
+                    timestamps.append(now)
+                if len(timestamps) == done:
+                    logger.error(f"Timeout waiting for the end of packet {done} of {len(datas)}")
+                    break
+                if txoff_mode == 1 and len(timestamps) < len(datas):
+                    self.driver.command_strobe(addresses.STX)
+        finally:
+            self.driver.reset_pin_mode(self.driver.gdo0)
+            self.set_idle_mode()
+            self.configurator.set_txoff_mode(previous_txoff_mode)
+            self.set_configuration()
+        return timestamps
+
+    def transmit_stream(self, data, length:int=None):
+        """Transmits a payload of any length as a single packet.
+
+        The packet is sent in infinite packet length mode. After the last byte is
+        written to the TX FIFO, the chip is switched to fixed length mode with
+        PKTLEN = length % 256, so it ends the packet after the last byte (see 15.2
+        Packet Format). No length byte is sent, the receiver has to know the length.
+
+        The TX FIFO is refilled whenever the TX FIFO threshold signal on GDO2 (IOCFG2
+        0x02) deasserts, if GDO2 is wired and configured. Otherwise the free space is
+        polled from the chip status byte.
+
+        The packet length mode and PKTLEN are restored afterwards.
+
+        Args:
+            data (bytes | bytearray | memoryview | iterable): The payload, or an iterable
+                of byte chunks (e.g. a file read in blocks).
+            length (int): Total payload length, required if data is an iterable.
+
+        Example:
+            >>> with open("firmware.bin", "rb") as f:
+            ...     cc1101.transmit_stream(iter(lambda: f.read(4096), b""), length=os.path.getsize("firmware.bin"))
+        """
+        assert self.configurator.get_packet_format() == 0, "transmit_stream only supports normal packet mode"
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            source = memoryview(data).cast("B")
+            if length is None:
+                length = len(source)
+            chunks = None
+        else:
+            assert length is not None, "length is required if data is an iterable"
+            source = bytearray()
+            chunks = iter(data)
+        if self.driver.tracer is not None:
+            self.driver.tracer.record(TRACE_STATE, info=f"transmit stream {length} bytes")
+
+        def take(count:int):
+            nonlocal source
+            if chunks is None:
+                result = source[:count]
+                source = source[count:]
+                return result
+            while len(source) < count:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                source += chunk
+            result = bytes(source[:count])
+            del source[:count]
+            return result
+
+        packet_length_mode = self.configurator.get_packet_length_mode()
+        packet_length = self.configurator.get_packet_length()
+        # shorter payloads fit the fixed length mode right away
+        self.configurator.set_packet_length_mode(2 if length > 255 else 0)
+        self.configurator.set_packet_length(length % 256)
+        self.set_configuration()
+
+        use_threshold = self.driver.gdo2 is not None and self.configurator.get_GDOx_config(2) == 0x02
+        # free bytes once the TX FIFO threshold signal deasserts
+        threshold_free = addresses.FIFO_SIZE + 1 - self.configurator.get_tx_fifo_threshold_bytes()
+        try:
+            if use_threshold:
+                self.driver.set_pin_mode(self.driver.gdo2, GPIO.IN)
+            self._start_transmit()
+            written = 0
+            free = addresses.FIFO_SIZE
+            while written < length:
+                if free <= 0:
+                    if use_threshold:
+                        if self.driver.read_gdo2() == GPIO.HIGH:
+                            self.driver.wait_for_edge(self.driver.gdo2, GPIO.FALLING, timeout=1000)
+                        free = threshold_free
+                    else:
+                        self.driver.sleep(self.driver.fifo_rw_interval)
+                        free = self.driver.read_chip_status().fifo_bytes
+                    status = self.driver.chip_status
+                    if status is not None and status.state == addresses.STATUS_STATE_TXFIFO_UNDERFLOW:
+                        logger.error(f"TX FIFO underflow after {written} of {length} bytes")
+                        return
+                    continue
+                chunk = take(min(free, length - written))
+                if len(chunk) == 0:
+                    logger.error(f"Data ended after {written} of {length} bytes")
+                    break
+                self.driver.write_burst(addresses.TXFIFO, chunk)
+                written += len(chunk)
+                status = self.driver.chip_status
+                if status is None:
+                    free = addresses.FIFO_SIZE - self._get_tx_bytes()
+                elif status.fifo_bytes < 15:
+                    free = status.fifo_bytes - 1
+                else:
+                    free = max(free - len(chunk), 14)
+            if self.configurator.get_packet_length_mode() == 2:
+                # less than a FIFO worth of bytes left to send, the chip ends the packet at PKTLEN
+                self.configurator.set_packet_length_mode(0)
+                self.set_configuration()
+
+            if self.driver.gdo0 is not None and self.configurator.get_GDOx_config(0) == 0x06:
+                self.driver.set_pin_mode(self.driver.gdo0, GPIO.IN)
+                self.driver.wait_for_edge(self.driver.gdo0, GPIO.FALLING, 1000)
+                self.driver.reset_pin_mode(self.driver.gdo0)
+            else:
+                deadline = time.time() + 1
+                while self.driver.read_chip_status().state == addresses.STATUS_STATE_TX and time.time() < deadline:
+                    self.driver.sleep(self.driver.fifo_rw_interval)
+        finally:
+            if use_threshold:
+                self.driver.reset_pin_mode(self.driver.gdo2)
+            self.set_idle_mode()
+            self.configurator.set_packet_length_mode(packet_length_mode)
+            self.configurator.set_packet_length(packet_length)
+            self.set_configuration()
+
+    def _start_transmit(self):
+        """Checks that the device is idle, flushes the TX FIFO and enables TX.
+        """
+        if self.driver.read_chip_status().state != addresses.STATUS_STATE_IDLE:
+            marc_state = self.get_marc_state()
+            logger.error(f"Device must be in state IDLE(0x01) before transmitting. Current state: 0x{marc_state:02X}")
+            raise ValueError(f"Device must be in state IDLE(0x01) before transmitting. Current state: 0x{marc_state:02X}")
+        
+        # flush the TX FIFO and enable TX in a single SPI transfer
+        self.driver.transaction().command_strobe(addresses.SFTX).command_strobe(addresses.STX).execute()
+
 
     def _receive_packet_mode(self, timeout_ms:int) -> NormalRxPacket:
         assert self.configurator.get_GDOx_config(0) == 0x06, "GDO0 must be configured for sync word detection (0x06) in fixed/variable length mode"
         assert self.driver.gdo0 is not None, "GDO0 must be connected to an interrupt pin for fixed/variable length mode"
-        
-        self.driver.set_pin_mode(self.driver.gdo0, GPIO.IN)
-        if self.driver.wait_for_edge(self.driver.gdo0, GPIO.RISING, timeout=timeout_ms) is None:
+        pins = [self.driver.gdo0] + ([self.driver.gdo2] if self._use_rx_threshold() else [])
+        for pin in pins:
+            self.driver.set_pin_mode(pin, GPIO.IN)
+        try:
+            reader = self._rx_packet_reader(timeout_ms, self.driver.read_gdo0, self.driver.read_gdo2)
+            request = next(reader)
+            while True:
+                request = reader.send(self.driver.wait_for_edge(*request))
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            for pin in reversed(pins):
+                self.driver.reset_pin_mode(pin)
+
+    def _use_rx_threshold(self) -> bool:
+        return self.driver.gdo2 is not None and self.configurator.get_GDOx_config(2) == 0x00
+
+    def _rx_packet_reader(self, timeout_ms:int, read_gdo0, read_gdo2):
+        """Generator receiving a packet in fixed/variable length mode.
+
+        Yields (pin, edge, timeout in ms) whenever it has to wait for an edge, the
+        caller waits, blocking or in an event loop, and sends back the result of
+        wait_for_edge. The GDO pins must be configured as inputs.
+
+        With the RX FIFO threshold signal on GDO2 (IOCFG2 0x00), threshold-1 bytes
+        are read in one burst each time GDO2 asserts, without reading RXBYTES first.
+        Once the rest of the packet is below the threshold, the end of the packet is
+        awaited on GDO0 and the rest is read in one burst. Otherwise the RX FIFO is
+        polled every fifo_rw_interval until GDO0 deasserts.
+
+        Args:
+            timeout_ms (int): Timeout waiting for the start of the packet.
+            read_gdo0: Returns the level of GDO0.
+            read_gdo2: Returns the level of GDO2.
+
+        Returns:
+            NormalRxPacket: The received packet (StopIteration.value), or None.
+        """
+        if (yield self.driver.gdo0, GPIO.RISING, timeout_ms) is None:
             logger.warning("Timeout waiting for start of reception")
             return None
         self._packet_start = time.time()
-        data = []
-        while (self.driver.wait_for_edge(self.driver.gdo0, GPIO.FALLING, timeout=self.driver.fifo_rw_interval) is None) and (self.driver.read_gdo0() == GPIO.HIGH):
+        if self._use_rx_threshold():
+            length = yield from self._rx_fifo_drain_threshold(read_gdo0, read_gdo2)
+        else:
+            length = yield from self._rx_fifo_drain(read_gdo0)
+
+        if length == 0:
+            # e.g. packet discarded by address or length filtering
+            logger.warning("Packet reception ended without data")
+            return None
+        return self._parse_rx_packet(length)
+
+    def _rx_fifo_drain(self, read_gdo0):
+        # RPi.GPIO only takes whole milliseconds
+        interval_ms = max(1, round(self.driver.fifo_rw_interval * 1000))
+        length = 0
+        while ((yield self.driver.gdo0, GPIO.FALLING, interval_ms) is None) and (read_gdo0() == GPIO.HIGH):
             self._packet_end = time.time()
-            trunc = self.driver.read_burst(addresses.RXFIFO, self._get_rx_bytes()-1)
-            if trunc is not None:
-                data += trunc
-        trunc = self.driver.read_burst(addresses.RXFIFO, self._get_rx_bytes())
-        data += trunc
-        self.driver.reset_pin_mode(self.driver.gdo0)
+            # don't read the last byte while the packet is still being received (see errata)
+            # hold the bus for RXBYTES and the FIFO read, other radios on the bus can't delay the drain
+            with self.driver.lock():
+                length = self._read_rx_fifo(length, self._get_rx_bytes()-1)
+        with self.driver.lock():
+            length = self._read_rx_fifo(length, self._get_rx_bytes())
+        return length
+
+    def _rx_fifo_drain_threshold(self, read_gdo0, read_gdo2):
+        threshold = self.configurator.get_rx_fifo_threshold_bytes()
+        # time to receive a threshold worth of bytes, upper bound for waiting on GDO2
+        chunk_timeout_ms = max(1, int(threshold * 8 * 1000 / self.configurator.get_data_rate_baud()))
+        length = 0
+        expected = None
+        if self.configurator.get_packet_length_mode() == 0:
+            expected = self._get_rx_packet_size()
+        while True:
+            if expected is not None and expected - length < threshold:
+                # GDO2 won't assert again, wait for the end of the packet
+                if read_gdo0() == GPIO.HIGH:
+                    yield self.driver.gdo0, GPIO.FALLING, chunk_timeout_ms * 2 + 10
+                length = self._read_rx_fifo(length, expected - length)
+                break
+            if read_gdo2() == GPIO.HIGH:
+                # at least threshold bytes in the FIFO, keep one while receiving (see errata)
+                length = self._read_rx_fifo(length, threshold - 1)
+                if expected is None:
+                    expected = self._get_rx_packet_size()
+                continue
+            if read_gdo0() == GPIO.LOW:
+                # packet shorter than the threshold, or discarded
+                with self.driver.lock():
+                    length = self._read_rx_fifo(length, self._get_rx_bytes())
+                break
+            yield self.driver.gdo2, GPIO.RISING, chunk_timeout_ms
+        self._packet_end = time.time()
+        return length
+
+    def _read_rx_fifo(self, offset:int, count:int) -> int:
+        """Reads count bytes from the RX FIFO into the receive buffer at offset.
 
+        Returns:
+            int: The new fill level of the receive buffer.
+        """
+        if count <= 0:
+            return offset
+        if offset + count > len(self._rx_buffer):
+            self._rx_buffer.extend(bytes(offset + count - len(self._rx_buffer)))
+        with memoryview(self._rx_buffer) as view:
+            self.driver.read_burst_into(addresses.RXFIFO, view[offset:offset+count])
+        return offset + count
+
+    def _parse_rx_packet(self, count:int) -> NormalRxPacket:
+        """Creates a NormalRxPacket from the first count bytes of the receive buffer.
+        """
+        data = memoryview(self._rx_buffer)[:count]
         length = None
         rssi = None
         lqi = None
@@ -413,8 +850,10 @@ class Cc1101:
             data = data[:-2]
             #length -= 2
 
+        payload = bytes(data)
+        data.release()
         return NormalRxPacket(
-            payload=data, 
+            payload=payload, 
             length=length, 
             rssi=rssi, 
             lqi=lqi, 
@@ -434,7 +873,10 @@ class Cc1101:
             timeout_ms=timeout_ms,
             max_same_bits=max_same_bits,
         )
-        return SyncRxPacket(bits.bits, timestamp=time.time())
+        return self._to_sync_rx_packet(bits)
+
+    def _to_sync_rx_packet(self, bits) -> SyncRxPacket:
+        return SyncRxPacket(PackedBits(memoryview(bits.packed), bits.bit_length), timestamp=bits.start_capture)
 
 
     def _receive_async_serial_mode(self, timeout_ms:int) -> AsyncRxPacket:
@@ -449,7 +891,14 @@ class Cc1101:
             timeout_ms=timeout_ms,
         )
 
-        return AsyncRxPacket(edges=[(x[1], x[0] - edges.start_capture) for x in edges.transitions], timestamp=time.time())
+        if edges is None:
+            logger.warning("Timeout waiting for start of reception")
+            return None
+        return self._to_async_rx_packet(edges)
+
+    def _to_async_rx_packet(self, edges) -> AsyncRxPacket:
+        # the arrays of the capture are used in place, no tuple per edge
+        return AsyncRxPacket(levels=edges.levels, timestamps_ns=edges.timestamps_ns, start_ns=edges.start_capture_ns, timestamp=edges.start_capture)
 
 
     def receive(self, timeout_ms=1000, max_same_bits=16) -> RxPacket:
@@ -458,17 +907,9 @@ class Cc1101:
         Returns:
             bytes: The received data.
         """
-        logger.info("Receiving data")
-        marc_state = self.get_marc_state()
-
-        if marc_state not in [addresses.MARCSTATE_IDLE, addresses.MARCSTATE_RX]:
-            logger.error(f"Device must be in state IDLE(0x01) before receiving. Current state: 0x{marc_state:02X}")
-            raise ValueError(f"Device must be in state IDLE(0x01) before receiving. Current state: 0x{marc_state:02X}")
-        
-        self.flush_rx_fifo()
-
-        if marc_state != addresses.MARCSTATE_RX:
-           self.driver.command_strobe(addresses.SRX)
+        if self.driver.tracer is not None:
+            self.driver.tracer.record(TRACE_STATE, info="receive")
+        self._start_receive()
     
         packet_format = self.configurator.get_packet_format()
 
@@ -486,6 +927,192 @@ class Cc1101:
 
         self.set_idle_mode()
         return packet
+
+    def receive_bursts(self, timeout_ms:int=None, max_same_bits:int=16, capacity:int=65536):
+        """Receives in serial mode without gaps between the packets.
+
+        The driver captures continuously in a background thread into a ring buffer,
+        so packets sent while the previous one is processed are not lost, e.g. the
+        repeats of a remote control. If the consumer falls behind and the buffer runs
+        full, the dropped edges or bits are logged.
+
+        Closing the generator (or leaving the for loop) stops the capture and sets
+        the device to IDLE. Only synchronous and asynchronous serial mode are supported.
+
+        Args:
+            timeout_ms (int): Stop if no packet ends within this time. None to
+                receive until the generator is closed.
+            max_same_bits (int): See receive, synchronous serial mode only.
+            capacity (int): Size of the ring buffer in edges or bits.
+
+        Yields:
+            SyncRxPacket | AsyncRxPacket: The received packets.
+
+        Example:
+            >>> for packet in cc1101.receive_bursts():
+            ...     print(protocol.parse(packet.get_bitstream()))
+        """
+        packet_format = self.configurator.get_packet_format()
+        assert packet_format in [1, 3], "receive_bursts only supports synchronous and asynchronous serial mode"
+        assert self.driver.gdo0 is not None, "GDO0 must be connected to an interrupt pin in serial mode"
+        assert self.driver.gdo2 is not None, "GDO2 must be connected to an interrupt pin in serial mode"
+        if packet_format == 1:
+            assert self.configurator.get_GDOx_config(0) == 0x0C, "GDO0 must be configured for sync serial data output (0x0C) in synchronous serial mode"
+            assert self.configurator.get_GDOx_config(2) == 0x0B, "GDO2 must be configured for serial clock (0x0B) in synchronous serial mode"
+        else:
+            assert self.configurator.get_GDOx_config(0) == 0x0E, "GDO0 must be configured for carrier sense (0x0E) in asynchronous serial mode"
+            assert self.configurator.get_GDOx_config(2) == 0x0D, "GDO2 must be configured for async serial data output (0x0D) in asynchronous serial mode"
+
+        if self.driver.tracer is not None:
+            self.driver.tracer.record(TRACE_STATE, info="receive bursts")
+        self._start_receive()
+        if packet_format == 1:
+            capture = self.driver.start_background_capture(self.driver.gdo2, self.driver.gdo0, synchronous=True,
+                                                           max_same_bits=max_same_bits, capacity=capacity)
+        else:
+            capture = self.driver.start_background_capture(self.driver.gdo0, self.driver.gdo2, capacity=capacity)
+        overruns = 0
+        try:
+            while True:
+                burst = capture.next_burst(timeout_ms)
+                if burst is None:
+                    return
+                if capture.overruns != overruns:
+                    logger.warning(f"Capture buffer overrun, {capture.overruns - overruns} edges/bits dropped")
+                    overruns = capture.overruns
+                if packet_format == 1:
+                    yield self._to_sync_rx_packet(burst)
+                else:
+                    yield self._to_async_rx_packet(burst)
+        finally:
+            capture.stop()
+            self.set_idle_mode()
+
+    def receive_stream(self, timeout_ms:int=None):
+        """Receives packets back to back without leaving RX.
+
+        RXOFF_MODE is set to stay in RX for as long as the generator runs, so the chip
+        keeps listening while a packet is read from the RX FIFO. Each packet is read
+        up to its own length, bytes of the next packet stay in the FIFO. On an RX FIFO
+        overflow, the packet is dropped and reception restarts.
+
+        Closing the generator (or leaving the for loop) sets the device to IDLE and
+        restores RXOFF_MODE. Only fixed and variable length packet mode is supported.
+
+        Args:
+            timeout_ms (int): Stop if no packet starts within this time. None to
+                receive until the generator is closed.
+
+        Yields:
+            NormalRxPacket: The received packets.
+
+        Example:
+            >>> for packet in cc1101.receive_stream():
+            ...     print(packet)
+        """
+        assert self.configurator.get_packet_format() == 0, "receive_stream only supports fixed/variable length mode"
+        assert self.configurator.get_packet_length_mode() in [0, 1], "receive_stream only supports fixed/variable length mode"
+        assert self.configurator.get_GDOx_config(0) == 0x06, "GDO0 must be configured for sync word detection (0x06) in fixed/variable length mode"
+        assert self.driver.gdo0 is not None, "GDO0 must be connected to an interrupt pin for fixed/variable length mode"
+
+        if self.driver.tracer is not None:
+            self.driver.tracer.record(TRACE_STATE, info="receive stream")
+        rxoff_mode = self.configurator.get_rxoff_mode()
+        self.configurator.set_rxoff_mode(3)
+        self.set_configuration()
+        try:
+            self._start_receive()
+            self.driver.set_pin_mode(self.driver.gdo0, GPIO.IN)
+            while True:
+                wait_ms = timeout_ms if timeout_ms is not None else 1000
+                started = self._wait_for_stream_packet(wait_ms)
+                if started is None:
+                    if timeout_ms is not None:
+                        return
+                    continue
+                packet = self._read_stream_packet()
+                if packet is not None:
+                    yield packet
+        finally:
+            self.driver.reset_pin_mode(self.driver.gdo0)
+            self.set_idle_mode()
+            self.configurator.set_rxoff_mode(rxoff_mode)
+            self.set_configuration()
+
+    def _wait_for_stream_packet(self, timeout_ms:int):
+        # the next packet may have started while the previous one was read
+        if self.driver.read_gdo0() == GPIO.HIGH or self._get_rx_bytes() > 0:
+            return self.driver.gdo0
+        return self.driver.wait_for_edge(self.driver.gdo0, GPIO.RISING, timeout=timeout_ms)
+
+    def _get_rx_packet_size(self) -> int:
+        """Number of bytes of the packet in the RX FIFO, once the length byte is read.
+        """
+        status_size = 2 if self.configurator.get_append_status_enabled() else 0
+        if self.configurator.get_packet_length_mode() == 0: # fixed length mode
+            return self.configurator.get_packet_length() + status_size
+        return 1 + self._rx_buffer[0] + status_size
+
+    def _read_stream_packet(self) -> NormalRxPacket:
+        """Reads exactly one packet from the RX FIFO, the chip stays in RX.
+        """
+        self._packet_start = time.time()
+        length = 0
+        expected = None
+        ended = False
+        if self.configurator.get_packet_length_mode() == 0:
+            expected = self._get_rx_packet_size()
+        while True:
+            with self.driver.lock():
+                rx_bytes = self.driver.read_status_register(addresses.RXBYTES)
+                if rx_bytes & 0x80:
+                    # RXFIFO_OVERFLOW, the packet is lost
+                    logger.warning(f"RX FIFO overflow after {length} bytes, restarting reception")
+                    self.driver.transaction().command_strobe(addresses.SFRX).command_strobe(addresses.SRX).execute()
+                    return None
+                rx_bytes &= 0x7F
+                if expected is not None and (ended or rx_bytes >= expected - length):
+                    # the rest of this packet, bytes of the next one stay in the FIFO
+                    count = min(rx_bytes, expected - length)
+                elif ended:
+                    # the length byte first
+                    count = min(rx_bytes, 1)
+                else:
+                    # don't read the last byte while the packet is still being received (see errata)
+                    count = rx_bytes - 1
+                length = self._read_rx_fifo(length, count)
+            if expected is None and length > 0:
+                expected = self._get_rx_packet_size()
+            if expected is not None and length >= expected:
+                self._packet_end = time.time()
+                return self._parse_rx_packet(length)
+            if ended:
+                if count <= 0:
+                    # e.g. packet discarded by address or length filtering
+                    logger.warning("Packet reception ended without data")
+                    return None
+                continue
+            # RPi.GPIO only takes whole milliseconds
+            if self.driver.wait_for_edge(self.driver.gdo0, GPIO.FALLING, timeout=max(1, round(self.driver.fifo_rw_interval*1000))) is not None:
+                ended = True
+            elif self.driver.read_gdo0() == GPIO.LOW:
+                ended = True
+
+    def _start_receive(self):
+        """Checks that the device is idle or in RX, flushes the RX FIFO and enables RX.
+        """
+        state = self.driver.read_chip_status().state
+
+        if state not in [addresses.STATUS_STATE_IDLE, addresses.STATUS_STATE_RX]:
+            marc_state = self.get_marc_state()
+            logger.error(f"Device must be in state IDLE(0x01) before receiving. Current state: 0x{marc_state:02X}")
+            raise ValueError(f"Device must be in state IDLE(0x01) before receiving. Current state: 0x{marc_state:02X}")
+        
+        # flush the RX FIFO and enable RX in a single SPI transfer
+        transaction = self.driver.transaction().command_strobe(addresses.SFRX)
+        if state != addresses.STATUS_STATE_RX:
+            transaction.command_strobe(addresses.SRX)
+        transaction.execute()
         
 
     def get_marc_state(self):
@@ -524,4 +1151,21 @@ class Cc1101:
         Returns:
             int: The value of the MARCSTATE status register.
         """
-        return self.driver.read_status_register(addresses.MARCSTATE)
\ No newline at end of file
+        return self.driver.read_status_register(addresses.MARCSTATE)
+
+    def get_chip_status(self, read:bool=False):
+        """
+        Retrieve the chip status byte with a single byte SNOP strobe.
+
+        The chip status holds the main state and the FIFO level, which is cheaper
+        than reading MARCSTATE, TXBYTES or RXBYTES. See 10.1 Chip Status Byte.
+
+        Args:
+            read (bool): If True, fifo_bytes is the number of bytes in the RX FIFO,
+                otherwise the free space in the TX FIFO. Both saturate at 15.
+
+        Returns:
+            ChipStatus: (chip_ready, state, fifo_bytes), state is one of
+                addresses.STATUS_STATE_*.
+        """
+        return self.driver.read_chip_status(read)
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""CRC-16 and PN9 data whitening of the CC1101 packet handler.
+
+In the serial modes the chip neither checks the CRC nor de-whitens the data, this
+module does it on the host, like the packet handler in fixed/variable length mode:
+the CRC (polynomial 0x8005, init 0xFFFF, most significant bit first) is computed
+over the data and appended high byte first, then data and CRC are whitened with
+the PN9 sequence (x^9 + x^5 + 1, init 0x1FF).
+
+The CRC is table driven, 8 bytes per step (slice-by-8). Whitening XORs the data
+with a precomputed keystream as one big int. Both have an incremental interface
+(Crc16, Pn9) for frames received in parts.
+
+Example:
+    >>> raw = coding.encode_frame(b"\\x03abc")
+    >>> coding.decode_frame(raw)
+    (b'\\x03abc', True)
+"""
+
+CRC_POLYNOMIAL = 0x8005
+CRC_INIT = 0xFFFF
+PN9_INIT = 0x1FF
+
+
+def _crc_tables():
+    # table k: the CRC (init 0) of a byte followed by k zero bytes
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ CRC_POLYNOMIAL if crc & 0x8000 else crc << 1) & 0xFFFF
+        table.append(crc)
+    tables = [table]
+    for _ in range(7):
+        tables.append([((crc << 8) & 0xFFFF) ^ table[crc >> 8] for crc in tables[-1]])
+    return tables
+
+_CRC_TABLES = _crc_tables()
+
+
+def crc16(data, crc:int=CRC_INIT) -> int:
+    """Computes the CRC-16 of the CC1101.
+
+    Args:
+        data (bytes | bytearray | memoryview | list): The data.
+        crc (int): The CRC of the preceding data, to continue a computation.
+
+    Returns:
+        int: The CRC.
+    """
+    data = bytes(data)
+    t0, t1, t2, t3, t4, t5, t6, t7 = _CRC_TABLES
+    full = len(data) - len(data) % 8
+    for i in range(0, full, 8):
+        b0, b1, b2, b3, b4, b5, b6, b7 = data[i:i + 8]
+        crc = t7[b0 ^ (crc >> 8)] ^ t6[b1 ^ (crc & 0xFF)] ^ t5[b2] ^ t4[b3] ^ \
+            t3[b4] ^ t2[b5] ^ t1[b6] ^ t0[b7]
+    for byte in data[full:]:
+        crc = ((crc << 8) & 0xFFFF) ^ t0[(crc >> 8) ^ byte]
+    return crc
+
+
+class Crc16:
+    """Incremental CRC-16, see crc16.
+
+    Example:
+        >>> crc = Crc16()
+        >>> crc.update(b"1234").update(b"56789").value
+        44775
+    """
+    def __init__(self, data=b"", crc:int=CRC_INIT):
+        self._crc = crc16(data, crc)
+
+    def update(self, data) -> "Crc16":
+        """Adds data to the CRC and returns self.
+        """
+        self._crc = crc16(data, self._crc)
+        return self
+
+    @property
+    def value(self) -> int:
+        """The CRC of the data so far.
+        """
+        return self._crc
+
+    def digest(self) -> bytes:
+        """The CRC as it is appended to a packet, high byte first.
+        """
+        return self._crc.to_bytes(2, "big")
+
+
+def append_crc(data) -> bytes:
+    """Returns the data with its CRC appended.
+    """
+    data = bytes(data)
+    return data + crc16(data).to_bytes(2, "big")
+
+
+def check_crc(frame) -> bool:
+    """Checks the CRC at the end of a frame, the CRC of data and CRC is 0.
+    """
+    return len(frame) >= 2 and crc16(frame) == 0
+
+
+def _pn9_sequence() -> bytes:
+    # 511 bytes, then the sequence repeats (511 bits, 8 bits per byte)
+    state, sequence = PN9_INIT, bytearray()
+    for _ in range(511):
+        sequence.append(state & 0xFF)
+        for _ in range(8):
+            state = (state >> 1) | (((state ^ (state >> 5)) & 1) << 8)
+    return bytes(sequence)
+
+_PN9 = _pn9_sequence()
+
+
+def pn9(length:int, offset:int=0) -> bytes:
+    """Returns the PN9 keystream.
+
+    Args:
+        length (int): Number of bytes.
+        offset (int): Position of the first byte in the sequence.
+    """
+    offset %= len(_PN9)
+    repeats = (offset + length + len(_PN9) - 1) // len(_PN9)
+    return (_PN9 * repeats)[offset:offset + length]
+
+
+def whiten(data, offset:int=0) -> bytes:
+    """Whitens or de-whitens data (XOR with the PN9 keystream).
+
+    Args:
+        data (bytes | bytearray | memoryview | list): The data.
+        offset (int): Position of the first byte in the sequence, to continue
+          in the middle of a frame.
+
+    Returns:
+        bytes: The whitened data.
+    """
+    data = bytes(data)
+    if not data:
+        return b""
+    key = int.from_bytes(pn9(len(data), offset), "big")
+    return (int.from_bytes(data, "big") ^ key).to_bytes(len(data), "big")
+
+
+class Pn9:
+    """Incremental whitening, see whiten.
+
+    Example:
+        >>> pn9 = Pn9()
+        >>> pn9.apply(b"\\x00\\x00") + pn9.apply(b"\\x00")
+        b'\\xff\\xe1\\x1d'
+    """
+    def __init__(self):
+        self._position = 0
+
+    def apply(self, data) -> bytes:
+        """Whitens or de-whitens the next bytes of the frame.
+        """
+        result = whiten(data, self._position)
+        self._position = (self._position + len(result)) % len(_PN9)
+        return result
+
+    def reset(self):
+        """Starts a new frame.
+        """
+        self._position = 0
+
+
+def encode_frame(data, crc:bool=True, whitening:bool=True) -> bytes:
+    """Appends the CRC and whitens, like the packet handler before transmission.
+
+    The length and address bytes of variable length mode and address check are
+    part of data.
+
+    Args:
+        data (bytes | bytearray | memoryview | list): The data.
+        crc (bool): Append the CRC.
+        whitening (bool): Whiten data and CRC.
+
+    Returns:
+        bytes: The frame to transmit after preamble and sync word.
+    """
+    frame = append_crc(data) if crc else bytes(data)
+    return whiten(frame) if whitening else frame
+
+
+def decode_frame(frame, crc:bool=True, whitening:bool=True) -> tuple:
+    """De-whitens and checks the CRC of a received frame, see encode_frame.
+
+    Args:
+        frame (bytes | bytearray | memoryview | list): The bytes after the sync word.
+        crc (bool): The frame ends with a CRC.
+        whitening (bool): The frame is whitened.
+
+    Returns:
+        tuple: The data without CRC and whether the CRC is ok (True without CRC).
+    """
+    frame = whiten(frame) if whitening else bytes(frame)
+    if not crc:
+        return frame, True
+    return frame[:-2], check_crc(frame)
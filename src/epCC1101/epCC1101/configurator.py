@@ -576,6 +576,83 @@ class Cc1101Configurator:
 
         self._registers[addr.PKTCTRL0] = (self._registers[addr.PKTCTRL0] & 0xCF) | (packet_format << 4)
 
+    def get_txoff_mode(self) -> int:
+        """see 29 Configuration Registers (MCSM1)
+
+        Returns:
+            int: State after a packet has been sent
+                0: IDLE
+                1: FSTXON
+                2: Stay in TX (start sending preamble)
+                3: RX
+        """
+        return self._registers[addr.MCSM1] & 0x03
+
+    def set_txoff_mode(self, mode: int):
+        """see 29 Configuration Registers (MCSM1)
+
+        Args:
+            mode (int): see get_txoff_mode
+        """
+        assert 0 <= mode <= 3, f"Invalid TXOFF mode: {mode}. Must be between 0 and 3"
+        self._registers[addr.MCSM1] = (self._registers[addr.MCSM1] & 0xFC) | mode
+
+    def get_fifo_threshold(self) -> int:
+        """see 29 Configuration Registers (FIFOTHR)
+
+        Returns:
+            int: FIFO threshold setting (0-15), see get_rx_fifo_threshold_bytes and
+                get_tx_fifo_threshold_bytes
+        """
+        return self._registers[addr.FIFOTHR] & 0x0F
+
+    def set_fifo_threshold(self, threshold: int):
+        """see 29 Configuration Registers (FIFOTHR)
+
+        Args:
+            threshold (int): FIFO threshold setting (0-15). RX FIFO threshold is
+                4*(threshold+1) bytes, TX FIFO threshold is 61-4*threshold bytes.
+        """
+        assert 0 <= threshold <= 15, f"Invalid FIFO threshold: {threshold}. Must be between 0 and 15"
+        self._registers[addr.FIFOTHR] = (self._registers[addr.FIFOTHR] & 0xF0) | threshold
+
+    def get_rx_fifo_threshold_bytes(self) -> int:
+        """see 29 Configuration Registers (FIFOTHR)
+
+        Returns:
+            int: Number of bytes in the RX FIFO at which the threshold signal asserts
+        """
+        return 4 * (self.get_fifo_threshold() + 1)
+
+    def get_tx_fifo_threshold_bytes(self) -> int:
+        """see 29 Configuration Registers (FIFOTHR)
+
+        Returns:
+            int: Number of bytes in the TX FIFO at which the threshold signal asserts
+        """
+        return 61 - 4 * self.get_fifo_threshold()
+
+    def get_rxoff_mode(self) -> int:
+        """see 19.5 RX Termination Timer and 29 Configuration Registers (MCSM1)
+
+        Returns:
+            int: State after a packet has been received
+                0: IDLE
+                1: FSTXON
+                2: TX
+                3: Stay in RX
+        """
+        return (self._registers[addr.MCSM1] >> 2) & 0x03
+
+    def set_rxoff_mode(self, mode: int):
+        """see 19.5 RX Termination Timer and 29 Configuration Registers (MCSM1)
+
+        Args:
+            mode (int): see get_rxoff_mode
+        """
+        assert 0 <= mode <= 3, f"Invalid RXOFF mode: {mode}. Must be between 0 and 3"
+        self._registers[addr.MCSM1] = (self._registers[addr.MCSM1] & 0xF3) | (mode << 2)
+
     def get_agc_filter_length(self):
         """see ???
         
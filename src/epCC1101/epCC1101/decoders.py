@@ -0,0 +1,238 @@
+import logging
+import queue
+import threading
+from collections import namedtuple
+from epCC1101.packet import Protocol, RxPacket, Princeton25bit_Protocol, KiaEv6_Protocol
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+_decoders = {}
+_decoders_lock = threading.Lock()
+
+
+class DecodeResult(namedtuple("DecodeResult", ["decoder", "values", "packet"])):
+    """A packet decoded by one of the decoders of a DecodePipeline.
+
+    Attributes:
+        decoder (str): Name of the decoder.
+        values (dict): The logical values returned by the decoder.
+        packet (RxPacket): The decoded packet.
+    """
+    __slots__ = ()
+
+
+def register_decoder(name:str, factory=None):
+    """Registers a decoder, a Protocol subclass (or a factory returning a Protocol)
+    implementing Protocol.decode.
+
+    Can be used as class decorator.
+
+    Args:
+        name (str): Name of the decoder, e.g. "princeton25bit".
+        factory (type): The Protocol subclass.
+
+    Example:
+        >>> @register_decoder("my_remote")
+        ... class MyRemote(Protocol):
+        ...     def decode(self, packet):
+        ...         return {"button": packet.payload[0]} if packet.payload else None
+    """
+    def register(factory):
+        with _decoders_lock:
+            if name in _decoders:
+                raise ValueError(f"Decoder {name} is already registered")
+            _decoders[name] = factory
+        return factory
+    if factory is None:
+        return register
+    return register(factory)
+
+
+def unregister_decoder(name:str):
+    """Removes a decoder from the registry.
+    """
+    with _decoders_lock:
+        del _decoders[name]
+
+
+def get_decoder(name:str, *args, **kwargs) -> Protocol:
+    """Creates a registered decoder.
+
+    Args:
+        name (str): Name of the decoder.
+        *args, **kwargs: Passed to the factory of the decoder.
+
+    Raises:
+        KeyError: If no decoder is registered with this name.
+    """
+    with _decoders_lock:
+        factory = _decoders[name]
+    return factory(*args, **kwargs)
+
+
+def get_decoder_names() -> list:
+    """Returns the names of the registered decoders.
+    """
+    with _decoders_lock:
+        return sorted(_decoders)
+
+
+register_decoder("princeton25bit", Princeton25bit_Protocol)
+register_decoder("kia_ev6", KiaEv6_Protocol)
+
+
+def _decode(decoder:Protocol, packet:RxPacket):
+    # module level, so it can be pickled for a process pool
+    return decoder.decode(packet)
+
+
+class DecodePipeline:
+    """Fans out each received packet to several decoders.
+
+    With an executor (concurrent.futures thread or process pool), submit() returns
+    right away and decoding runs in the pool, so the receive loop isn't blocked. The
+    results of the decoders that recognized a packet are collected in completion
+    order, see poll() and results(). Without an executor, packets are decoded in
+    submit().
+
+    For a process pool, decoders and packets are pickled.
+
+    Example:
+        >>> with DecodePipeline(["princeton25bit"], executor=ThreadPoolExecutor()) as pipeline:
+        ...     for packet in cc1101.receive_bursts():
+        ...         pipeline.submit(packet)
+        ...         for result in pipeline.poll():
+        ...             print(result.decoder, result.values)
+    """
+    def __init__(self, decoders:list=None, executor=None):
+        """Initializes a new instance of the DecodePipeline class.
+
+        Args:
+            decoders (list): Names of registered decoders, Protocol instances (named
+                after their class) or (name, Protocol instance) tuples, default all
+                registered decoders.
+            executor (concurrent.futures.Executor): Pool to decode in, None to
+                decode in the calling thread.
+
+        Raises:
+            ValueError: If two decoders have the same name, e.g. two instances of
+                the same class. Name them with (name, decoder) tuples.
+        """
+        if decoders is None:
+            decoders = get_decoder_names()
+        self.decoders = {}
+        for decoder in decoders:
+            if isinstance(decoder, str):
+                name, decoder = decoder, get_decoder(decoder)
+            elif isinstance(decoder, tuple):
+                name, decoder = decoder
+            else:
+                name = type(decoder).__name__
+            if name in self.decoders:
+                raise ValueError(f"Duplicate decoder name {name}")
+            self.decoders[name] = decoder
+        self.executor = executor
+        self._results = queue.SimpleQueue()
+        self._pending = 0
+        self._pending_lock = threading.Condition()
+
+    def submit(self, packet:RxPacket):
+        """Decodes a packet with all decoders.
+
+        Args:
+            packet (RxPacket): The received packet.
+        """
+        for name, decoder in self.decoders.items():
+            if self.executor is None:
+                self._add_result(name, packet, self._run_inline(name, decoder, packet))
+                continue
+            with self._pending_lock:
+                self._pending += 1
+            future = self.executor.submit(_decode, decoder, packet)
+            future.add_done_callback(lambda future, name=name: self._on_done(name, packet, future))
+
+    def _run_inline(self, name, decoder, packet):
+        try:
+            return decoder.decode(packet)
+        except Exception:
+            logger.exception(f"Decoder {name} failed")
+            return None
+
+    def _on_done(self, name, packet, future):
+        try:
+            if future.exception() is not None:
+                logger.error(f"Decoder {name} failed: {future.exception()!r}")
+            else:
+                self._add_result(name, packet, future.result())
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+                self._pending_lock.notify_all()
+
+    def _add_result(self, name, packet, values):
+        if values is not None:
+            self._results.put(DecodeResult(name, values, packet))
+
+    @property
+    def pending(self) -> int:
+        """Number of decodes still running in the executor.
+        """
+        with self._pending_lock:
+            return self._pending
+
+    def poll(self) -> list:
+        """Returns the results available now, doesn't wait.
+        """
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def drain(self, timeout:float=None) -> list:
+        """Waits until all submitted packets are decoded and returns the results.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds, None to wait forever.
+        """
+        with self._pending_lock:
+            self._pending_lock.wait_for(lambda: self._pending == 0, timeout)
+        return self.poll()
+
+    def decode(self, packet:RxPacket) -> list:
+        """Decodes a single packet and waits for the results.
+
+        Returns:
+            list: The DecodeResults of the decoders that recognized the packet.
+        """
+        self.submit(packet)
+        return self.drain()
+
+    def results(self, packets):
+        """Decodes packets from an iterable, e.g. Cc1101.receive_bursts(), and yields
+        the results as they become available.
+
+        Args:
+            packets (iterable): The received packets.
+
+        Yields:
+            DecodeResult: The decoded packets.
+        """
+        for packet in packets:
+            self.submit(packet)
+            yield from self.poll()
+        yield from self.drain()
+
+    def close(self):
+        """Waits for the pending decodes. The executor is not shut down.
+        """
+        self.drain()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
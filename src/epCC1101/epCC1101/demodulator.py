@@ -0,0 +1,294 @@
+"""Pulse-width demodulation of asynchronous serial captures.
+
+A capture is a list of edges: the level after each edge and its time in
+nanoseconds. The pulses between the edges are turned into bits in three ways:
+
+    NRZ: every symbol time of a pulse is one bit of its level.
+    PWM: one bit per high pulse, 1 if it is longer than the low pulse after it.
+    PPM: one bit per low gap between high pulses, 1 if the gap is long.
+
+The symbol time is estimated from a histogram of the pulse widths, if it isn't
+known. NRZ decoding follows the clock with a tracking loop, so a transmitter
+running a little fast or slow doesn't accumulate rounding errors over a long
+packet. With numpy installed the per-bit work is vectorized, only the clock
+loop runs once per pulse.
+
+Example:
+    >>> levels, timestamps_ns = [1, 0, 1, 0], [0, 1_000_000, 3_000_000, 4_000_000]
+    >>> demodulator.nrz(levels, timestamps_ns)
+    PackedBits('1001')
+"""
+from epCC1101.bits import PackedBits
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# pulses longer than this many symbols (gaps between packets) don't update the clock
+MAX_TRACKED_SYMBOLS = 8
+# a symbol time fits the pulses, if at most this share of them is off by more than
+# MAX_SYMBOL_ERROR symbols from a whole number of symbols
+MAX_OUTLIERS = 0.05
+MAX_SYMBOL_ERROR = 0.35
+
+
+def pulses(levels, timestamps_ns) -> tuple:
+    """Returns the level and duration of the pulses between the edges.
+
+    The level after the last edge has no end and is not a pulse.
+
+    Args:
+        levels: The level after each edge, a sequence or buffer.
+        timestamps_ns: The time of each edge in nanoseconds, a sequence or buffer.
+
+    Returns:
+        tuple: The levels and the durations in nanoseconds, numpy arrays if numpy
+          is installed, else lists.
+    """
+    if numpy is not None:
+        levels = numpy.asarray(levels, dtype=numpy.uint8)
+        timestamps_ns = numpy.asarray(timestamps_ns, dtype=numpy.int64)
+        return levels[:-1], numpy.diff(timestamps_ns)
+    timestamps_ns = list(timestamps_ns)
+    return list(levels)[:-1], [b - a for a, b in zip(timestamps_ns, timestamps_ns[1:])]
+
+
+def cluster_widths(durations_ns, tolerance:float=0.25, min_count:int=2) -> list:
+    """Groups pulse widths into clusters of similar widths (a histogram with
+    variable bins).
+
+    Sorted widths belong to the same cluster as long as each is less than tolerance
+    longer than the previous one.
+
+    Args:
+        durations_ns: The pulse widths in nanoseconds.
+        tolerance (float): Relative gap between clusters.
+        min_count (int): Clusters with fewer pulses (glitches) are dropped.
+
+    Returns:
+        list: (mean width in ns, number of pulses) tuples, shortest first.
+    """
+    if len(durations_ns) == 0:
+        return []
+    if numpy is not None:
+        widths = numpy.sort(numpy.asarray(durations_ns, dtype=numpy.float64))
+        ids = numpy.concatenate(([0], numpy.cumsum(widths[1:] >= widths[:-1] * (1 + tolerance))))
+        counts = numpy.bincount(ids)
+        means = numpy.bincount(ids, weights=widths) / counts
+        return [(float(mean), int(count)) for mean, count in zip(means, counts) if count >= min_count]
+    widths = sorted(durations_ns)
+    clusters = [[widths[0]]]
+    for previous, width in zip(widths, widths[1:]):
+        if width >= previous * (1 + tolerance):
+            clusters.append([])
+        clusters[-1].append(width)
+    return [(sum(cluster) / len(cluster), len(cluster)) for cluster in clusters if len(cluster) >= min_count]
+
+
+def _outliers(widths, symbol_time:float) -> float:
+    """Returns the share of the widths that aren't close to a whole number of symbols."""
+    if numpy is not None:
+        symbols = widths / symbol_time
+        return float(numpy.mean(numpy.abs(symbols - numpy.rint(symbols)) > MAX_SYMBOL_ERROR))
+    return sum(abs(width / symbol_time - round(width / symbol_time)) > MAX_SYMBOL_ERROR for width in widths) / len(widths)
+
+
+def estimate_symbol_time(durations_ns, tolerance:float=0.25, max_divisor:int=4) -> float:
+    """Estimates the symbol time from the pulse widths.
+
+    The shortest cluster of pulse widths (see cluster_widths) is one or a few
+    symbols long. It is divided by the smallest divisor that fits the pulses: all
+    but MAX_OUTLIERS of them are close to whole numbers of symbols (e.g. 2 for
+    pulses of 2 and 3 symbols). The result is refined by a least squares fit of all
+    pulses.
+
+    Args:
+        durations_ns: The pulse widths in nanoseconds.
+        tolerance (float): See cluster_widths.
+        max_divisor (int): Largest divisor of the shortest cluster width to try.
+
+    Returns:
+        float: The symbol time in nanoseconds, or None without pulses of positive width.
+    """
+    # pulses of width 0 (edges with the same timestamp) have no symbol time
+    if numpy is not None:
+        durations_ns = numpy.asarray(durations_ns, dtype=numpy.float64)
+        durations_ns = durations_ns[durations_ns > 0]
+    else:
+        durations_ns = [duration for duration in durations_ns if duration > 0]
+    clusters = cluster_widths(durations_ns, tolerance) or cluster_widths(durations_ns, tolerance, min_count=1)
+    if not clusters:
+        return None
+    shortest = clusters[0][0]
+    # gaps between packets are no multiples of the symbol time
+    limit = shortest * MAX_TRACKED_SYMBOLS
+    if numpy is not None:
+        widths = numpy.asarray(durations_ns, dtype=numpy.float64)
+        widths = widths[(widths <= limit) & (widths >= shortest / (1 + tolerance))]
+    else:
+        widths = [width for width in durations_ns if shortest / (1 + tolerance) <= width <= limit]
+    outliers = {divisor: _outliers(widths, shortest / divisor) for divisor in range(1, max_divisor + 1)}
+    divisor = next((divisor for divisor, share in outliers.items() if share <= MAX_OUTLIERS), None)
+    if divisor is None:
+        divisor = min(outliers, key=outliers.get)
+    symbol_time = shortest / divisor
+    # least squares: sum(width * symbols) / sum(symbols ** 2)
+    if numpy is not None:
+        symbols = numpy.maximum(1, numpy.rint(widths / symbol_time))
+        return float(numpy.dot(widths, symbols) / numpy.dot(symbols, symbols))
+    symbols = [max(1, round(width / symbol_time)) for width in widths]
+    return sum(width * n for width, n in zip(widths, symbols)) / sum(n * n for n in symbols)
+
+
+def recover_clock(durations_ns, symbol_time_ns:float, gain:float=0.01, phase_gain:float=0.3) -> tuple:
+    """Returns the number of symbols of each pulse.
+
+    A second order loop (PLL) follows the clock of the transmitter. At each edge,
+    the phase error is the distance of the edge from the nearest boundary of the
+    recovered symbol clock. A fraction phase_gain of it moves the clock, so edge
+    jitter is averaged out. A fraction gain of the error per symbol corrects the
+    symbol time, so a transmitter running a little fast or slow is followed.
+
+    An edge less than half a symbol after the last one (a glitch) gives its pulse 0
+    symbols, its time is added to the next pulse. After a gap of more than
+    MAX_TRACKED_SYMBOLS the clock restarts at the next edge.
+
+    Args:
+        durations_ns: The pulse widths in nanoseconds.
+        symbol_time_ns (float): The initial symbol time.
+        gain (float): Loop gain of the symbol time, 0 keeps it fixed.
+        phase_gain (float): Loop gain of the phase, below 1.
+
+    Returns:
+        tuple: The symbol counts (numpy array or list) and the final symbol time.
+    """
+    if numpy is not None and isinstance(durations_ns, numpy.ndarray):
+        durations_ns = durations_ns.tolist()
+    counts = []
+    edge = 0.0
+    boundary = 0.0
+    for duration in durations_ns:
+        edge += duration
+        n = round((edge - boundary) / symbol_time_ns)
+        if n > MAX_TRACKED_SYMBOLS:
+            boundary = edge
+        elif n > 0:
+            error = edge - boundary - n * symbol_time_ns
+            boundary += n * symbol_time_ns + phase_gain * error
+            symbol_time_ns += gain * error / n
+        counts.append(n)
+    if numpy is not None:
+        counts = numpy.asarray(counts, dtype=numpy.int64)
+    return counts, symbol_time_ns
+
+
+def nrz(levels, timestamps_ns, symbol_time_ns:float=None, gain:float=0.01, phase_gain:float=0.3) -> PackedBits:
+    """Demodulates NRZ: every symbol time of a pulse is one bit of its level.
+
+    Args:
+        levels: The level after each edge.
+        timestamps_ns: The time of each edge in nanoseconds.
+        symbol_time_ns (float): The symbol time, default estimate_symbol_time.
+        gain (float): See recover_clock.
+        phase_gain (float): See recover_clock.
+
+    Returns:
+        PackedBits: The bits, from the first to the last edge, empty if the symbol
+            time can't be estimated.
+    """
+    pulse_levels, durations = pulses(levels, timestamps_ns)
+    if len(durations) == 0:
+        return PackedBits(b"", 0)
+    if symbol_time_ns is None:
+        symbol_time_ns = estimate_symbol_time(durations)
+        if symbol_time_ns is None:
+            return PackedBits(b"", 0)
+    counts, _ = recover_clock(durations, symbol_time_ns, gain, phase_gain)
+    if numpy is not None:
+        bits = numpy.repeat(pulse_levels.astype(bool), counts)
+        return PackedBits(numpy.packbits(bits).tobytes(), len(bits))
+    return PackedBits.from_bits("".join(("1" if level else "0") * n for level, n in zip(pulse_levels, counts)))
+
+
+def _high_low_pairs(levels, timestamps_ns):
+    """Returns the widths of the high pulses and of the low pulses after them, a
+    missing low pulse (at the end) has width 0."""
+    pulse_levels, durations = pulses(levels, timestamps_ns)
+    if numpy is not None:
+        durations = durations.astype(numpy.float64)
+        high = numpy.flatnonzero(pulse_levels)
+        following = high + 1
+        low = numpy.zeros(len(high))
+        valid = following < len(durations)
+        low[valid] = durations[following[valid]]
+        return durations[high], low
+    high, low = [], []
+    for i, level in enumerate(pulse_levels):
+        if level:
+            high.append(durations[i])
+            low.append(durations[i + 1] if i + 1 < len(durations) else 0)
+    return high, low
+
+
+def pwm(levels, timestamps_ns) -> PackedBits:
+    """Demodulates PWM: one bit per high pulse, 1 if it is longer than half the
+    period.
+
+    The period is the high pulse plus the low pulse after it. After the last high
+    pulse and before gaps (lows longer than twice the median period) the median
+    period is used.
+
+    Args:
+        levels: The level after each edge.
+        timestamps_ns: The time of each edge in nanoseconds.
+
+    Returns:
+        PackedBits: One bit per high pulse.
+    """
+    high, low = _high_low_pairs(levels, timestamps_ns)
+    if len(high) == 0:
+        return PackedBits(b"", 0)
+    if numpy is not None:
+        periods = high + low
+        complete = low > 0
+        median = numpy.median(periods[complete]) if complete.any() else 2 * numpy.median(high)
+        periods = numpy.where(complete & (periods <= 2 * median), periods, median)
+        bits = high * 2 > periods
+        return PackedBits(numpy.packbits(bits).tobytes(), len(bits))
+    periods = sorted(h + l for h, l in zip(high, low) if l > 0)
+    median = periods[len(periods) // 2] if periods else 2 * sorted(high)[len(high) // 2]
+    return PackedBits.from_bits([h * 2 > (h + l if 0 < h + l <= 2 * median and l > 0 else median) for h, l in zip(high, low)])
+
+
+def ppm(levels, timestamps_ns, tolerance:float=0.25) -> PackedBits:
+    """Demodulates PPM: one bit per low gap between high pulses, 1 if the gap is
+    long.
+
+    The gap widths are clustered, the threshold lies between the two most frequent
+    clusters. Gaps longer than twice the long cluster separate packets and are no bits.
+
+    Args:
+        levels: The level after each edge.
+        timestamps_ns: The time of each edge in nanoseconds.
+        tolerance (float): See cluster_widths.
+
+    Returns:
+        PackedBits: One bit per gap.
+    """
+    _, gaps = _high_low_pairs(levels, timestamps_ns)
+    gaps = [gap for gap in (gaps.tolist() if numpy is not None else gaps) if gap > 0]
+    clusters = sorted(cluster_widths(gaps, tolerance, min_count=1), key=lambda cluster: -cluster[1])[:2]
+    if not clusters:
+        return PackedBits(b"", 0)
+    short, long = sorted(width for width, _ in clusters) if len(clusters) == 2 else (clusters[0][0], clusters[0][0] * 2)
+    threshold = (short + long) / 2
+    if numpy is not None:
+        gaps = numpy.asarray(gaps)
+        gaps = gaps[gaps <= 2 * long]
+        bits = gaps > threshold
+        return PackedBits(numpy.packbits(bits).tobytes(), len(bits))
+    return PackedBits.from_bits([gap > threshold for gap in gaps if gap <= 2 * long])
+
+
+SCHEMES = {"nrz": nrz, "pwm": pwm, "ppm": ppm}
@@ -1,8 +1,92 @@
 
 from abc import abstractmethod
+from collections import namedtuple
+from contextlib import nullcontext
+import time
+import epCC1101.addresses as addresses
+
+
+class ChipStatus(namedtuple("ChipStatus", ["chip_ready", "state", "fifo_bytes"])):
+    """Parsed chip status byte, see 10.1 Chip Status Byte.
+
+    Attributes:
+        chip_ready (bool): False while the crystal is not running (CHIP_RDYn high).
+        state (int): Main state, one of addresses.STATUS_STATE_*.
+        fifo_bytes (int): Bytes in the RX FIFO after a read access, free bytes in the
+            TX FIFO after a write access. Saturates at 15.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_byte(cls, status:int) -> "ChipStatus":
+        return cls(
+            status & addresses.STATUS_CHIP_RDYN_MASK == 0,
+            (status & addresses.STATUS_STATE_MASK) >> 4,
+            status & addresses.STATUS_FIFO_BYTES_MASK)
+
+
+class SpiTransaction:
+    """Collects several SPI operations and executes them together.
+
+    The operations are executed in the order they were added. Drivers may combine
+    them into as few SPI transfers as the CC1101 allows (command strobes and single
+    register accesses can follow each other while CSn stays low, a burst access
+    ends the transfer).
+
+    Example:
+        >>> results = driver.transaction().command_strobe(addresses.SFTX).command_strobe(addresses.STX).execute()
+    """
+    def __init__(self, driver:"Abstract_Driver"):
+        self._driver = driver
+        self._operations = []
+        self.results = None
+
+    def read_byte(self, register:int):
+        self._operations.append(("read_byte", (register,)))
+        return self
+
+    def read_status_register(self, register:int):
+        self._operations.append(("read_status_register", (register,)))
+        return self
+
+    def read_burst(self, register:int, length:int):
+        self._operations.append(("read_burst", (register, length)))
+        return self
+
+    def command_strobe(self, register:int):
+        self._operations.append(("command_strobe", (register,)))
+        return self
+
+    def write_burst(self, register:int, data:bytes):
+        self._operations.append(("write_burst", (register, data)))
+        return self
+
+    def execute(self) -> list:
+        """Executes all queued operations.
+
+        Returns:
+            list: The result of each operation, in the order the operations were added.
+        """
+        self.results = self._driver.execute_transaction(self._operations)
+        self._operations = []
+        return self.results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+        return False
+
+
 class Abstract_Driver:
     gdo0 = None
     gdo2 = None
+    # epCC1101.tracing.Tracer, records SPI transfers and state transitions if set
+    tracer = None
+    # chip status byte of the last access, None if the driver doesn't know it
+    last_status = None
 
     @abstractmethod
     def __init__(self, spi_bus:int=0, cs_pin:int=0, spi_speed_hz:int=55700, gdo0:int=23, gdo1:int=None, gdo2:int=None):
@@ -20,9 +104,63 @@ class Abstract_Driver:
     def read_burst(self, register:int, length:int):
         return []
     
+    def read_burst_into(self, register:int, buffer):
+        """Reads len(buffer) bytes in burst mode into a preallocated buffer.
+
+        Drivers that can fill the buffer without intermediate lists override this.
+
+        Args:
+            register (int): The register to read from.
+            buffer (bytearray | memoryview): Writable buffer, filled in place.
+
+        Returns:
+            int: Number of bytes read.
+        """
+        data = self.read_burst(register, len(buffer))
+        buffer[:len(data)] = bytes(data)
+        return len(data)
+
     @abstractmethod
     def command_strobe(self, register:int):
-        pass
+        """Sends a command strobe.
+
+        Returns:
+            int: The chip status byte.
+        """
+        return 0
+
+    @property
+    def chip_status(self) -> ChipStatus:
+        """The parsed status byte of the last access, without any SPI traffic.
+
+        After a burst write, this is the status of the last byte written, i.e. the
+        free space in the TX FIFO before that byte was written.
+
+        Returns:
+            ChipStatus: The chip status, or None if it is not known.
+        """
+        if self.last_status is None:
+            return None
+        return ChipStatus.from_byte(self.last_status)
+
+    def read_chip_status(self, read:bool=False) -> ChipStatus:
+        """Sends a SNOP strobe to get the chip status byte, a single byte transfer.
+
+        Args:
+            read (bool): If True, fifo_bytes is the fill level of the RX FIFO,
+                otherwise the free space in the TX FIFO.
+
+        Returns:
+            ChipStatus: The chip status.
+        """
+        return ChipStatus.from_byte(self.command_strobe(addresses.SNOP | (addresses.SPI_READ_MASK if read else addresses.SPI_WRITE_MASK)))
+
+    def sleep(self, seconds:float):
+        """Waits between two polls of the chip.
+
+        Emulated drivers override this to advance their simulated time.
+        """
+        time.sleep(seconds)
 
     @abstractmethod
     def write_burst(self, register:int, data:bytes):
@@ -62,4 +200,70 @@ class Abstract_Driver:
     
     @abstractmethod
     def synchronous_serial_write(self, clock_pin_number:int, data_pin_number:int, data):
-        return []
\ No newline at end of file
+        return []
+
+    def asynchronous_serial_write_edges(self, data_pin_number:int, edges:list):
+        """Transmits an edge list in asynchronous serial mode.
+
+        Args:
+            data_pin_number (int): Serial data pin.
+            edges (list): (level, duration in nanoseconds) of each symbol.
+
+        Returns:
+            TransmitReport: The timing of the edges, see rust_rpi_cc1101_driver.
+        """
+        raise NotImplementedError("Edge list transmission is not supported by this driver")
+
+    def start_background_capture(self, threshold_pin_number:int, data_pin_number:int, synchronous:bool=False,
+                                 max_same_bits:int=16, capacity:int=65536):
+        """Starts capturing the serial data continuously in a background thread.
+
+        Args:
+            threshold_pin_number (int): Carrier sense pin (asynchronous) or serial clock
+                pin (synchronous).
+            data_pin_number (int): Serial data pin.
+            synchronous (bool): Capture bits in synchronous serial mode instead of edges.
+            max_same_bits (int): Synchronous serial mode only, a burst ends after this
+                many equal bits in a row.
+            capacity (int): Size of the ring buffer in entries (edges or bits).
+
+        Returns:
+            BackgroundCapture: Iterable of the captured bursts, see rust_rpi_cc1101_driver.
+        """
+        raise NotImplementedError("Background capture is not supported by this driver")
+
+    def lock(self):
+        """Returns a context manager that holds the SPI bus for a sequence of accesses.
+
+        Drivers sharing a bus with other radios return their bus arbiter, so that
+        e.g. reading RXBYTES and draining the RX FIFO isn't interleaved with the
+        traffic of another radio. The default does no locking.
+
+        Example:
+            >>> with driver.lock():
+            ...     count = driver.read_status_register(addresses.RXBYTES)
+            ...     data = driver.read_burst(addresses.RXFIFO, count)
+        """
+        return nullcontext()
+
+    def transaction(self) -> SpiTransaction:
+        """Creates a new transaction to batch several SPI operations.
+
+        Returns:
+            SpiTransaction: The transaction builder.
+        """
+        return SpiTransaction(self)
+
+    def execute_transaction(self, operations:list) -> list:
+        """Executes a list of operations, queued by a SpiTransaction.
+
+        The default implementation executes each operation on its own. Drivers
+        override this to combine the operations into fewer SPI transfers.
+
+        Args:
+            operations (list): List of (method name, arguments) tuples.
+
+        Returns:
+            list: The result of each operation.
+        """
+        return [getattr(self, name)(*args) for name, args in operations]
@@ -0,0 +1,760 @@
+import bisect
+import logging
+import epCC1101.addresses as addresses
+from epCC1101.configurator import Cc1101Configurator
+from epCC1101.driver import Abstract_Driver
+from epCC1101.stubs import GPIO
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# see "Table 43: Configuration Registers Overview", reset values
+DEFAULT_REGISTERS = [0x29, 0x2E, 0x3F, 0x07, 0xD3, 0x91, 0xFF, 0x04, 0x45, 0x00, 0x00, 0x0F, 0x00, 0x1E, 0xC4, 0xEC, 0x8C, 0x22, 0x02, 0x22, 0xF8, 0x47, 0x07, 0x30, 0x04, 0x76, 0x6C, 0x03, 0x40, 0x91, 0x87, 0x6B, 0xF8, 0x56, 0x10, 0xA9, 0x0A, 0x20, 0x0D, 0x41, 0x00, 0x59, 0x7F, 0x3F, 0x88, 0x31, 0x0B]
+DEFAULT_PATABLE = [0xC6, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]
+
+FIFO_SIZE = addresses.FIFO_SIZE
+
+# see 19.6 Frequency Synthesizer Calibration and Table 34: State Transition Timing
+CALIBRATION_TIME_S = 721e-6
+SETTLING_TIME_S = 88.4e-6
+
+# see Table 31: Event0 Timeout Values, C(RX_TIME, WOR_RES) in us at 26 MHz
+RX_TIMEOUT_FACTORS = [
+    [3.6058, 1.8029, 0.9014, 0.4507, 0.2254, 0.1127, 0.0563],
+    [18.0288, 9.0144, 4.5072, 2.2536, 1.1268, 0.5634, 0.2817],
+    [32.4519, 16.2260, 8.1130, 4.0565, 2.0282, 1.0141, 0.5071],
+    [46.8750, 23.4375, 11.7188, 5.8594, 2.9297, 1.4648, 0.7324],
+]
+
+# see 10.1 Chip Status Byte
+CHIP_STATUS_STATES = {
+    addresses.MARCSTATE_IDLE: addresses.STATUS_STATE_IDLE,
+    addresses.MARCSTATE_RX: addresses.STATUS_STATE_RX,
+    addresses.MARCSTATE_RX_END: addresses.STATUS_STATE_RX,
+    addresses.MARCSTATE_RX_RST: addresses.STATUS_STATE_RX,
+    addresses.MARCSTATE_TX: addresses.STATUS_STATE_TX,
+    addresses.MARCSTATE_TX_END: addresses.STATUS_STATE_TX,
+    addresses.MARCSTATE_FSTXON: addresses.STATUS_STATE_FSTXON,
+    addresses.MARCSTATE_RXFIFO_OVERFLOW: addresses.STATUS_STATE_RXFIFO_OVERFLOW,
+    addresses.MARCSTATE_TXFIFO_UNDERFLOW: addresses.STATUS_STATE_TXFIFO_UNDERFLOW,
+}
+
+
+class Frame:
+    """A packet on air, as seen after the sync word.
+    """
+    def __init__(self, sync_time:float, data_rate:float, channel:tuple, sync_word:tuple, crc:bool, rssi:int=0x30, lqi:int=0x10, corrupt:bool=False):
+        self.sync_time = sync_time
+        self.data_rate = data_rate
+        self.channel = channel
+        self.sync_word = sync_word
+        self.crc = crc
+        self.rssi = rssi
+        self.lqi = lqi
+        self.corrupt = corrupt
+        self.data = bytearray()
+        self.complete = False
+        self.end_time = None
+
+    def __repr__(self):
+        return f"Frame(sync_time={self.sync_time:.6f}, data={self.data.hex(' ')}, complete={self.complete})"
+
+
+class Medium:
+    """Simulated time and the air interface shared by one or more emulated chips.
+
+    All chips on the same medium see the frames of each other, if frequency, channel,
+    data rate and sync word match.
+    """
+    def __init__(self):
+        self.now = 0.0
+        self.chips = []
+        self.frames = []
+        self._sync_times = []
+
+    def add_frame(self, frame:Frame):
+        i = bisect.bisect_right(self._sync_times, frame.sync_time)
+        self._sync_times.insert(i, frame.sync_time)
+        self.frames.insert(i, frame)
+
+    def advance(self, t:float):
+        """Advances the simulated time to t, processing the events of all chips in order.
+        """
+        while True:
+            chip = None
+            event_time = None
+            for candidate in self.chips:
+                candidate_time = candidate._next_event_time()
+                if candidate_time is not None and candidate_time <= t and (event_time is None or candidate_time < event_time):
+                    chip = candidate
+                    event_time = candidate_time
+            if chip is None:
+                break
+            self.now = max(self.now, event_time)
+            chip._process_event(event_time)
+        self.now = max(self.now, t)
+
+
+class Cc1101Emulator:
+    """Register-level model of the CC1101.
+
+    Emulated are the configuration registers and PA table, the 64 byte RX and TX FIFOs
+    with overflow and underflow, the main radio control state machine (MCSM0/1/2),
+    packet handling (fixed, variable and infinite length, address check, CRC,
+    append status) and the GDOx signals. The time is simulated, bytes are sent and
+    received according to get_data_rate_baud().
+    """
+    def __init__(self, medium:Medium=None, fosc:float=26e6):
+        self.medium = medium if medium is not None else Medium()
+        self.medium.chips.append(self)
+        self.configurator = Cc1101Configurator(
+            preset={"name": "emulator", "registers": list(DEFAULT_REGISTERS), "patable": list(DEFAULT_PATABLE)},
+            fosc=fosc)
+        self._reset()
+
+    def _reset(self):
+        self.configurator._registers[:] = DEFAULT_REGISTERS
+        self.configurator._patable[:] = DEFAULT_PATABLE
+        self.marc_state = addresses.MARCSTATE_IDLE
+        self.rx_fifo = bytearray()
+        self.tx_fifo = bytearray()
+        self.rx_overflows = 0
+        self.tx_underflows = 0
+        self._crc_ok_flag = False
+        self._last_frame_time = self.medium.now
+        self._rx_start = None
+        self._rx_timeout = None
+        self._rx = None
+        self._tx_next = None
+        self._tx_frame = None
+        self._tx_end = None
+        self._tx_waiting = False
+
+    @property
+    def registers(self) -> list:
+        return self.configurator._registers
+
+    @property
+    def patable(self) -> list:
+        return self.configurator._patable
+
+    @property
+    def now(self) -> float:
+        return self.medium.now
+
+    # register access
+
+    def read_register(self, register:int) -> int:
+        self.medium.advance(self.medium.now)
+        if register <= addresses.TEST0:
+            return self.registers[register]
+        if register == addresses.PATABLE:
+            return self.patable[0]
+        if register == addresses.RXFIFO:
+            return self._pop_rx_fifo()
+        return 0
+
+    def write_register(self, register:int, value:int):
+        self.medium.advance(self.medium.now)
+        if register <= addresses.TEST0:
+            self.registers[register] = value & 0xFF
+        elif register == addresses.PATABLE:
+            self.patable[0] = value & 0xFF
+        elif register == addresses.TXFIFO:
+            self._push_tx_fifo(value)
+
+    def read_status_register(self, register:int) -> int:
+        self.medium.advance(self.medium.now)
+        if register == addresses.PARTNUM:
+            return 0x00
+        if register == addresses.VERSION:
+            return 0x14
+        if register == addresses.LQI:
+            return (self._rx.frame.lqi if self._rx is not None else 0x7F) | (0x80 if self._crc_ok_flag else 0x00)
+        if register == addresses.RSSI:
+            return self._rx.frame.rssi if self._rx is not None else 0x90
+        if register == addresses.MARCSTATE:
+            return self.marc_state
+        if register == addresses.PKTSTATUS:
+            return (self._crc_ok_flag << 7) | (self._carrier_sense() << 6) | \
+                ((not self._carrier_sense()) << 4) | ((self._rx is not None) << 3) | \
+                (self.get_gdo_level(2) << 2) | self.get_gdo_level(0)
+        if register == addresses.TXBYTES:
+            return ((self.marc_state == addresses.MARCSTATE_TXFIFO_UNDERFLOW) << 7) | len(self.tx_fifo)
+        if register == addresses.RXBYTES:
+            return ((self.marc_state == addresses.MARCSTATE_RXFIFO_OVERFLOW) << 7) | len(self.rx_fifo)
+        return 0
+
+    def read_burst(self, register:int, length:int) -> list:
+        self.medium.advance(self.medium.now)
+        if register == addresses.RXFIFO:
+            return [self._pop_rx_fifo() for _ in range(length)]
+        if register == addresses.PATABLE:
+            return self.patable[0:length]
+        return [self.registers[min(register+i, addresses.TEST0)] for i in range(length)]
+
+    def write_burst(self, register:int, data):
+        self.medium.advance(self.medium.now)
+        if register == addresses.TXFIFO:
+            for value in data:
+                self._push_tx_fifo(value)
+        elif register == addresses.PATABLE:
+            self.patable[0:len(data)] = list(data)[0:8]
+        else:
+            for i, value in enumerate(data):
+                if register + i <= addresses.TEST0:
+                    self.registers[register+i] = value & 0xFF
+
+    def command_strobe(self, register:int):
+        self.medium.advance(self.medium.now)
+        state = self.marc_state
+        if register == addresses.SRES:
+            self._reset()
+        elif register == addresses.SIDLE:
+            self._enter_idle()
+        elif register == addresses.SRX:
+            if state in [addresses.MARCSTATE_IDLE, addresses.MARCSTATE_FSTXON, addresses.MARCSTATE_TX]:
+                self._enter_rx()
+        elif register == addresses.STX:
+            if state in [addresses.MARCSTATE_IDLE, addresses.MARCSTATE_FSTXON]:
+                self._enter_tx()
+            elif state == addresses.MARCSTATE_RX and (self._get_cca_mode() == 0 or not self._carrier_sense()):
+                self._enter_tx()
+        elif register == addresses.SFSTXON:
+            if state == addresses.MARCSTATE_IDLE:
+                self._enter_fstxon()
+        elif register == addresses.SFRX:
+            if state in [addresses.MARCSTATE_IDLE, addresses.MARCSTATE_RXFIFO_OVERFLOW]:
+                self.rx_fifo.clear()
+                self._crc_ok_flag = False
+                self.marc_state = addresses.MARCSTATE_IDLE
+        elif register == addresses.SFTX:
+            if state in [addresses.MARCSTATE_IDLE, addresses.MARCSTATE_TXFIFO_UNDERFLOW]:
+                self.tx_fifo.clear()
+                self.marc_state = addresses.MARCSTATE_IDLE
+        elif register == addresses.SPWD:
+            if state == addresses.MARCSTATE_IDLE:
+                self.marc_state = addresses.MARCSTATE_SLEEP
+
+    def get_chip_status(self, read:bool) -> int:
+        """Returns the chip status byte, see 10.1 Chip Status Byte.
+
+        Args:
+            read (bool): If True, FIFO_BYTES_AVAILABLE is the RX FIFO level,
+              otherwise the free space in the TX FIFO.
+        """
+        if self.marc_state in CHIP_STATUS_STATES:
+            state = CHIP_STATUS_STATES[self.marc_state]
+        elif addresses.MARCSTATE_VCOON_MC <= self.marc_state <= addresses.MARCSTATE_ENDCAL:
+            state = addresses.STATUS_STATE_CALIBRATE
+        else:
+            state = addresses.STATUS_STATE_SETTLING
+        if read:
+            fifo_bytes = len(self.rx_fifo)
+        else:
+            fifo_bytes = FIFO_SIZE - len(self.tx_fifo)
+        return (state << 4) | min(fifo_bytes, 15)
+
+    # air interface
+
+    def inject(self, data:bytes, delay:float=0.0, crc:bool=None, rssi:int=0x30, lqi:int=0x10, corrupt:bool=False) -> Frame:
+        """Puts a frame on air, as if it was sent by another chip with the same settings.
+
+        Args:
+            data (bytes): The bytes after the sync word, including length and address byte.
+            delay (float): Seconds from now until the preamble starts.
+            crc (bool): Whether the frame carries a CRC. Defaults to the own CRC setting.
+            rssi (int): Raw RSSI value reported for the frame.
+            lqi (int): LQI value reported for the frame.
+            corrupt (bool): If True, the CRC check fails.
+
+        Returns:
+            Frame: The frame put on air.
+        """
+        frame = Frame(
+            sync_time=self.medium.now + delay + self._get_preamble_time(),
+            data_rate=self.configurator.get_data_rate_baud(),
+            channel=self._get_channel(),
+            sync_word=self._get_sync_word(),
+            crc=self.configurator.get_crc_enable() if crc is None else crc,
+            rssi=rssi,
+            lqi=lqi,
+            corrupt=corrupt)
+        frame.data = bytearray(data)
+        frame.complete = True
+        frame.end_time = frame.sync_time + (len(data) + (2 if frame.crc else 0)) * 8 / frame.data_rate
+        self.medium.add_frame(frame)
+        return frame
+
+    def get_gdo_level(self, gdo:int) -> int:
+        """Returns the level of GDO0, GDO1 or GDO2, see Table 41: GDOx Signal Selection.
+        """
+        self.medium.advance(self.medium.now)
+        config = self.configurator.get_GDOx_config(gdo)
+        level = 0
+        rx_threshold, tx_threshold = self._get_fifo_thresholds()
+        if config == 0x00:
+            level = len(self.rx_fifo) >= rx_threshold
+        elif config == 0x01:
+            level = len(self.rx_fifo) >= rx_threshold or (len(self.rx_fifo) > 0 and self._rx is None)
+        elif config == 0x02:
+            level = len(self.tx_fifo) >= tx_threshold
+        elif config == 0x03:
+            level = len(self.tx_fifo) >= FIFO_SIZE
+        elif config == 0x04:
+            level = self.marc_state == addresses.MARCSTATE_RXFIFO_OVERFLOW
+        elif config == 0x05:
+            level = self.marc_state == addresses.MARCSTATE_TXFIFO_UNDERFLOW
+        elif config == 0x06:
+            level = self._rx is not None or self._tx_frame is not None
+        elif config == 0x07:
+            level = self._crc_ok_flag
+        elif config == 0x09:
+            level = self.marc_state == addresses.MARCSTATE_RX and not self._carrier_sense()
+        elif config == 0x0E:
+            level = self._carrier_sense()
+        return int(bool(level) ^ self.configurator.get_GDOx_inverted(gdo))
+
+    # state machine
+
+    def _enter_idle(self):
+        self.marc_state = addresses.MARCSTATE_IDLE
+        self._rx = None
+        self._rx_start = None
+        self._rx_timeout = None
+        if self._tx_frame is not None:
+            self._tx_frame.complete = True
+            self._tx_frame.end_time = self.medium.now
+        self._tx_frame = None
+        self._tx_next = None
+        self._tx_end = None
+        self._tx_waiting = False
+
+    def _enter_fstxon(self):
+        self._enter_idle()
+        self.marc_state = addresses.MARCSTATE_FSTXON
+
+    def _get_settling_time(self) -> float:
+        settling_time = SETTLING_TIME_S
+        if self.marc_state == addresses.MARCSTATE_IDLE and self._get_fs_autocal() == 1:
+            settling_time += CALIBRATION_TIME_S
+        return settling_time
+
+    def _enter_rx(self):
+        start = self.medium.now + self._get_settling_time()
+        self._enter_idle()
+        self.marc_state = addresses.MARCSTATE_RX
+        self._rx_start = start
+        self._last_frame_time = max(self._last_frame_time, start - self._get_preamble_time())
+        timeout = self._get_rx_timeout()
+        self._rx_timeout = start + timeout if timeout is not None else None
+
+    def _enter_tx(self):
+        start = self.medium.now + self._get_settling_time()
+        self._enter_idle()
+        self.marc_state = addresses.MARCSTATE_TX
+        self._tx_next = start + self._get_preamble_time()
+
+    def _leave_rx(self):
+        mode = self._get_rxoff_mode()
+        if mode == 0:
+            self._enter_idle()
+        elif mode == 1:
+            self._enter_fstxon()
+        elif mode == 2:
+            self._enter_tx()
+        else:
+            self._rx = None
+            self._rx_start = self.medium.now
+            self._rx_timeout = None
+
+    def _leave_tx(self):
+        mode = self._get_txoff_mode()
+        if mode == 0:
+            self._enter_idle()
+        elif mode == 1:
+            self._enter_fstxon()
+        elif mode == 2:
+            self._tx_frame = None
+            self._tx_end = None
+            self._tx_next = self.medium.now + self._get_preamble_time()
+        else:
+            self._enter_rx()
+
+    # event processing
+
+    def _next_event_time(self) -> float:
+        times = []
+        if self.marc_state == addresses.MARCSTATE_RX:
+            if self._rx is not None:
+                times.append(self._rx.next_time)
+            else:
+                frame = self._get_next_frame()
+                if frame is not None:
+                    times.append(frame.sync_time)
+                if self._rx_timeout is not None:
+                    times.append(self._rx_timeout)
+        elif self.marc_state == addresses.MARCSTATE_TX:
+            if self._tx_end is not None:
+                times.append(self._tx_end)
+            elif self._tx_next is not None and not self._tx_waiting:
+                times.append(self._tx_next)
+        return min(times) if times else None
+
+    def _process_event(self, t:float):
+        if self.marc_state == addresses.MARCSTATE_RX:
+            if self._rx is not None:
+                self._process_rx_byte(t)
+                return
+            frame = self._get_next_frame()
+            if frame is not None and frame.sync_time == t:
+                self._last_frame_time = t
+                self._start_rx_packet(frame)
+            elif self._rx_timeout is not None and self._rx_timeout <= t:
+                self._enter_idle()
+        elif self.marc_state == addresses.MARCSTATE_TX:
+            if self._tx_end is not None and self._tx_end <= t:
+                self._finish_tx_packet(t)
+            else:
+                self._process_tx_byte(t)
+
+    def _get_next_frame(self) -> Frame:
+        sync_times = self.medium._sync_times
+        i = max(bisect.bisect_right(sync_times, self._last_frame_time), bisect.bisect_left(sync_times, self._rx_start))
+        for frame in self.medium.frames[i:i+2]:
+            if frame is not self._tx_frame:
+                return frame
+        return None
+
+    def _start_rx_packet(self, frame:Frame):
+        if frame.channel != self._get_channel() or frame.data_rate != self.configurator.get_data_rate_baud():
+            return
+        if self._get_sync_bytes() > 0 and frame.sync_word != self._get_sync_word():
+            return
+        self._rx = _RxState(frame, len(self.rx_fifo))
+        self._crc_ok_flag = False
+
+    def _abort_rx_packet(self):
+        del self.rx_fifo[self._rx.fifo_start:]
+        self._rx = None
+
+    def _process_rx_byte(self, t:float):
+        rx = self._rx
+        frame = rx.frame
+        if rx.target is not None and rx.index >= rx.target:
+            self._finish_rx_packet()
+            return
+        if rx.index >= len(frame.data):
+            if frame.complete:
+                # transmitter stopped before the expected end of the packet
+                self._abort_rx_packet()
+                self._leave_rx()
+            else:
+                rx.next_time = t + 8 / frame.data_rate
+            return
+
+        value = frame.data[rx.index]
+        length_mode = self.configurator.get_packet_length_mode()
+        if rx.index == 0 and length_mode == 1:
+            if value > self.configurator.get_packet_length():
+                self._abort_rx_packet()
+                return
+            rx.target = value + 1
+        address_index = 1 if length_mode == 1 else 0
+        if rx.index == address_index and self.configurator.get_address_check_mode() != 0:
+            if not self._address_matches(value):
+                self._abort_rx_packet()
+                return
+
+        if len(self.rx_fifo) >= FIFO_SIZE:
+            self.rx_overflows += 1
+            self._rx = None
+            self.marc_state = addresses.MARCSTATE_RXFIFO_OVERFLOW
+            return
+        self.rx_fifo.append(value)
+        rx.index += 1
+
+        if length_mode == 0:
+            packet_length = self.configurator.get_packet_length() or 256
+            if rx.index % 256 == packet_length % 256:
+                rx.target = rx.index
+        if rx.target is not None and rx.index >= rx.target:
+            crc_bytes = 2 if self.configurator.get_crc_enable() else 0
+            rx.next_time = frame.sync_time + (rx.index + crc_bytes) * 8 / frame.data_rate
+        else:
+            rx.next_time = frame.sync_time + (rx.index + 1) * 8 / frame.data_rate
+
+    def _finish_rx_packet(self):
+        frame = self._rx.frame
+        crc_ok = True
+        if self.configurator.get_crc_enable():
+            crc_ok = frame.crc and not frame.corrupt
+            if not crc_ok and self.configurator.get_crc_auto_flush():
+                self._abort_rx_packet()
+                self._leave_rx()
+                return
+        if self.configurator.get_append_status_enabled():
+            for value in [frame.rssi, (frame.lqi & 0x7F) | (crc_ok << 7)]:
+                if len(self.rx_fifo) >= FIFO_SIZE:
+                    self.rx_overflows += 1
+                    self._rx = None
+                    self.marc_state = addresses.MARCSTATE_RXFIFO_OVERFLOW
+                    return
+                self.rx_fifo.append(value)
+        self._crc_ok_flag = crc_ok and self.configurator.get_crc_enable()
+        self._rx = None
+        self._leave_rx()
+
+    def _process_tx_byte(self, t:float):
+        if self._tx_frame is None:
+            if len(self.tx_fifo) == 0:
+                # preamble is sent until the first byte is written to the TX FIFO
+                self._tx_waiting = True
+                return
+            self._tx_frame = Frame(
+                sync_time=t,
+                data_rate=self.configurator.get_data_rate_baud(),
+                channel=self._get_channel(),
+                sync_word=self._get_sync_word(),
+                crc=bool(self.configurator.get_crc_enable()))
+            self._tx_target = None
+            self.medium.add_frame(self._tx_frame)
+
+        frame = self._tx_frame
+        if len(self.tx_fifo) == 0:
+            self.tx_underflows += 1
+            frame.complete = True
+            frame.end_time = t
+            self._tx_frame = None
+            self._tx_next = None
+            self.marc_state = addresses.MARCSTATE_TXFIFO_UNDERFLOW
+            return
+
+        value = self.tx_fifo.pop(0)
+        frame.data.append(value)
+        sent = len(frame.data)
+        length_mode = self.configurator.get_packet_length_mode()
+        if sent == 1 and length_mode == 1:
+            self._tx_target = value + 1
+        if length_mode == 0:
+            packet_length = self.configurator.get_packet_length() or 256
+            if sent % 256 == packet_length % 256:
+                self._tx_target = sent
+
+        if self._tx_target is not None and sent >= self._tx_target:
+            crc_bytes = 2 if frame.crc else 0
+            self._tx_end = frame.sync_time + (sent + crc_bytes) * 8 / frame.data_rate
+            self._tx_next = None
+        else:
+            self._tx_next = frame.sync_time + sent * 8 / frame.data_rate
+
+    def _finish_tx_packet(self, t:float):
+        self._tx_frame.complete = True
+        self._tx_frame.end_time = t
+        self._tx_frame = None
+        self._tx_end = None
+        self._leave_tx()
+
+    def _push_tx_fifo(self, value:int):
+        if len(self.tx_fifo) >= FIFO_SIZE:
+            logger.warning("TX FIFO overflow, byte discarded")
+            return
+        self.tx_fifo.append(value & 0xFF)
+        if self._tx_waiting:
+            self._tx_waiting = False
+            self._tx_next = self.medium.now + self._get_sync_bytes() * 8 / self.configurator.get_data_rate_baud()
+
+    def _pop_rx_fifo(self) -> int:
+        self._crc_ok_flag = False
+        if len(self.rx_fifo) == 0:
+            return 0
+        return self.rx_fifo.pop(0)
+
+    # helpers for register fields
+
+    def _carrier_sense(self) -> bool:
+        return self._rx is not None
+
+    def _address_matches(self, value:int) -> bool:
+        mode = self.configurator.get_address_check_mode()
+        if value == self.configurator.get_address():
+            return True
+        if mode >= 2 and value == 0x00:
+            return True
+        if mode == 3 and value == 0xFF:
+            return True
+        return False
+
+    def _get_channel(self) -> tuple:
+        return tuple(self.registers[addresses.FREQ2:addresses.FREQ0+1]) + (self.registers[addresses.CHANNR],)
+
+    def _get_sync_word(self) -> tuple:
+        return tuple(self.configurator.get_sync_word())
+
+    def _get_sync_bytes(self) -> int:
+        sync_mode = self.configurator.get_sync_mode() & 0x03
+        if sync_mode == 0:
+            return 0
+        if sync_mode == 3:
+            return 4
+        return 2
+
+    def _get_preamble_time(self) -> float:
+        return (self.configurator.get_preamble_length_bytes() + self._get_sync_bytes()) * 8 / self.configurator.get_data_rate_baud()
+
+    def _get_fifo_thresholds(self) -> tuple:
+        fifo_thr = self.registers[addresses.FIFOTHR] & 0x0F
+        return 4 * (fifo_thr + 1), 61 - 4 * fifo_thr
+
+    def _get_cca_mode(self) -> int:
+        return (self.registers[addresses.MCSM1] >> 4) & 0x03
+
+    def _get_rxoff_mode(self) -> int:
+        return (self.registers[addresses.MCSM1] >> 2) & 0x03
+
+    def _get_txoff_mode(self) -> int:
+        return self.registers[addresses.MCSM1] & 0x03
+
+    def _get_fs_autocal(self) -> int:
+        return (self.registers[addresses.MCSM0] >> 4) & 0x03
+
+    def _get_rx_timeout(self) -> float:
+        rx_time = self.registers[addresses.MCSM2] & 0x07
+        if rx_time == 7:
+            return None
+        event0 = (self.registers[addresses.WOREVT1] << 8) | self.registers[addresses.WOREVT0]
+        wor_res = self.registers[addresses.WORCTRL] & 0x03
+        return event0 * RX_TIMEOUT_FACTORS[wor_res][rx_time] * 26e6 / self.configurator._fosc * 1e-6
+
+
+class _RxState:
+    def __init__(self, frame:Frame, fifo_start:int):
+        self.frame = frame
+        self.fifo_start = fifo_start
+        self.index = 0
+        self.target = None
+        self.next_time = frame.sync_time + 8 / frame.data_rate
+
+
+class Driver(Abstract_Driver):
+    """Driver for the emulated CC1101, for testing and benchmarking without hardware.
+
+    Every SPI access advances the simulated time by the time it would take on the bus.
+    wait_for_edge() advances the simulated time until the edge occurs or the timeout
+    expires. The numbers of SPI transactions and bytes are counted.
+
+    Example:
+        >>> driver = Driver(gdo0=23)
+        >>> cc1101 = Cc1101(driver)
+        >>> driver.chip.inject(bytes([3, 1, 2, 3]))
+        >>> packet = cc1101.receive()
+    """
+    chunk_size = 16
+    fifo_rw_interval = 0.01
+
+    def __init__(self, spi_bus:int=0, cs_pin:int=0, spi_speed_hz:int=55700, gdo0:int=23, gdo1:int=None, gdo2:int=None, medium:Medium=None):
+        self.spi_bus = spi_bus
+        self.cs_pin = cs_pin
+        self.spi_speed_hz = spi_speed_hz
+        self.gdo0 = gdo0
+        self.gdo1 = gdo1
+        self.gdo2 = gdo2
+        self.chip = Cc1101Emulator(medium)
+        self.spi_transactions = 0
+        self.spi_bytes = 0
+
+    @property
+    def now(self) -> float:
+        """The simulated time in seconds.
+        """
+        return self.chip.medium.now
+
+    def _spi_access(self, length:int):
+        self.spi_transactions += 1
+        self.spi_bytes += length
+        self.chip.medium.advance(self.chip.medium.now + length * 8 / self.spi_speed_hz)
+
+    def read_byte(self, register:int):
+        self._spi_access(2)
+        self.last_status = self.chip.get_chip_status(True)
+        return self.chip.read_register(register)
+
+    def read_status_register(self, register:int):
+        self._spi_access(2)
+        self.last_status = self.chip.get_chip_status(True)
+        return self.chip.read_status_register(register)
+
+    def read_burst(self, register:int, length:int):
+        self._spi_access(length + 1)
+        self.last_status = self.chip.get_chip_status(True)
+        return self.chip.read_burst(register, length)
+
+    def command_strobe(self, register:int):
+        self._spi_access(1)
+        self.last_status = self.chip.get_chip_status(register & addresses.SPI_READ_MASK != 0)
+        self.chip.command_strobe(register & 0x3F)
+        return self.last_status
+
+    def write_burst(self, register:int, data:bytes):
+        self._spi_access(len(data) + 1)
+        data = list(data)
+        if register == addresses.TXFIFO and len(data) > 0:
+            # the status of the last byte is shifted out before that byte is written
+            self.chip.write_burst(register, data[:-1])
+            self.last_status = self.chip.get_chip_status(False)
+            self.chip.write_burst(register, data[-1:])
+        else:
+            self.last_status = self.chip.get_chip_status(False)
+            self.chip.write_burst(register, data)
+
+    def sleep(self, seconds:float):
+        self.chip.medium.advance(self.chip.medium.now + seconds)
+
+    def set_pin_mode(self, pin:int, mode:int):
+        pass
+
+    def reset_pin_mode(self, pin:int):
+        pass
+
+    def _get_gdo(self, pin:int) -> int:
+        if pin == self.gdo0:
+            return 0
+        if pin == self.gdo1:
+            return 1
+        if pin == self.gdo2:
+            return 2
+        raise ValueError(f"Pin {pin} is not connected to a GDO")
+
+    def wait_for_edge(self, pin:int, edge:int, timeout:int=1000):
+        gdo = self._get_gdo(pin)
+        medium = self.chip.medium
+        deadline = medium.now + timeout / 1000
+        level = self.chip.get_gdo_level(gdo)
+        while True:
+            times = [t for t in [chip._next_event_time() for chip in medium.chips] if t is not None and t <= deadline]
+            medium.advance(min(times) if times else deadline)
+            new_level = self.chip.get_gdo_level(gdo)
+            if new_level != level:
+                if edge == GPIO.BOTH or (edge == GPIO.RISING and new_level == 1) or (edge == GPIO.FALLING and new_level == 0):
+                    return pin
+                level = new_level
+            if not times:
+                return None
+
+    def read_gdo0(self):
+        return self.chip.get_gdo_level(0)
+
+    def read_gdo2(self):
+        return self.chip.get_gdo_level(2)
+
+    def asynchronous_serial_read(self, threshold_pin_number:int, data_pin_number:int, timeout_ms:int):
+        raise NotImplementedError("Asynchronous serial mode is not emulated")
+
+    def asynchronous_serial_write(self, data_pin_number:int, baudrate:int, data):
+        raise NotImplementedError("Asynchronous serial mode is not emulated")
+
+    def synchronous_serial_read(self, clock_pin_number:int, data_pin_number:int, timeout_ms:int, max_same_bits:int=16):
+        raise NotImplementedError("Synchronous serial mode is not emulated")
+
+    def synchronous_serial_write(self, clock_pin_number:int, data_pin_number:int, data):
+        raise NotImplementedError("Synchronous serial mode is not emulated")
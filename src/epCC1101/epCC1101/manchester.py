@@ -0,0 +1,136 @@
+"""Manchester codec.
+
+Each bit is sent as two symbols (half bits): 1 as 10 and 0 as 01, or the other way
+round with inverted=True (IEEE 802.3). Encoding and decoding work on whole bytes with
+lookup tables: a raw byte holds 4 symbols and decodes to a nibble, two raw bytes
+decode to one byte. The tables are applied with bytes.translate and the nibbles are
+combined as one big int, so there is no Python loop per bit or byte.
+
+A symbol 00 or 11 is invalid. It decodes as its first half bit and is marked in the
+error mask, one bit per decoded bit.
+
+Example:
+    >>> raw = manchester.encode(b"\\x5a")
+    >>> raw.hex()
+    '6699'
+    >>> manchester.decode(raw)
+    b'Z'
+"""
+from epCC1101.bits import PackedBits
+
+
+def _nibble_tables():
+    value, errors = bytearray(256), bytearray(256)
+    for raw in range(256):
+        for i in range(4):
+            first = (raw >> (7 - 2 * i)) & 1
+            second = (raw >> (6 - 2 * i)) & 1
+            value[raw] |= first << (3 - i)
+            errors[raw] |= (first == second) << (3 - i)
+    return bytes(value), bytes(errors)
+
+# raw byte (4 symbols) -> decoded nibble / error nibble, for 10 -> 1
+_DECODE_NIBBLE, _ERROR_NIBBLE = _nibble_tables()
+# the same, shifted to the high nibble
+_DECODE_NIBBLE_HIGH = bytes(x << 4 for x in _DECODE_NIBBLE)
+_ERROR_NIBBLE_HIGH = bytes(x << 4 for x in _ERROR_NIBBLE)
+# decoded byte -> 2 raw bytes, for 1 -> 10
+_ENCODE = [int("".join("10" if (byte >> (7 - i)) & 1 else "01" for i in range(8)), 2).to_bytes(2, "big") for byte in range(256)]
+_INVERT = bytes(0xFF - x for x in range(256))
+
+
+def encode(data, inverted:bool=False) -> bytes:
+    """Encodes data, each byte becomes 2 bytes.
+
+    Args:
+        data (bytes | bytearray | memoryview | list): The data to encode.
+        inverted (bool): Encode 1 as 01 and 0 as 10.
+
+    Returns:
+        bytes: The encoded data.
+    """
+    raw = b"".join(map(_ENCODE.__getitem__, bytes(data)))
+    return raw.translate(_INVERT) if inverted else raw
+
+
+def _raw_bytes(data, bit_offset:int):
+    """Returns the raw bytes from bit_offset on, only whole decoded bytes (16 symbols)."""
+    if isinstance(data, PackedBits):
+        length = len(data)
+        data = data.data
+    else:
+        data = bytes(data)
+        length = len(data) * 8
+    assert 0 <= bit_offset <= length, "bit_offset exceeds the data"
+    count = (length - bit_offset) // 16
+    if bit_offset == 0 and length % 16 == 0:
+        return data[:count * 2]
+    x = int.from_bytes(data, "big") >> (len(data) * 8 - bit_offset - count * 16)
+    return (x & ((1 << count * 16) - 1)).to_bytes(count * 2, "big")
+
+
+def _combine(raw:bytes, high_table:bytes, low_table:bytes) -> bytes:
+    count = len(raw) // 2
+    if count == 0:
+        return b""
+    high = int.from_bytes(raw[0::2].translate(high_table), "big")
+    low = int.from_bytes(raw[1::2].translate(low_table), "big")
+    return (high | low).to_bytes(count, "big")
+
+
+def decode_with_errors(data, bit_offset:int=0, inverted:bool=False) -> tuple:
+    """Decodes data and returns the invalid symbols.
+
+    Args:
+        data (bytes | bytearray | memoryview | PackedBits): The raw data.
+        bit_offset (int): Number of bits to skip before the first symbol, see align().
+        inverted (bool): 01 is 1 and 10 is 0.
+
+    Returns:
+        tuple: The decoded bytes and the error mask (bytes), a bit is set in the mask
+            where the symbol of the decoded bit was invalid. Trailing symbols that
+            don't make up a whole byte are dropped.
+    """
+    raw = _raw_bytes(data, bit_offset)
+    decoded = _combine(raw, _DECODE_NIBBLE_HIGH, _DECODE_NIBBLE)
+    if inverted:
+        decoded = decoded.translate(_INVERT)
+    return decoded, _combine(raw, _ERROR_NIBBLE_HIGH, _ERROR_NIBBLE)
+
+
+def decode(data, bit_offset:int=0, inverted:bool=False) -> bytes:
+    """Decodes data, see decode_with_errors.
+
+    Returns:
+        bytes: The decoded bytes.
+    """
+    return decode_with_errors(data, bit_offset, inverted)[0]
+
+
+def count_errors(error_mask:bytes) -> int:
+    """Returns the number of invalid symbols in an error mask.
+    """
+    return bin(int.from_bytes(error_mask, "big")).count("1")
+
+
+def align(data, max_offset:int=1) -> int:
+    """Finds the bit offset with the fewest invalid symbols.
+
+    Args:
+        data (bytes | bytearray | memoryview | PackedBits): The raw data.
+        max_offset (int): Largest offset to try. 1 finds the symbol boundaries, larger
+            values also the byte alignment, if the data starts with invalid symbols.
+
+    Returns:
+        int: The bit offset for decode.
+    """
+    best_offset, best_errors = 0, None
+    for offset in range(max_offset + 1):
+        decoded, errors = decode_with_errors(data, offset)
+        if not decoded:
+            break
+        # compare the error rate, later offsets decode fewer bits
+        error_rate = count_errors(errors) / len(decoded)
+        if best_errors is None or error_rate < best_errors:
+            best_offset, best_errors = offset, error_rate
+    return best_offset
@@ -1,4 +1,12 @@
 from epCC1101.configurator import Cc1101Configurator
+from epCC1101.bits import PackedBits
+import epCC1101.manchester as manchester
+import epCC1101.demodulator as demodulator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 class Protocol:
     def __init__(self):
@@ -48,6 +56,20 @@ class Protocol:
         configurator.set_data_rate_baud(self.data_rate)
         configurator.set_modulation_format(self.modulation_format)
 
+    def decode(self, packet) -> dict:
+        """Decodes a received packet, see epCC1101.decoders.
+
+        Must not change the state of the protocol, decoders run in parallel in
+        thread and process pools.
+
+        Args:
+            packet (RxPacket): The received packet.
+
+        Returns:
+            dict: The logical values, or None if the packet is not of this protocol.
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no decoder")
+
 class Cc1101_Packet_Protocol(Protocol):
     def __init__(self):
         self.packet_length_mode = 0
@@ -122,9 +144,18 @@ class Cc1101_Packet_Protocol(Protocol):
 
 class Princeton25bit_Protocol(Protocol):
     """Protocol for decoding PT2262 packets.
+
+    With numpy installed, decoding is vectorized: the symbols are found by correlating
+    the bitstream with the symbol weights, classified as whole rows of 4 bits and the
+    logical bits are assembled with packbits. parse_many decodes a batch of bitstreams
+    in one pass.
     """
     high_pattern=[1, 1, 1, 0]
     low_pattern=[1, 0, 0, 0]
+    # weights of the bits of a symbol, the value of a symbol is the int of its bits
+    _symbol_weights = [8, 4, 2, 1]
+    # fills up the shorter bitstreams of a batch, no window containing it is a symbol
+    _padding = 16
 
     def __init__(self, address_bits=12, data_bits=8):
         self.address_bits = address_bits
@@ -141,17 +172,23 @@ class Princeton25bit_Protocol(Protocol):
         configurator.set_modulation_format(self.modulation_format)
 
     def _align_bits(self, physical_bits):
-        for i in range(len(physical_bits)):
-            if list(physical_bits[i:i+4]) in [self.high_pattern, self.low_pattern]:
-                return physical_bits[i:]
-        return []
+        physical_bits = PackedBits.from_bits(physical_bits)
+        starts = [i for i in [physical_bits.find(self.high_pattern), physical_bits.find(self.low_pattern)] if i >= 0]
+        if not starts:
+            return PackedBits()
+        return physical_bits[min(starts):]
             
     def _to_logical_bits(self, physical_bits):
+        # compare whole nibbles of the bit string instead of single bits
+        physical_bits = PackedBits.from_bits(physical_bits).to_str()
+        high = "".join(str(x) for x in self.high_pattern)
+        low = "".join(str(x) for x in self.low_pattern)
         logical_bits = []
         for i in range(len(physical_bits)//4):
-            if list(physical_bits[i*4:i*4+4]) == self.high_pattern:
+            nibble = physical_bits[i*4:i*4+4]
+            if nibble == high:
                 logical_bits.append(1)
-            elif list(physical_bits[i*4:i*4+4]) == self.low_pattern:
+            elif nibble == low:
                 logical_bits.append(0)
         return logical_bits
 
@@ -159,16 +196,9 @@ class Princeton25bit_Protocol(Protocol):
         if len(logical_bits) != 25:
             return None
         
-        logical_bytes = []
-        
-        for i in range((len(logical_bits)-1)//8):
-            byte = 0
-            for j in range(8):
-                byte <<= 1
-                byte |= logical_bits[i*8+j]
-            logical_bytes.append(byte)
-        
-        return logical_bytes
+        count = (len(logical_bits)-1)//8
+        x = int("".join("1" if bit else "0" for bit in logical_bits[:count*8]), 2)
+        return list(x.to_bytes(count, "big"))
     
     def _to_logical_values(self, logical_bytes):
         logical_values = {}
@@ -181,7 +211,67 @@ class Princeton25bit_Protocol(Protocol):
         logical_values["data"] = x & (2**self.data_bits-1)
         return logical_values
     
+    def _to_bit_array(self, physical_bits):
+        if isinstance(physical_bits, PackedBits):
+            return numpy.unpackbits(numpy.frombuffer(physical_bits.data, dtype=numpy.uint8), count=len(physical_bits))
+        return numpy.asarray(physical_bits, dtype=numpy.uint8).ravel()
+
+    def _symbol_value(self, pattern):
+        return sum(bit * weight for bit, weight in zip(pattern, self._symbol_weights))
+
+    def _decode_numpy(self, bitstreams):
+        """Decodes a batch of bitstreams, one row per bitstream.
+
+        Returns:
+            tuple: The logical values (or None) and the logical bits of each bitstream.
+        """
+        rows = [self._to_bit_array(bits) for bits in bitstreams]
+        width = max([len(row) for row in rows] + [4])
+        matrix = numpy.full((len(rows), width), self._padding, dtype=numpy.int16)
+        for i, row in enumerate(rows):
+            matrix[i, :len(row)] = row
+        high = self._symbol_value(self.high_pattern)
+        low = self._symbol_value(self.low_pattern)
+
+        # alignment: correlate each 4 bit window with the symbol weights
+        windows = numpy.zeros((len(rows), width - 3), dtype=numpy.int16)
+        for k, weight in enumerate(self._symbol_weights):
+            windows += weight * matrix[:, k:width - 3 + k]
+        matches = (windows == high) | (windows == low)
+        aligned = matches.any(axis=1)
+        starts = matches.argmax(axis=1)
+
+        # classification: reshape the bits from the alignment on into symbols of 4 bits
+        symbol_count = width // 4
+        index = starts[:, None] + numpy.arange(symbol_count * 4)[None, :]
+        bits = numpy.take_along_axis(matrix, numpy.minimum(index, width - 1), axis=1)
+        bits[index >= width] = self._padding
+        symbols = bits.reshape(len(rows), symbol_count, 4) @ numpy.array(self._symbol_weights, dtype=numpy.int16)
+        is_high = symbols == high
+        valid = (is_high | (symbols == low)) & aligned[:, None]
+        logical_bits = [row_bits[row_valid].astype(numpy.uint8) for row_bits, row_valid in zip(is_high, valid)]
+
+        # assembly: the first 24 logical bits of each complete packet, packed to bytes
+        complete = valid.sum(axis=1) == 25
+        selected = valid & (numpy.cumsum(valid, axis=1) <= 24) & complete[:, None]
+        logical_bytes = numpy.packbits(is_high[selected].reshape(-1, 24), axis=1).astype(numpy.int64)
+        x = (logical_bytes[:, 0] << 16) | (logical_bytes[:, 1] << 8) | logical_bytes[:, 2]
+        results = [None] * len(rows)
+        for row, address, data in zip(numpy.flatnonzero(complete), x >> self.data_bits, x & (2**self.data_bits-1)):
+            results[row] = {"address": int(address), "data": int(data)}
+        return results, logical_bits
+
     def parse(self, physical_bits):
+        if numpy is not None:
+            results, logical_bits = self._decode_numpy([physical_bits])
+            self._physical_bits = physical_bits
+            self._logical_bits = logical_bits[0].tolist()
+            if results[0] is None:
+                return None
+            self._logical_bytes = self._to_logical_bytes(self._logical_bits)
+            self._logical_values = results[0]
+            return self._logical_values
+
         self._physical_bits = physical_bits
         self._physical_bits = self._align_bits(self._physical_bits)
         self._logical_bits = self._to_logical_bits(self._physical_bits)
@@ -191,6 +281,39 @@ class Princeton25bit_Protocol(Protocol):
         self._logical_values = self._to_logical_values(self._logical_bytes)
         return self._logical_values
 
+    def _parse_stateless(self, physical_bits):
+        logical_bits = self._to_logical_bits(self._align_bits(physical_bits))
+        if len(logical_bits) != 25:
+            return None
+        return self._to_logical_values(self._to_logical_bytes(logical_bits))
+
+    def decode(self, packet) -> dict:
+        """Decodes the bitstream of a SyncRxPacket or AsyncRxPacket, see Protocol.decode.
+        """
+        if isinstance(packet, SyncRxPacket):
+            return self.parse_many([packet.get_bitstream()])[0]
+        if isinstance(packet, AsyncRxPacket):
+            return self.parse_many([packet.get_bitstream(self.data_rate)])[0]
+        return None
+
+    def parse_many(self, bitstreams) -> list:
+        """Decodes a batch of bitstreams in one call.
+
+        Unlike parse, the intermediate results of the last packet are not kept.
+
+        Args:
+            bitstreams (list): The bitstreams, PackedBits, lists or arrays of bits,
+              or a 2D array with one bitstream per row.
+
+        Returns:
+            list: The logical values of each bitstream, None where decoding failed.
+        """
+        if numpy is None:
+            return [self._parse_stateless(bits) for bits in bitstreams]
+        if len(bitstreams) == 0:
+            return []
+        return self._decode_numpy(bitstreams)[0]
+
     def _get_physical_bits(self, logical_values):
         physical_bits = []
         x = (logical_values["address"] << self.data_bits) | logical_values["data"]
@@ -211,6 +334,42 @@ class Princeton25bit_Protocol(Protocol):
             physical_bytes.append(byte)
         return physical_bytes
 
+class KiaEv6_Protocol(Protocol):
+    """Protocol for decoding the packets of the KIA EV6 key fob.
+
+    Received in fixed length mode with presets.rf_setting_kia_ev6_key_fob. The fob
+    sends its packet 5 times without pause, the first one arrives without preamble
+    and sync word, the others with 4 bytes of them. With a packet length of
+    24 * 5 + 4 * 4 = 136 all repetitions are received in one packet.
+
+    The payload is Manchester encoded (01 -> 0, 10 -> 1), starting at the second bit.
+    """
+    payload_length = 24
+    # preamble and sync word in front of the repetitions
+    _repetition_gap = 4
+
+    def decode(self, packet) -> dict:
+        """Decodes the first repetition of a NormalRxPacket, see Protocol.decode.
+
+        Returns:
+            dict: The Manchester decoded payload ("data"), the raw payload ("payload")
+                and the number of repetitions equal to the first one ("quality"),
+                or None if the payload has invalid Manchester symbols.
+        """
+        if not isinstance(packet, NormalRxPacket):
+            return None
+        raw = bytes(packet.payload)
+        if len(raw) < self.payload_length:
+            return None
+        payload = raw[:self.payload_length]
+        data, errors = manchester.decode_with_errors(payload, bit_offset=1)
+        if manchester.count_errors(errors) > 0:
+            return None
+        stride = self._repetition_gap + self.payload_length
+        quality = sum(1 for start in range(stride, len(raw) - self.payload_length + 1, stride)
+                      if raw[start:start + self.payload_length] == payload)
+        return {"data": data, "payload": payload, "quality": quality}
+
 class Packet:
     def __init__(self):
         self._payload = []
@@ -250,7 +409,18 @@ class SyncTxPacket(TxPacket):
 
 class AsyncTxPacket(TxPacket):
     def __init__(self, *args, **kwargs):
+        """Initializes a new instance of the AsyncTxPacket class.
+
+        Args:
+            payload (list): The bytes to send at the configured data rate (bits LSB
+              first), or an edge list of (level, duration in seconds) tuples.
+        """
         super().__init__(*args, **kwargs)
+
+    def is_edge_list(self) -> bool:
+        """Returns True if the payload is an edge list.
+        """
+        return len(self.payload) > 0 and isinstance(self.payload[0], tuple)
     
     def __repr__(self):
         return f"AsyncTxPacket(edges={self.payload})"
@@ -272,12 +442,12 @@ class RxPacket(Packet):
 class NormalRxPacket(RxPacket):
     """Represents a received packet in normal mode.
     """
-    def __init__(self, payload: list, length: int, rssi: int, lqi: int, crc_ok: int,
+    def __init__(self, payload: bytes, length: int, rssi: int, lqi: int, crc_ok: int,
                  *args, **kwargs):
         """Initializes a new instance of the NormalRxPacket class.
 
         Args:
-            payload (list): The payload of the packet.
+            payload (bytes): The payload of the packet.
             length (int): The length of the packet.
             rssi (int): The RSSI of the packet.
             lqi (int): The LQI of the packet.
@@ -291,6 +461,14 @@ class NormalRxPacket(RxPacket):
         self._lqi = lqi
         self._crc_ok = crc_ok
 
+    def manchester_decode(self, bit_offset:int=0, inverted:bool=False) -> tuple:
+        """Decodes the Manchester encoded payload, see manchester.decode_with_errors.
+
+        Returns:
+            tuple: The decoded bytes and the error mask.
+        """
+        return manchester.decode_with_errors(bytes(self._payload), bit_offset, inverted)
+
     def __repr__(self):
         return f"NormalRxPacket(payload={' '.join([f'{x:02x}' for x in self._payload])}, length={self._length}, rssi={self._rssi}, lqi={self._lqi}, crc_ok={self._crc_ok})"
 
@@ -298,49 +476,98 @@ class NormalRxPacket(RxPacket):
 class SyncRxPacket(RxPacket):
     """Represents a received packet in synchronous mode.
     """
-    def __init__(self, bits: list, *args, **kwargs):
+    def __init__(self, bits, *args, **kwargs):
         """Initializes a new instance of the SyncRxPacket class.
 
         Args:
-            bits (list): A list of bits of the packet.
+            bits (PackedBits | list): The bits of the packet, a list is packed.
             timestamp (float): The timestamp, when the packet was received.
         """
         super().__init__(*args, **kwargs)
-        self._bits = bits
+        self._bits = PackedBits.from_bits(bits)
 
-    def get_bitstream(self):
+    def get_bitstream(self) -> PackedBits:
         """Returns the bitstream of the packet.
         """
         return self._bits
+
+    def manchester_decode(self, bit_offset:int=None, inverted:bool=False) -> tuple:
+        """Decodes the Manchester encoded bitstream, see manchester.decode_with_errors.
+
+        Args:
+            bit_offset (int): Bits to skip, default the symbol boundary with the
+              fewest errors (manchester.align).
+            inverted (bool): 01 is 1 and 10 is 0.
+
+        Returns:
+            tuple: The decoded bytes and the error mask.
+        """
+        if bit_offset is None:
+            bit_offset = manchester.align(self._bits)
+        return manchester.decode_with_errors(self._bits, bit_offset, inverted)
     
     def __repr__(self):
-        return f"SyncRxPacket(bits={' '.join([f'{x:02x}' for x in self.get_bitstream()])})"
+        return f"SyncRxPacket(bits={self._bits.to_str()})"
 
 
 class AsyncRxPacket(RxPacket):
     """Represents a received packet in asynchronous mode.
     """
-    def __init__(self, edges: list, *args, **kwargs):
+    def __init__(self, edges: list=None, *args, levels=None, timestamps_ns=None, start_ns:int=0, **kwargs):
         """Initializes a new instance of the AsyncRxPacket class.
 
+        The edges are given either as a list of tuples or as two arrays, e.g. the
+        buffers of a capture, which are kept without conversion.
+
         Args:
             edges (list): A list of tuples, where each tuple contains the 
-              timestamp of the edge and the edge type.
+              edge type and the time of the edge in seconds.
+            levels: The level after each edge, instead of edges.
+            timestamps_ns: The time of each edge in nanoseconds, instead of edges.
+            start_ns (int): The time in nanoseconds the edge times are relative to.
             timestamp (float): The timestamp, when the packet was received.
         """
         super().__init__(*args, **kwargs)
-        self._edges = edges
+        if edges is not None:
+            levels = [edge[0] for edge in edges]
+            timestamps_ns = [round(edge[1] * 1e9) for edge in edges]
+        self._levels = levels if levels is not None else []
+        self._timestamps_ns = timestamps_ns if timestamps_ns is not None else []
+        self._start_ns = start_ns
+
+    def __getstate__(self):
+        # the arrays of a capture can't be pickled, e.g. for a process pool
+        state = self.__dict__.copy()
+        state["_levels"] = list(self._levels)
+        state["_timestamps_ns"] = list(self._timestamps_ns)
+        return state
 
-    def get_bitstream(self):
-        """Returns the bitstream of the packet.
+    @property
+    def edges(self) -> list:
+        """The edges as (edge type, time in seconds) tuples.
         """
-        bitstream = []
-        t_bit = 1/self.protocol.data_rate
-        for i in range(1, len(self._edges)):
-            pulse_length = self._edges[i][1] - self._edges[i-1][1]
-            bit = self._edges[i][0]
-            bitstream += [1-bit] * round(pulse_length / t_bit)
-        return bitstream
-    
+        return [(level, (t - self._start_ns) / 1e9) for level, t in zip(self._levels, self._timestamps_ns)]
+
+    def get_bitstream(self, data_rate:int=None, clock_gain:float=0.01) -> PackedBits:
+        """Returns the NRZ bitstream of the packet, see demodulator.nrz.
+
+        Args:
+            data_rate (int): The data rate in baud, default estimated from the pulse
+              widths.
+            clock_gain (float): Loop gain of the symbol time in the clock recovery,
+              0 for a fixed symbol time, see demodulator.recover_clock.
+        """
+        symbol_time_ns = 1e9 / data_rate if data_rate else None
+        return demodulator.nrz(self._levels, self._timestamps_ns, symbol_time_ns, clock_gain)
+
+    def demodulate(self, scheme:str="nrz", **kwargs) -> PackedBits:
+        """Demodulates the edges, see demodulator.
+
+        Args:
+            scheme (str): "nrz", "pwm" or "ppm".
+            **kwargs: Passed to the demodulator function.
+        """
+        return demodulator.SCHEMES[scheme](self._levels, self._timestamps_ns, **kwargs)
+
     def __repr__(self):
-        return f"AsyncRxPacket(edges={self._edges})"
\ No newline at end of file
+        return f"AsyncRxPacket(edges={self.edges})"
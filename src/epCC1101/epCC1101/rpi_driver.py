@@ -2,7 +2,9 @@
 import logging
 import epCC1101.addresses as addresses
 from epCC1101.driver import Abstract_Driver
-from rust_rpi_cc1101_driver import asynchronous_serial_read, asynchronous_serial_write, synchronous_serial_write, synchronous_serial_read
+from epCC1101.bus import BusArbiter
+from epCC1101.tracing import TRACE_SPI, TRACE_STROBE
+from rust_rpi_cc1101_driver import asynchronous_serial_write, asynchronous_serial_write_edges, synchronous_serial_write, synchronous_serial_read, SpiDevice, CaptureSession, BackgroundCapture
 import sys
 if sys.implementation.name == "cpython":
     if sys.platform == "linux":
@@ -20,6 +22,8 @@ logger.setLevel(logging.INFO)
 class Driver(Abstract_Driver):
     chunk_size = 16
     fifo_rw_interval = 0.01
+    # SCHED_FIFO priority while transmitting in asynchronous serial mode (needs CAP_SYS_NICE)
+    serial_tx_realtime = False
     def __init__(self, spi_bus:int=0, cs_pin:int=0, spi_speed_hz:int=55700, gdo0:int=23, gdo1:int=None, gdo2:int=None):
         logger.info(f"Initializing SPI device on bus {spi_bus}, cs_pin {cs_pin}, spi_speed_hz {spi_speed_hz}")
 
@@ -33,36 +37,167 @@ class Driver(Abstract_Driver):
         self.spi = spidev.SpiDev()
         self.spi.open(self.spi_bus, self.cs_pin)
         self.spi.max_speed_hz = self.spi_speed_hz
+        # shared by all drivers on this bus
+        self.arbiter = BusArbiter.get(self.spi_bus)
 
-        #
+        self._read_frames = {}
+        self._capture_sessions = {}
 
     def read_byte(self, register:int):
-        logger.debug(f"Reading byte from address 0x{register:02X}")
-        result = self.spi.xfer2([register | addresses.SPI_READ_MASK, 0])[1]
-        logger.debug(f"Read byte {result}")
-        return result
+        return self._xfer([register | addresses.SPI_READ_MASK, 0])[1]
     
     def read_status_register(self, register):
-        logger.debug(f"Reading status register 0x{register:02X}")
-        result = self.spi.xfer2([register | addresses.SPI_READ_BURST_MASK, 0])[1]
-        logger.debug(f"Read status register {result}")
-        return result
+        return self._xfer([register | addresses.SPI_READ_BURST_MASK, 0])[1]
     
     def read_burst(self, register:int, length:int):
-        logger.debug(f"Reading burst from address 0x{register:02X} with length {length}")
-        result = self.spi.xfer2([register | addresses.SPI_READ_BURST_MASK] + [0]*length)[1:]
-        logger.debug(f"Read burst {result}")
-        return result
+        return self._xfer(self._get_read_frame(register | addresses.SPI_READ_BURST_MASK, length))[1:]
+
+    def read_burst_into(self, register:int, buffer):
+        """Reads len(buffer) bytes in burst mode into a preallocated buffer.
+
+        Args:
+            register (int): The register to read from.
+            buffer (bytearray | memoryview): Writable buffer, filled in place.
+
+        Returns:
+            int: Number of bytes read.
+        """
+        length = len(buffer)
+        if length == 0:
+            return 0
+        result = self._xfer(self._get_read_frame(register | addresses.SPI_READ_BURST_MASK, length))
+        buffer[:] = memoryview(bytes(result))[1:]
+        return length
 
     def command_strobe(self, register:int):
-        logger.debug(f"Sending command strobe to address 0x{register:02X}")
-        self.spi.xfer2([register | addresses.SPI_WRITE_MASK])
+        return self._xfer([register | addresses.SPI_WRITE_MASK], TRACE_STROBE)[0]
 
     def write_burst(self, register:int, data:bytes):
-        logger.debug(f"Writing burst to address 0x{register:02X} with data {data}")
-        self.spi.xfer2([register | addresses.SPI_WRITE_BURST_MASK] + data)
+        """Writes data in burst mode.
+
+        Args:
+            register (int): The register to write to.
+            data (bytes | bytearray | memoryview | list): The data to write.
+        """
+        frame = bytearray(len(data) + 1)
+        frame[0] = register | addresses.SPI_WRITE_BURST_MASK
+        frame[1:] = data
+        # every byte written returns a status byte, the last one is the most recent
+        self.last_status = self._xfer(frame)[-1]
+
+    def _xfer(self, frame, kind:str=TRACE_SPI) -> list:
+        # Single point for all SPI transfers. Keep this cheap, it's on every register access.
+        # spidev writes the response back into a list, copy what was sent first
+        tx = bytes(frame) if self.tracer is not None else None
+        with self.arbiter:
+            response = self.spi.xfer2(frame)
+        self.last_status = response[0]
+        if tx is not None:
+            self.tracer.record(kind, tx[0], tx, response)
+        return response
+
+    def lock(self) -> BusArbiter:
+        """Holds the SPI bus for a sequence of accesses, see Abstract_Driver.lock().
+
+        Returns:
+            BusArbiter: The arbiter shared by all drivers on this bus.
+        """
+        return self.arbiter
+
+    def _get_read_frame(self, header:int, length:int) -> bytearray:
+        # The transmit frames for reads are reused, only the header byte changes.
+        frame = self._read_frames.get(length)
+        if frame is None:
+            frame = bytearray(length + 1)
+            self._read_frames[length] = frame
+        frame[0] = header
+        return frame
+
+    def execute_transaction(self, operations:list) -> list:
+        """Executes the queued operations with as few SPI transfers as possible.
+
+        Command strobes and single register reads are chained within one transfer,
+        because the CC1101 expects a new header byte after each of them while CSn
+        stays low. A burst access can only be terminated by releasing CSn, so it
+        always ends the current transfer.
+
+        Do not queue SRES, the chip has to be polled for CHIP_RDYn after a reset.
+
+        Args:
+            operations (list): List of (method name, arguments) tuples.
+
+        Returns:
+            list: The result of each operation.
+        """
+        if not operations:
+            return []
+        frames = self._build_transaction_frames(operations)
+        # one bus acquisition, no other driver's transfers between the frames
+        with self.arbiter:
+            responses = [self._xfer(frame) for frame, _ in frames]
+        self.last_status = self._get_transaction_status(frames, responses)
+        return self._collect_transaction_results(frames, responses)
+
+    @staticmethod
+    def _build_transaction_frames(operations:list) -> list:
+        """Packs the operations into SPI frames, each frame is one CSn assertion.
+
+        Returns:
+            list: List of (frame, slots) tuples, where slots holds (name, offset, length)
+              for each operation in the frame.
+        """
+        frames = []
+        frame = []
+        slots = []
+        for i, (name, args) in enumerate(operations):
+            register = args[0]
+            offset = len(frame)
+            if name == "command_strobe":
+                frame.append(register | addresses.SPI_WRITE_MASK)
+                slots.append((name, offset, 0))
+            elif name == "read_byte":
+                frame += [register | addresses.SPI_READ_MASK, 0]
+                slots.append((name, offset, 1))
+            elif name == "read_status_register":
+                frame += [register | addresses.SPI_READ_BURST_MASK, 0]
+                slots.append((name, offset, 1))
+            elif name == "read_burst":
+                frame += [register | addresses.SPI_READ_BURST_MASK] + [0]*args[1]
+                slots.append((name, offset, args[1]))
+            elif name == "write_burst":
+                frame += [register | addresses.SPI_WRITE_BURST_MASK] + list(args[1])
+                slots.append((name, offset, 0))
+            else:
+                raise ValueError(f"Unsupported operation in transaction: {name}")
+
+            if name in ["read_burst", "write_burst"] or i == len(operations)-1:
+                frames.append((frame, slots))
+                frame = []
+                slots = []
+        return frames
+
+    @staticmethod
+    def _get_transaction_status(frames:list, responses:list) -> int:
+        # status byte of the last operation, the last byte written for a burst write
+        name, offset, _ = frames[-1][1][-1]
+        response = responses[-1]
+        return response[-1] if name == "write_burst" else response[offset]
+
+    @staticmethod
+    def _collect_transaction_results(frames:list, responses:list) -> list:
+        results = []
+        for (_, slots), response in zip(frames, responses):
+            for name, offset, length in slots:
+                if name in ["read_byte", "read_status_register"]:
+                    results.append(response[offset+1])
+                elif name == "read_burst":
+                    results.append(list(response[offset+1:offset+1+length]))
+                else:
+                    results.append(None)
+        return results
 
     def set_pin_mode(self, pin:int, mode:int):
+        self._close_capture_sessions(pin)
         if sys.platform == "linux":
             GPIO.setmode(GPIO.BCM)
             GPIO.setup(pin, mode)
@@ -80,25 +215,144 @@ class Driver(Abstract_Driver):
 
     def read_gdo0(self):
             return GPIO.input(self.gdo0)
-        
-    #def read_gdo2(self):
-    #    if self.gdo2 is not None:
-    #        GPIO.setmode(GPIO.BCM)
-    #        GPIO.setup(self.gdo2, GPIO.IN)
-    #        result = GPIO.input(self.gdo2)
-    #        GPIO.cleanup()
-    #        return result
-    #    else:
-    #        return None
+
+    def read_gdo2(self):
+        # the pin has to be set up as input with set_pin_mode
+        if self.gdo2 is None:
+            return None
+        return GPIO.input(self.gdo2)
     
     def asynchronous_serial_read(self, threshold_pin_number:int, data_pin_number:int, timeout_ms:int):
-        return asynchronous_serial_read(threshold_pin_number, data_pin_number, timeout_ms)
+        # the pins are configured once per pin pair and kept between the captures
+        session = self._capture_sessions.get((threshold_pin_number, data_pin_number))
+        if session is None:
+            self._close_capture_sessions(threshold_pin_number, data_pin_number)
+            session = CaptureSession(threshold_pin_number, data_pin_number)
+            self._capture_sessions[(threshold_pin_number, data_pin_number)] = session
+        return session.capture(timeout_ms)
+
+    def close_capture_sessions(self):
+        """Releases the pins kept configured by asynchronous_serial_read.
+
+        The driver also closes a session before another of its calls uses the pins,
+        e.g. a serial write, a background capture or set_pin_mode.
+        """
+        for session in self._capture_sessions.values():
+            session.close()
+        self._capture_sessions = {}
+
+    def _close_capture_sessions(self, *pins):
+        # a session keeps its pins claimed, release them before anything else uses them
+        for key in [key for key in self._capture_sessions if set(key) & set(pins)]:
+            self._capture_sessions.pop(key).close()
     
     def asynchronous_serial_write(self, data_pin_number:int, baudrate:int, data):
-        return asynchronous_serial_write(data_pin_number, baudrate, data)
+        self._close_capture_sessions(data_pin_number)
+        return asynchronous_serial_write(data_pin_number, baudrate, data, realtime=self.serial_tx_realtime)
+
+    def asynchronous_serial_write_edges(self, data_pin_number:int, edges:list):
+        self._close_capture_sessions(data_pin_number)
+        return asynchronous_serial_write_edges(data_pin_number, edges, realtime=self.serial_tx_realtime)
     
     def synchronous_serial_read(self, clock_pin_number:int, data_pin_number:int, timeout_ms:int, max_same_bits:int=16):
+        self._close_capture_sessions(clock_pin_number, data_pin_number)
         return synchronous_serial_read(clock_pin_number, data_pin_number, timeout_ms, max_same_bits)
 
     def synchronous_serial_write(self, clock_pin_number:int, data_pin_number:int, data):
-        return synchronous_serial_write(clock_pin_number, data_pin_number, data)
\ No newline at end of file
+        self._close_capture_sessions(clock_pin_number, data_pin_number)
+        return synchronous_serial_write(clock_pin_number, data_pin_number, data)
+
+    def start_background_capture(self, threshold_pin_number:int, data_pin_number:int, synchronous:bool=False,
+                                 max_same_bits:int=16, capacity:int=65536):
+        self._close_capture_sessions(threshold_pin_number, data_pin_number)
+        if synchronous:
+            return BackgroundCapture.synchronous(threshold_pin_number, data_pin_number, max_same_bits, capacity)
+        return BackgroundCapture.asynchronous(threshold_pin_number, data_pin_number, capacity)
+
+
+class RustDriver(Driver):
+    """Driver using the SPI device of rust_rpi_cc1101_driver instead of spidev.
+
+    Register and FIFO accesses are done in Rust and release the GIL while waiting
+    on the bus, so other Python threads keep running. Transactions are sent with a
+    single ioctl. GPIO handling is the same as in Driver.
+
+    Example:
+        >>> driver = RustDriver(spi_bus=0, cs_pin=0, gdo0=5, gdo2=6)
+        >>> cc1101 = Cc1101(driver)
+    """
+    def __init__(self, spi_bus:int=0, cs_pin:int=0, spi_speed_hz:int=55700, gdo0:int=23, gdo1:int=None, gdo2:int=None):
+        logger.info(f"Initializing Rust SPI device on bus {spi_bus}, cs_pin {cs_pin}, spi_speed_hz {spi_speed_hz}")
+
+        self.spi_bus = spi_bus
+        self.cs_pin = cs_pin
+        self.spi_speed_hz = spi_speed_hz
+        self.gdo0 = gdo0
+        self.gdo1 = gdo1
+        self.gdo2 = gdo2
+
+        self.spi = SpiDevice(spi_bus, cs_pin, spi_speed_hz)
+        self.arbiter = BusArbiter.get(self.spi_bus)
+
+        self._read_frames = {}
+        self._capture_sessions = {}
+
+    # The specialised methods build the frames in Rust. With a tracer attached, the
+    # generic implementations are used, so every transfer is recorded.
+
+    # The reads in Rust don't return the status byte, last_status is reset there.
+
+    def read_byte(self, register:int):
+        if self.tracer is not None:
+            return super().read_byte(register)
+        self.last_status = None
+        with self.arbiter:
+            return self.spi.read_byte(register)
+
+    def read_status_register(self, register):
+        if self.tracer is not None:
+            return super().read_status_register(register)
+        self.last_status = None
+        with self.arbiter:
+            return self.spi.read_status_register(register)
+
+    def read_burst(self, register:int, length:int):
+        if self.tracer is not None:
+            return super().read_burst(register, length)
+        self.last_status = None
+        with self.arbiter:
+            # bytes from Rust, a list like spidev, the configurator modifies it in place
+            return list(self.spi.read_burst(register, length))
+
+    def command_strobe(self, register:int):
+        if self.tracer is not None:
+            return super().command_strobe(register)
+        with self.arbiter:
+            self.last_status = self.spi.command_strobe(register)
+        return self.last_status
+
+    def write_burst(self, register:int, data:bytes):
+        if self.tracer is not None:
+            return super().write_burst(register, data)
+        with self.arbiter:
+            self.last_status = self.spi.write_burst(register, bytes(data))
+
+    def execute_transaction(self, operations:list) -> list:
+        """Executes the queued operations, all frames are sent with a single ioctl.
+
+        Args:
+            operations (list): List of (method name, arguments) tuples.
+
+        Returns:
+            list: The result of each operation.
+        """
+        if not operations:
+            return []
+        frames = self._build_transaction_frames(operations)
+        with self.arbiter:
+            responses = self.spi.xfer2_batch([frame for frame, _ in frames])
+        self.last_status = self._get_transaction_status(frames, responses)
+        if self.tracer is not None:
+            for (frame, _), response in zip(frames, responses):
+                self.tracer.record(TRACE_SPI, frame[0], frame, response)
+        return self._collect_transaction_results(frames, responses)
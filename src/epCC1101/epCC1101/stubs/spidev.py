@@ -1,13 +1,93 @@
+import epCC1101.addresses as addresses
+from epCC1101.emulator import Cc1101Emulator
+
+
 class SpiDev:
+    """Drop-in replacement for spidev.SpiDev, backed by an emulated CC1101.
+
+    Each transfer is decoded byte by byte like the chip does it: header bytes with
+    R/W and burst bit, single and burst register access, status registers, command
+    strobes and FIFO access. The response holds the chip status byte for each header
+    byte and written byte, and the register values for read bytes. Like on the chip,
+    the status of a written byte is shifted out before that byte is written. As with
+    py-spidev, a list argument is overwritten with the response.
+
+    Transactions and bytes are counted, so the SPI traffic of an operation can be
+    measured.
+
+    Example:
+        >>> from unittest import mock
+        >>> from epCC1101.stubs import spidev
+        >>> with mock.patch("epCC1101.rpi_driver.spidev", spidev):
+        ...     driver = Driver(spi_bus=0, cs_pin=0)
+        >>> cc1101 = Cc1101(driver)
+        >>> driver.spi.transactions, driver.spi.bytes
+    """
     max_speed_hz = 0
-    def __init__(self):
-        pass
+    def __init__(self, chip:Cc1101Emulator=None):
+        self.chip = chip if chip is not None else Cc1101Emulator()
+        self.transactions = 0
+        self.bytes = 0
 
     def open(self, bus, cs):
         pass
 
+    def reset_counters(self):
+        self.transactions = 0
+        self.bytes = 0
+
     def xfer2(self, data):
-        return [0, 0]
-    
+        tx = list(data)
+        self.transactions += 1
+        self.bytes += len(tx)
+        if self.max_speed_hz > 0:
+            self.chip.medium.advance(self.chip.medium.now + len(tx) * 8 / self.max_speed_hz)
+
+        response = []
+        i = 0
+        while i < len(tx):
+            header = tx[i]
+            read = bool(header & addresses.SPI_READ_MASK)
+            burst = bool(header & 0x40)
+            register = header & 0x3F
+            response.append(self.chip.get_chip_status(read))
+            i += 1
+
+            if addresses.PARTNUM <= register <= addresses.RCCTRL0_STATUS:
+                if read and burst:
+                    # status register, always single access
+                    if i < len(tx):
+                        response.append(self.chip.read_status_register(register))
+                        i += 1
+                else:
+                    self.chip.command_strobe(register)
+                continue
+
+            count = len(tx) - i if burst else min(1, len(tx) - i)
+            for k in range(count):
+                if register == addresses.PATABLE:
+                    index = k % 8
+                    if read:
+                        response.append(self.chip.patable[index])
+                    else:
+                        response.append(self.chip.get_chip_status(read))
+                        self.chip.patable[index] = tx[i] & 0xFF
+                elif register == addresses.RXFIFO and read:
+                    response.append(self.chip.read_register(addresses.RXFIFO))
+                elif register == addresses.TXFIFO:
+                    response.append(self.chip.get_chip_status(read))
+                    self.chip.write_register(addresses.TXFIFO, tx[i])
+                elif read:
+                    response.append(self.chip.read_register(min(register + k, addresses.TEST0)))
+                else:
+                    response.append(self.chip.get_chip_status(read))
+                    self.chip.write_register(min(register + k, addresses.TEST0), tx[i])
+                i += 1
+        # like py-spidev, the response replaces the content of a list argument
+        if isinstance(data, list):
+            data[:] = response
+            return data
+        return response
+
     def close(self):
-        pass
\ No newline at end of file
+        pass
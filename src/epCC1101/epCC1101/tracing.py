@@ -0,0 +1,97 @@
+import json
+import time
+from collections import namedtuple
+
+TRACE_SPI = "spi"
+TRACE_STROBE = "strobe"
+TRACE_STATE = "state"
+
+TraceEvent = namedtuple("TraceEvent", ["timestamp_ns", "kind", "register", "tx", "rx", "info"])
+
+
+class Tracer:
+    """Records SPI transfers, command strobes and state transitions in a fixed-size ring buffer.
+
+    Tracing is disabled as long as no tracer is attached to the driver. The hot paths
+    only check `driver.tracer is not None`, so there is no formatting or copying
+    unless a tracer is attached. Once the buffer is full, the oldest events are
+    overwritten.
+
+    Example:
+        >>> driver.tracer = Tracer(size=4096)
+        >>> cc1101.receive()
+        >>> for event in driver.tracer.dump():
+        ...     print(event)
+    """
+    def __init__(self, size:int=1024):
+        """Initializes a new instance of the Tracer class.
+
+        Args:
+            size (int): Number of events kept in the ring buffer.
+        """
+        assert size > 0, f"Invalid trace buffer size: {size}. Must be greater than 0"
+        self._size = size
+        self._events = [None] * size
+        self._index = 0
+        self._count = 0
+
+    def record(self, kind:str, register:int=None, tx=None, rx=None, info:str=None):
+        """Records an event with the current monotonic timestamp.
+
+        Args:
+            kind (str): Event type, one of TRACE_SPI, TRACE_STROBE, TRACE_STATE.
+            register (int): Header byte or register address, if any.
+            tx: Bytes sent to the chip, if any.
+            rx: Bytes received from the chip, if any.
+            info (str): Free text, e.g. the name of the state transition.
+        """
+        self._events[self._index] = TraceEvent(
+            time.monotonic_ns(),
+            kind,
+            register,
+            bytes(tx) if tx is not None else None,
+            bytes(rx) if rx is not None else None,
+            info)
+        self._index = (self._index + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    def clear(self):
+        """Removes all recorded events.
+        """
+        self._events = [None] * self._size
+        self._index = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def dump(self) -> list:
+        """Returns the recorded events, oldest first.
+
+        Returns:
+            list: List of TraceEvent tuples.
+        """
+        start = (self._index - self._count) % self._size
+        return [self._events[(start + i) % self._size] for i in range(self._count)]
+
+    def export(self, fp):
+        """Writes the recorded events as JSON lines to a file object.
+
+        Each line holds one event, tx and rx are written as hex strings.
+
+        Args:
+            fp: A file object opened for writing text.
+        """
+        for event in self.dump():
+            fp.write(json.dumps({
+                "timestamp_ns": event.timestamp_ns,
+                "kind": event.kind,
+                "register": event.register,
+                "tx": event.tx.hex() if event.tx is not None else None,
+                "rx": event.rx.hex() if event.rx is not None else None,
+                "info": event.info,
+            }) + "\n")
+
+    def __repr__(self):
+        return f"Tracer(size={self._size}, events={self._count})"
@@ -1,8 +1,12 @@
 use pyo3::prelude::*;
-use pyo3::exceptions::PyRuntimeError;
+use pyo3::buffer::PyBuffer;
+use pyo3::exceptions::{PyBufferError, PyIndexError, PyRuntimeError};
+use pyo3::ffi;
 use core::time;
-use std::{thread::sleep, time::{Duration, SystemTime, UNIX_EPOCH}};
+use std::os::raw::{c_char, c_int, c_void};
+use std::{sync::{Arc, Condvar, Mutex, atomic::{AtomicBool, AtomicU64, AtomicUsize, Ordering}}, thread::{sleep, JoinHandle}, time::{Duration, Instant, SystemTime, UNIX_EPOCH}};
 use rppal::gpio::{Gpio, InputPin, Level, Trigger};
+use rppal::spi::{Bus, Mode, Segment, SlaveSelect, Spi};
 
 pub const TRIGGER_DISABLED: u8 = 0;
 pub const TRIGGER_RISING_EDGE: u8 = 1;
@@ -11,33 +15,212 @@ pub const TRIGGER_BOTH_EDGES: u8 = 3;
 pub const GPIO_LOW: u8 = 0;
 pub const GPIO_HIGH: u8 = 1;
 
-#[pyclass]
+pub const SPI_READ_MASK: u8 = 0x80;
+pub const SPI_WRITE_MASK: u8 = 0x00;
+pub const SPI_READ_BURST_MASK: u8 = SPI_READ_MASK | 0x40;
+pub const SPI_WRITE_BURST_MASK: u8 = SPI_WRITE_MASK | 0x40;
+
+enum ArrayData{
+    U8(Vec<u8>),
+    U64(Vec<u64>),
+}
+
+/// Read-only typed array of a capture.
+///
+/// Exported through the buffer protocol, so memoryview() and numpy.frombuffer() read
+/// the samples in place, without a Python object per sample.
+#[pyclass(frozen, sequence)]
+pub struct CaptureArray{
+    data: ArrayData,
+    shape: [isize; 1],
+    itemsize: [isize; 1],
+}
+
+impl CaptureArray{
+    fn new(data: ArrayData) -> Self {
+        let (len, itemsize) = match &data {
+            ArrayData::U8(values) => (values.len(), 1),
+            ArrayData::U64(values) => (values.len(), 8),
+        };
+        CaptureArray{data, shape: [len as isize], itemsize: [itemsize]}
+    }
+
+    fn as_u8(&self) -> &[u8] {
+        match &self.data {
+            ArrayData::U8(values) => values,
+            ArrayData::U64(_) => &[],
+        }
+    }
+
+    fn as_u64(&self) -> &[u64] {
+        match &self.data {
+            ArrayData::U64(values) => values,
+            ArrayData::U8(_) => &[],
+        }
+    }
+}
+
+#[pymethods]
+impl CaptureArray{
+    /// Buffer format of the items, "B" (u8) or "Q" (u64).
+    #[getter]
+    fn get_format(&self) -> &'static str {
+        match &self.data {
+            ArrayData::U8(_) => "B",
+            ArrayData::U64(_) => "Q",
+        }
+    }
+
+    fn __len__(&self) -> usize {
+        self.shape[0] as usize
+    }
+
+    fn __getitem__(&self, index: isize) -> PyResult<u64> {
+        let len = self.shape[0];
+        let i = if index < 0 { index + len } else { index };
+        if i < 0 || i >= len {
+            return Err(PyIndexError::new_err("CaptureArray index out of range"));
+        }
+        Ok(match &self.data {
+            ArrayData::U8(values) => values[i as usize] as u64,
+            ArrayData::U64(values) => values[i as usize],
+        })
+    }
+
+    unsafe fn __getbuffer__(slf: Bound<'_, Self>, view: *mut ffi::Py_buffer, flags: c_int) -> PyResult<()> {
+        if view.is_null() {
+            return Err(PyBufferError::new_err("View is null"));
+        }
+        if (flags & ffi::PyBUF_WRITABLE) == ffi::PyBUF_WRITABLE {
+            return Err(PyBufferError::new_err("CaptureArray is read-only"));
+        }
+        let array = slf.get();
+        let (buf, format): (*const c_void, &'static [u8]) = match &array.data {
+            ArrayData::U8(values) => (values.as_ptr() as *const c_void, b"B\0"),
+            ArrayData::U64(values) => (values.as_ptr() as *const c_void, b"Q\0"),
+        };
+        // the array is frozen and kept alive by the view, the pointers stay valid
+        (*view).buf = buf as *mut c_void;
+        (*view).len = array.shape[0] * array.itemsize[0];
+        (*view).readonly = 1;
+        (*view).itemsize = array.itemsize[0];
+        (*view).format = if (flags & ffi::PyBUF_FORMAT) == ffi::PyBUF_FORMAT {
+            format.as_ptr() as *mut c_char
+        } else {
+            std::ptr::null_mut()
+        };
+        (*view).ndim = 1;
+        (*view).shape = if (flags & ffi::PyBUF_ND) == ffi::PyBUF_ND {
+            array.shape.as_ptr() as *mut isize
+        } else {
+            std::ptr::null_mut()
+        };
+        (*view).strides = if (flags & ffi::PyBUF_STRIDES) == ffi::PyBUF_STRIDES {
+            array.itemsize.as_ptr() as *mut isize
+        } else {
+            std::ptr::null_mut()
+        };
+        (*view).suboffsets = std::ptr::null_mut();
+        (*view).internal = std::ptr::null_mut();
+        (*view).obj = slf.into_any().into_ptr();
+        Ok(())
+    }
+}
+
+/// Edges captured by CaptureSession, before they are handed to Python.
+struct Capture{
+    start_time: Duration,
+    start_capture_ns: u64,
+    end_capture_ns: u64,
+    timestamps_ns: Vec<u64>,
+    levels: Vec<u8>,
+}
+
+/// Edges captured in asynchronous serial mode.
+///
+/// The edges are CLOCK_MONOTONIC timestamps in nanoseconds, the same clock as
+/// time.monotonic_ns() in Python, so they are not affected by changes of the system
+/// time. The wall clock time is taken once, at the start of the capture.
+///
+/// timestamps_ns and levels are CaptureArrays, they are shared, not copied, on access.
+#[pyclass(frozen)]
 pub struct CapturedTransitions{
-    start_capture: Duration,
-    end_capture: Duration,
-    transitions: Vec<(f64, u8)>,
+    start_time: Duration,
+    start_capture_ns: u64,
+    end_capture_ns: u64,
+    timestamps_ns: Py<CaptureArray>,
+    levels: Py<CaptureArray>,
 }
 
-#[pyclass]
+/// Bits captured in synchronous serial mode, packed 8 per byte, first bit in the
+/// most significant bit.
+#[pyclass(frozen)]
 pub struct CapturedBits{
     start_capture: Duration,
     end_capture: Duration,
-    bits: Vec<u8>,
+    packed: Py<CaptureArray>,
+    bit_length: usize,
+}
+
+impl CapturedTransitions{
+    fn from_capture(py: Python<'_>, capture: Capture) -> PyResult<Self> {
+        Ok(CapturedTransitions{
+            start_time: capture.start_time,
+            start_capture_ns: capture.start_capture_ns,
+            end_capture_ns: capture.end_capture_ns,
+            timestamps_ns: Py::new(py, CaptureArray::new(ArrayData::U64(capture.timestamps_ns)))?,
+            levels: Py::new(py, CaptureArray::new(ArrayData::U8(capture.levels)))?,
+        })
+    }
+
+    fn to_wall_clock(&self, monotonic_ns: u64) -> f64{
+        (self.start_time + Duration::from_nanos(monotonic_ns - self.start_capture_ns)).as_secs_f64()
+    }
 }
 
 #[pymethods]
 impl CapturedTransitions{
+    /// Wall clock time of the start of the capture, seconds since the epoch.
     #[getter]
     fn get_start_capture(&self) -> f64{
-        self.start_capture.as_secs_f64()
+        self.start_time.as_secs_f64()
     }
+    /// Wall clock time of the end of the capture, seconds since the epoch.
     #[getter]
     fn get_end_capture(&self) -> f64{
-        self.end_capture.as_secs_f64()
+        self.to_wall_clock(self.end_capture_ns)
+    }
+    #[getter]
+    fn get_start_capture_ns(&self) -> u64{
+        self.start_capture_ns
     }
     #[getter]
+    fn get_end_capture_ns(&self) -> u64{
+        self.end_capture_ns
+    }
+    /// Monotonic timestamps of the edges in nanoseconds (u64 array).
+    #[getter]
+    fn get_timestamps_ns(&self, py: Python<'_>) -> Py<CaptureArray>{
+        self.timestamps_ns.clone_ref(py)
+    }
+    /// Level after each edge, GPIO_LOW or GPIO_HIGH (u8 array).
+    #[getter]
+    fn get_levels(&self, py: Python<'_>) -> Py<CaptureArray>{
+        self.levels.clone_ref(py)
+    }
+    /// (level, nanoseconds since the start of the capture) for each edge.
+    #[getter]
+    fn get_edges(&self) -> Vec<(u8, u64)>{
+        self.levels.get().as_u8().iter().zip(self.timestamps_ns.get().as_u64().iter())
+            .map(|(&level, &timestamp)| (level, timestamp - self.start_capture_ns))
+            .collect()
+    }
+    /// (wall clock time, level) for each edge, derived from the monotonic timestamps.
+    #[getter]
     fn get_transitions(&self) -> Vec<(f64, u8)>{
-        self.transitions.clone()
+        self.timestamps_ns.get().as_u64().iter().zip(self.levels.get().as_u8().iter())
+            .map(|(&timestamp, &level)| (self.to_wall_clock(timestamp), level))
+            .collect()
     }
 }
 
@@ -51,9 +234,142 @@ impl CapturedBits{
     fn get_end_capture(&self) -> f64{
         self.end_capture.as_secs_f64()
     }
+    /// The packed bits (u8 array).
+    #[getter]
+    fn get_packed(&self, py: Python<'_>) -> Py<CaptureArray>{
+        self.packed.clone_ref(py)
+    }
+    /// Number of bits, the unused bits of the last byte are 0.
+    #[getter]
+    fn get_bit_length(&self) -> usize{
+        self.bit_length
+    }
+    /// One int per bit, unpacked on each access.
     #[getter]
     fn get_bits(&self) -> Vec<u8>{
-        self.bits.clone()
+        let packed = self.packed.get().as_u8();
+        (0..self.bit_length).map(|i| (packed[i / 8] >> (7 - i % 8)) & 1).collect()
+    }
+}
+
+/// Copies the data of a bytes-like object (one copy of the whole buffer) or of a
+/// sequence of ints.
+fn extract_data(data: &Bound<'_, PyAny>) -> PyResult<Vec<u8>> {
+    match PyBuffer::<u8>::get(data) {
+        Ok(buffer) => buffer.to_vec(data.py()),
+        Err(_) => data.extract(),
+    }
+}
+
+/// CLOCK_MONOTONIC in nanoseconds, the clock of time.monotonic_ns() in Python.
+fn monotonic_ns() -> u64 {
+    let mut ts = libc::timespec{tv_sec: 0, tv_nsec: 0};
+    // cannot fail with a valid clock id and pointer
+    unsafe { libc::clock_gettime(libc::CLOCK_MONOTONIC, &mut ts) };
+    ts.tv_sec as u64 * 1_000_000_000 + ts.tv_nsec as u64
+}
+
+/// SPI device for register and FIFO access. All transfers release the GIL.
+#[pyclass]
+pub struct SpiDevice{
+    spi: Mutex<Spi>,
+}
+
+impl SpiDevice{
+    fn transfer_non_py(&self, write_buffer: &[u8]) -> PyResult<Vec<u8>> {
+        let mut read_buffer = vec![0u8; write_buffer.len()];
+        let spi = self.spi.lock()
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        spi.transfer(&mut read_buffer, write_buffer)
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        Ok(read_buffer)
+    }
+}
+
+#[pymethods]
+impl SpiDevice{
+    #[new]
+    #[pyo3(signature = (spi_bus=0, cs_pin=0, spi_speed_hz=55700))]
+    fn new(spi_bus: u8, cs_pin: u8, spi_speed_hz: u32) -> PyResult<Self> {
+        let bus = match spi_bus {
+            0 => Bus::Spi0,
+            1 => Bus::Spi1,
+            2 => Bus::Spi2,
+            3 => Bus::Spi3,
+            4 => Bus::Spi4,
+            5 => Bus::Spi5,
+            6 => Bus::Spi6,
+            _ => return Err(PyRuntimeError::new_err("Invalid SPI bus.")),
+        };
+        let slave_select = match cs_pin {
+            0 => SlaveSelect::Ss0,
+            1 => SlaveSelect::Ss1,
+            2 => SlaveSelect::Ss2,
+            _ => return Err(PyRuntimeError::new_err("Invalid chip select.")),
+        };
+        let spi = Spi::new(bus, slave_select, spi_speed_hz, Mode::Mode0)
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        Ok(SpiDevice{spi: Mutex::new(spi)})
+    }
+
+    /// Full duplex transfer of one frame, returns the received bytes.
+    fn xfer2(&self, py: Python<'_>, data: Vec<u8>) -> PyResult<Vec<u8>> {
+        py.allow_threads(|| self.transfer_non_py(&data))
+    }
+
+    /// Transfers several frames with a single ioctl. CSn is released between the frames.
+    fn xfer2_batch(&self, py: Python<'_>, frames: Vec<Vec<u8>>) -> PyResult<Vec<Vec<u8>>> {
+        py.allow_threads(|| {
+            let mut responses: Vec<Vec<u8>> = frames.iter().map(|frame| vec![0u8; frame.len()]).collect();
+            {
+                let mut segments: Vec<Segment> = Vec::with_capacity(frames.len());
+                let last = frames.len().saturating_sub(1);
+                for (i, (response, frame)) in responses.iter_mut().zip(frames.iter()).enumerate() {
+                    let mut segment = Segment::new(response, frame);
+                    segment.set_ss_change(i != last);
+                    segments.push(segment);
+                }
+                let spi = self.spi.lock()
+                    .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+                spi.transfer_segments(&segments)
+                    .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+            }
+            Ok(responses)
+        })
+    }
+
+    fn read_byte(&self, py: Python<'_>, register: u8) -> PyResult<u8> {
+        py.allow_threads(|| Ok(self.transfer_non_py(&[register | SPI_READ_MASK, 0])?[1]))
+    }
+
+    fn read_status_register(&self, py: Python<'_>, register: u8) -> PyResult<u8> {
+        py.allow_threads(|| Ok(self.transfer_non_py(&[register | SPI_READ_BURST_MASK, 0])?[1]))
+    }
+
+    fn read_burst(&self, py: Python<'_>, register: u8, length: usize) -> PyResult<Vec<u8>> {
+        py.allow_threads(|| {
+            let mut frame = vec![0u8; length + 1];
+            frame[0] = register | SPI_READ_BURST_MASK;
+            let mut response = self.transfer_non_py(&frame)?;
+            response.remove(0);
+            Ok(response)
+        })
+    }
+
+    /// Sends a command strobe and returns the chip status byte.
+    fn command_strobe(&self, py: Python<'_>, register: u8) -> PyResult<u8> {
+        py.allow_threads(|| Ok(self.transfer_non_py(&[register | SPI_WRITE_MASK])?[0]))
+    }
+
+    /// Writes data in burst mode and returns the chip status byte of the last byte written.
+    fn write_burst(&self, py: Python<'_>, register: u8, data: Vec<u8>) -> PyResult<u8> {
+        py.allow_threads(|| {
+            let mut frame = Vec::with_capacity(data.len() + 1);
+            frame.push(register | SPI_WRITE_BURST_MASK);
+            frame.extend_from_slice(&data);
+            let response = self.transfer_non_py(&frame)?;
+            Ok(response[response.len() - 1])
+        })
     }
 }
 
@@ -108,75 +424,724 @@ fn wait_for_interrupt(pin_number: u8, timeout_ms: u64, direction: u8) -> PyResul
     }
 }
 
-#[pyfunction]
-fn asynchronous_serial_read(threshold_pin_number: u8, data_pin_number:u8, timeout_ms: u64) -> PyResult<Option<CapturedTransitions>> {
-    // Wait for the rising edge on GDO0
-    let rising_edge = wait_for_interrupt(threshold_pin_number, timeout_ms, TRIGGER_RISING_EDGE)?;
-    if rising_edge.is_none() {
-        return Ok(None); // Timeout
-    }
-    let start_capture = SystemTime::now()
-        .duration_since(UNIX_EPOCH)
-        .map_err(|e| pyo3::exceptions::PyValueError::new_err(e.to_string()))?;
-    
-    let mut transitions: Vec<(f64, u8)> = Vec::new();
-    let gdo0_pin = Gpio::new()
-        .map_err(|err| PyRuntimeError::new_err(err.to_string()))?
-        .get(threshold_pin_number)
-        .map_err(|err| PyRuntimeError::new_err(err.to_string()))?
-        .into_input();
+struct CapturePins{
+    gpio: Gpio,
+    threshold_pin: InputPin,
+    data_pin: InputPin,
+}
 
-    loop{
-        if gdo0_pin.is_low(){
-            break;
-        }
-        let signal_edge = wait_for_interrupt(data_pin_number, timeout_ms, TRIGGER_BOTH_EDGES)?;
-        if signal_edge.is_none(){
-            return Ok(None); // Timeout
+/// Long-lived capture of the asynchronous serial data.
+///
+/// The GPIO peripheral is opened and the interrupts of both pins are configured once,
+/// when the session is created. Each capture() only waits for the events, so no edge is
+/// lost to the setup of the pins. The pins stay configured until the session is closed
+/// or dropped.
+#[pyclass]
+pub struct CaptureSession{
+    pins: Mutex<Option<CapturePins>>,
+}
+
+impl CaptureSession{
+    fn capture_non_py(&self, timeout_ms: u64) -> PyResult<Option<Capture>> {
+        let guard = self.pins.lock()
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        let pins = guard.as_ref()
+            .ok_or_else(|| PyRuntimeError::new_err("Capture session is closed."))?;
+        let timeout = Duration::from_millis(timeout_ms);
+
+        // Wait for the rising edge on GDO0. The first poll discards the events left
+        // over from the last capture, after that no event is dropped.
+        let threshold_pin_number = pins.threshold_pin.pin();
+        let deadline = Instant::now() + timeout;
+        let mut reset = true;
+        loop{
+            let now = Instant::now();
+            if now >= deadline {
+                return Ok(None); // Timeout
+            }
+            match pins.gpio.poll_interrupts(&[&pins.threshold_pin, &pins.data_pin], reset, Some(deadline - now)) {
+                Ok(None) => return Ok(None), // Timeout
+                Ok(Some((pin, Level::High))) if pin.pin() == threshold_pin_number => break,
+                Ok(Some(_)) => {},
+                Err(err) => return Err(PyRuntimeError::new_err(err.to_string())),
+            }
+            reset = false;
         }
-        let timestamp = SystemTime::now()
+        let start_capture_ns = monotonic_ns();
+        let start_time = SystemTime::now()
             .duration_since(UNIX_EPOCH)
             .map_err(|e| pyo3::exceptions::PyValueError::new_err(e.to_string()))?;
-        transitions.push((timestamp.as_secs_f64(), signal_edge.unwrap()));
+
+        // Record the data edges until GDO0 falls
+        let mut timestamps_ns: Vec<u64> = Vec::new();
+        let mut levels: Vec<u8> = Vec::new();
+        loop{
+            match pins.gpio.poll_interrupts(&[&pins.threshold_pin, &pins.data_pin], false, Some(timeout)) {
+                Ok(None) => return Ok(None), // Timeout
+                Ok(Some((pin, level))) if pin.pin() == threshold_pin_number => {
+                    if level == Level::Low {
+                        break;
+                    }
+                },
+                Ok(Some((_, level))) => {
+                    timestamps_ns.push(monotonic_ns());
+                    levels.push(if level == Level::High { GPIO_HIGH } else { GPIO_LOW });
+                },
+                Err(err) => return Err(PyRuntimeError::new_err(err.to_string())),
+            }
+        }
+
+        let end_capture_ns = monotonic_ns();
+        Ok(Some(Capture{start_time, start_capture_ns, end_capture_ns, timestamps_ns, levels}))
+    }
+}
+
+#[pymethods]
+impl CaptureSession{
+    #[new]
+    fn new(threshold_pin_number: u8, data_pin_number: u8) -> PyResult<Self> {
+        let gpio = Gpio::new()
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        let mut threshold_pin = gpio.get(threshold_pin_number)
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?
+            .into_input();
+        let mut data_pin = gpio.get(data_pin_number)
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?
+            .into_input();
+        threshold_pin.set_interrupt(Trigger::Both)
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        data_pin.set_interrupt(Trigger::Both)
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        Ok(CaptureSession{pins: Mutex::new(Some(CapturePins{gpio, threshold_pin, data_pin}))})
+    }
+
+    /// Waits for the rising edge on the threshold pin and records the edges on the data
+    /// pin until the threshold pin falls. Returns None on timeout. Releases the GIL.
+    fn capture(&self, py: Python<'_>, timeout_ms: u64) -> PyResult<Option<CapturedTransitions>> {
+        match py.allow_threads(|| self.capture_non_py(timeout_ms))? {
+            Some(capture) => Ok(Some(CapturedTransitions::from_capture(py, capture)?)),
+            None => Ok(None),
+        }
+    }
+
+    /// Releases the pins, later captures raise a RuntimeError.
+    fn close(&self) -> PyResult<()> {
+        let mut guard = self.pins.lock()
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        *guard = None;
+        Ok(())
+    }
+}
+
+// Entries of the background capture ring: CLOCK_MONOTONIC ns << 2 | kind.
+// In asynchronous mode the level of an edge is the kind, in synchronous mode the bit.
+const ENTRY_LOW: u64 = 0;
+const ENTRY_HIGH: u64 = 1;
+const ENTRY_BURST_START: u64 = 2;
+const ENTRY_BURST_END: u64 = 3;
+
+/// Single producer, single consumer ring of capture entries.
+///
+/// The capture thread pushes, the reader pops, neither takes a lock. When the ring
+/// is full, entries are dropped and counted. The condition variable only wakes up
+/// the reader at the end of a burst.
+struct EdgeRing{
+    slots: Box<[AtomicU64]>,
+    head: AtomicUsize,
+    tail: AtomicUsize,
+    overruns: AtomicU64,
+    truncated_bursts: AtomicU64,
+    bursts: AtomicU64,
+    running: AtomicBool,
+    wakeup_lock: Mutex<()>,
+    wakeup: Condvar,
+}
+
+impl EdgeRing{
+    fn new(capacity: usize) -> Self {
+        EdgeRing{
+            slots: (0..capacity.max(2)).map(|_| AtomicU64::new(0)).collect(),
+            head: AtomicUsize::new(0),
+            tail: AtomicUsize::new(0),
+            overruns: AtomicU64::new(0),
+            truncated_bursts: AtomicU64::new(0),
+            bursts: AtomicU64::new(0),
+            running: AtomicBool::new(true),
+            wakeup_lock: Mutex::new(()),
+            wakeup: Condvar::new(),
+        }
+    }
+
+    fn push(&self, timestamp_ns: u64, kind: u64) -> bool {
+        let head = self.head.load(Ordering::Relaxed);
+        let tail = self.tail.load(Ordering::Acquire);
+        if head.wrapping_sub(tail) >= self.slots.len() {
+            self.overruns.fetch_add(1, Ordering::Relaxed);
+            return false;
+        }
+        self.slots[head % self.slots.len()].store(timestamp_ns << 2 | kind, Ordering::Relaxed);
+        self.head.store(head.wrapping_add(1), Ordering::Release);
+        true
+    }
+
+    fn pop(&self) -> Option<(u64, u64)> {
+        let tail = self.tail.load(Ordering::Relaxed);
+        let head = self.head.load(Ordering::Acquire);
+        if tail == head {
+            return None;
+        }
+        let entry = self.slots[tail % self.slots.len()].load(Ordering::Relaxed);
+        self.tail.store(tail.wrapping_add(1), Ordering::Release);
+        Some((entry >> 2, entry & 3))
+    }
+
+    fn notify(&self) {
+        let _guard = self.wakeup_lock.lock();
+        self.wakeup.notify_all();
+    }
+}
+
+/// Producer side of a burst: marks are only lost if the ring is full.
+struct BurstWriter{
+    ring: Arc<EdgeRing>,
+    in_burst: bool,
+    dropped: bool,
+}
+
+impl BurstWriter{
+    fn start(&mut self, timestamp_ns: u64) {
+        self.in_burst = true;
+        self.dropped = !self.ring.push(timestamp_ns, ENTRY_BURST_START);
+    }
+
+    fn push(&mut self, timestamp_ns: u64, kind: u64) {
+        if !self.ring.push(timestamp_ns, kind) {
+            self.dropped = true;
+        }
+    }
+
+    fn end(&mut self, timestamp_ns: u64) {
+        self.in_burst = false;
+        if !self.ring.push(timestamp_ns, ENTRY_BURST_END) || self.dropped {
+            self.ring.truncated_bursts.fetch_add(1, Ordering::Relaxed);
+        }
+        self.ring.bursts.fetch_add(1, Ordering::Relaxed);
+        self.ring.notify();
+    }
+}
+
+// poll timeout of the capture thread, to notice stop() while idle
+const BACKGROUND_POLL: Duration = Duration::from_millis(100);
+
+fn run_asynchronous_capture(pins: CapturePins, mut writer: BurstWriter) {
+    let threshold_pin_number = pins.threshold_pin.pin();
+    let mut reset = true;
+    while writer.ring.running.load(Ordering::Relaxed) {
+        match pins.gpio.poll_interrupts(&[&pins.threshold_pin, &pins.data_pin], reset, Some(BACKGROUND_POLL)) {
+            Ok(None) => {},
+            Ok(Some((pin, level))) => {
+                let timestamp_ns = monotonic_ns();
+                if pin.pin() == threshold_pin_number {
+                    if level == Level::High && !writer.in_burst {
+                        writer.start(timestamp_ns);
+                    } else if level == Level::Low && writer.in_burst {
+                        writer.end(timestamp_ns);
+                    }
+                } else if writer.in_burst {
+                    writer.push(timestamp_ns, if level == Level::High { ENTRY_HIGH } else { ENTRY_LOW });
+                }
+            },
+            Err(_) => break,
+        }
+        reset = false;
+    }
+    if writer.in_burst {
+        writer.end(monotonic_ns());
+    }
+    writer.ring.running.store(false, Ordering::Relaxed);
+    writer.ring.notify();
+}
+
+fn run_synchronous_capture(pins: CapturePins, mut writer: BurstWriter, max_same_bits: u8) {
+    // threshold_pin is the serial clock here
+    let clock_pin_number = pins.threshold_pin.pin();
+    let mut same_bits = 0;
+    let mut last_bit = ENTRY_HIGH;
+    let mut reset = true;
+    while writer.ring.running.load(Ordering::Relaxed) {
+        // a burst ends when the clock stops, like in synchronous_serial_read
+        let timeout = if writer.in_burst { Duration::from_micros(2000) } else { BACKGROUND_POLL };
+        match pins.gpio.poll_interrupts(&[&pins.threshold_pin, &pins.data_pin], reset, Some(timeout)) {
+            Ok(None) => {
+                if writer.in_burst {
+                    writer.end(monotonic_ns());
+                }
+            },
+            Ok(Some((pin, level))) => {
+                let timestamp_ns = monotonic_ns();
+                if pin.pin() != clock_pin_number {
+                    // rising edge on the data pin starts a burst
+                    if level == Level::High && !writer.in_burst {
+                        writer.start(timestamp_ns);
+                        writer.push(timestamp_ns, ENTRY_HIGH);
+                        same_bits = 1;
+                        last_bit = ENTRY_HIGH;
+                    }
+                } else if level == Level::High && writer.in_burst {
+                    let bit = if pins.data_pin.read() == Level::High { ENTRY_HIGH } else { ENTRY_LOW };
+                    writer.push(timestamp_ns, bit);
+                    if bit == last_bit {
+                        same_bits += 1;
+                    } else {
+                        same_bits = 1;
+                        last_bit = bit;
+                    }
+                    if same_bits >= max_same_bits {
+                        writer.end(timestamp_ns);
+                    }
+                }
+            },
+            Err(_) => break,
+        }
+        reset = false;
+    }
+    if writer.in_burst {
+        writer.end(monotonic_ns());
+    }
+    writer.ring.running.store(false, Ordering::Relaxed);
+    writer.ring.notify();
+}
+
+/// Burst being assembled by the reader.
+struct BurstReader{
+    start_capture_ns: Option<u64>,
+    timestamps_ns: Vec<u64>,
+    levels: Vec<u8>,
+}
+
+/// Gapless capture in a background thread.
+///
+/// The thread captures continuously into a ring buffer, while Python processes the
+/// previous bursts. A burst is a packet: in asynchronous mode the edges of the data
+/// pin while the threshold pin (carrier sense) is high, in synchronous mode the bits
+/// sampled on the rising clock edges from a rising edge of the data pin until
+/// max_same_bits equal bits in a row or the clock stops.
+///
+/// When the reader falls behind and the ring is full, entries are dropped. They are
+/// counted in overruns, the bursts missing entries in truncated_bursts.
+///
+/// Iterating yields CapturedTransitions (asynchronous) or CapturedBits (synchronous)
+/// until the capture is stopped.
+#[pyclass]
+pub struct BackgroundCapture{
+    ring: Arc<EdgeRing>,
+    reader: Mutex<BurstReader>,
+    synchronous: bool,
+    thread: Mutex<Option<JoinHandle<()>>>,
+}
+
+impl BackgroundCapture{
+    fn start(threshold_pin_number: u8, data_pin_number: u8, synchronous: bool, capacity: usize, max_same_bits: u8) -> PyResult<Self> {
+        let gpio = Gpio::new()
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        let mut threshold_pin = gpio.get(threshold_pin_number)
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?
+            .into_input();
+        let mut data_pin = gpio.get(data_pin_number)
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?
+            .into_input();
+        let (threshold_trigger, data_trigger) = if synchronous {
+            (Trigger::RisingEdge, Trigger::RisingEdge)
+        } else {
+            (Trigger::Both, Trigger::Both)
+        };
+        threshold_pin.set_interrupt(threshold_trigger)
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        data_pin.set_interrupt(data_trigger)
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        let pins = CapturePins{gpio, threshold_pin, data_pin};
+
+        let ring = Arc::new(EdgeRing::new(capacity));
+        let writer = BurstWriter{ring: ring.clone(), in_burst: false, dropped: false};
+        let thread = std::thread::Builder::new()
+            .name("cc1101-capture".to_string())
+            .spawn(move || {
+                if synchronous {
+                    run_synchronous_capture(pins, writer, max_same_bits)
+                } else {
+                    run_asynchronous_capture(pins, writer)
+                }
+            })
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        Ok(BackgroundCapture{
+            ring,
+            reader: Mutex::new(BurstReader{start_capture_ns: None, timestamps_ns: Vec::new(), levels: Vec::new()}),
+            synchronous,
+            thread: Mutex::new(Some(thread)),
+        })
+    }
+
+    /// Pops entries until a burst is complete. Returns None on timeout, or when the
+    /// capture has stopped and the ring is drained.
+    fn next_burst_non_py(&self, timeout: Option<Duration>) -> PyResult<Option<Capture>> {
+        let deadline = timeout.map(|timeout| Instant::now() + timeout);
+        let mut reader = self.reader.lock()
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+        loop {
+            while let Some((timestamp_ns, kind)) = self.ring.pop() {
+                match kind {
+                    ENTRY_BURST_START => {
+                        // the end of the last burst was dropped, discard the rest of it
+                        reader.start_capture_ns = Some(timestamp_ns);
+                        reader.timestamps_ns.clear();
+                        reader.levels.clear();
+                    },
+                    ENTRY_BURST_END => {
+                        if let Some(start_capture_ns) = reader.start_capture_ns.take() {
+                            let start_time = SystemTime::now()
+                                .duration_since(UNIX_EPOCH)
+                                .map_err(|e| pyo3::exceptions::PyValueError::new_err(e.to_string()))?
+                                .saturating_sub(Duration::from_nanos(monotonic_ns().saturating_sub(start_capture_ns)));
+                            return Ok(Some(Capture{
+                                start_time,
+                                start_capture_ns,
+                                end_capture_ns: timestamp_ns,
+                                timestamps_ns: std::mem::take(&mut reader.timestamps_ns),
+                                levels: std::mem::take(&mut reader.levels),
+                            }));
+                        }
+                    },
+                    _ => {
+                        if reader.start_capture_ns.is_some() {
+                            reader.timestamps_ns.push(timestamp_ns);
+                            reader.levels.push(kind as u8);
+                        }
+                    },
+                }
+            }
+            if !self.ring.running.load(Ordering::Relaxed) && self.ring.head.load(Ordering::Acquire) == self.ring.tail.load(Ordering::Relaxed) {
+                return Ok(None);
+            }
+            let mut wait = BACKGROUND_POLL;
+            if let Some(deadline) = deadline {
+                let now = Instant::now();
+                if now >= deadline {
+                    return Ok(None);
+                }
+                wait = wait.min(deadline - now);
+            }
+            // the wait is short, a wakeup between pop and wait only delays the burst
+            let guard = self.ring.wakeup_lock.lock()
+                .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+            let _ = self.ring.wakeup.wait_timeout(guard, wait.min(Duration::from_millis(10)));
+        }
+    }
+
+    fn to_python(&self, py: Python<'_>, capture: Capture) -> PyResult<PyObject> {
+        if self.synchronous {
+            let mut packed = vec![0u8; (capture.levels.len() + 7) / 8];
+            for (i, &bit) in capture.levels.iter().enumerate() {
+                packed[i / 8] |= bit << (7 - i % 8);
+            }
+            let bits = CapturedBits{
+                start_capture: capture.start_time,
+                end_capture: capture.start_time + Duration::from_nanos(capture.end_capture_ns - capture.start_capture_ns),
+                packed: Py::new(py, CaptureArray::new(ArrayData::U8(packed)))?,
+                bit_length: capture.levels.len(),
+            };
+            Ok(Py::new(py, bits)?.into_any())
+        } else {
+            Ok(Py::new(py, CapturedTransitions::from_capture(py, capture)?)?.into_any())
+        }
+    }
+}
+
+#[pymethods]
+impl BackgroundCapture{
+    /// Starts capturing edges in asynchronous serial mode (GDO0 carrier sense, GDO2 data).
+    #[staticmethod]
+    #[pyo3(signature = (threshold_pin_number, data_pin_number, capacity=65536))]
+    fn asynchronous(threshold_pin_number: u8, data_pin_number: u8, capacity: usize) -> PyResult<Self> {
+        BackgroundCapture::start(threshold_pin_number, data_pin_number, false, capacity, 0)
+    }
+
+    /// Starts capturing bits in synchronous serial mode (GDO2 clock, GDO0 data).
+    #[staticmethod]
+    #[pyo3(signature = (clock_pin_number, data_pin_number, max_same_bits=16, capacity=65536))]
+    fn synchronous(clock_pin_number: u8, data_pin_number: u8, max_same_bits: u8, capacity: usize) -> PyResult<Self> {
+        BackgroundCapture::start(clock_pin_number, data_pin_number, true, capacity, max_same_bits)
+    }
+
+    /// Waits for the next burst. Returns None on timeout, or when the capture has
+    /// stopped and all bursts were read. None as timeout waits forever. Releases the GIL.
+    #[pyo3(signature = (timeout_ms=None))]
+    fn next_burst(&self, py: Python<'_>, timeout_ms: Option<u64>) -> PyResult<Option<PyObject>> {
+        let deadline = timeout_ms.map(|ms| Instant::now() + Duration::from_millis(ms));
+        loop {
+            // wait in slices, so KeyboardInterrupt gets through
+            let wait = match deadline {
+                Some(deadline) => deadline.saturating_duration_since(Instant::now()).min(BACKGROUND_POLL),
+                None => BACKGROUND_POLL,
+            };
+            if let Some(capture) = py.allow_threads(|| self.next_burst_non_py(Some(wait)))? {
+                return Ok(Some(self.to_python(py, capture)?));
+            }
+            if !self.ring.running.load(Ordering::Relaxed) && self.ring.head.load(Ordering::Acquire) == self.ring.tail.load(Ordering::Relaxed) {
+                return Ok(None);
+            }
+            if deadline.is_some_and(|deadline| Instant::now() >= deadline) {
+                return Ok(None);
+            }
+            py.check_signals()?;
+        }
+    }
+
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&self, py: Python<'_>) -> PyResult<Option<PyObject>> {
+        self.next_burst(py, None)
+    }
+
+    /// Stops the capture thread and releases the pins. Bursts already captured can
+    /// still be read.
+    fn stop(&self, py: Python<'_>) -> PyResult<()> {
+        self.ring.running.store(false, Ordering::Relaxed);
+        let thread = self.thread.lock()
+            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?
+            .take();
+        if let Some(thread) = thread {
+            py.allow_threads(|| thread.join())
+                .map_err(|_| PyRuntimeError::new_err("Capture thread panicked."))?;
+        }
+        Ok(())
+    }
+
+    #[getter]
+    fn get_running(&self) -> bool {
+        self.ring.running.load(Ordering::Relaxed)
+    }
+    /// Number of entries (edges, bits or burst marks) dropped because the ring was full.
+    #[getter]
+    fn get_overruns(&self) -> u64 {
+        self.ring.overruns.load(Ordering::Relaxed)
+    }
+    /// Number of bursts that lost entries.
+    #[getter]
+    fn get_truncated_bursts(&self) -> u64 {
+        self.ring.truncated_bursts.load(Ordering::Relaxed)
+    }
+    /// Number of bursts captured so far.
+    #[getter]
+    fn get_bursts(&self) -> u64 {
+        self.ring.bursts.load(Ordering::Relaxed)
+    }
+    #[getter]
+    fn get_capacity(&self) -> usize {
+        self.ring.slots.len()
+    }
+}
+
+impl Drop for BackgroundCapture{
+    fn drop(&mut self) {
+        self.ring.running.store(false, Ordering::Relaxed);
+        if let Ok(mut thread) = self.thread.lock() {
+            if let Some(thread) = thread.take() {
+                let _ = thread.join();
+            }
+        }
     }
-    
-    let end_capture = SystemTime::now()
-        .duration_since(UNIX_EPOCH)
-        .map_err(|e| pyo3::exceptions::PyValueError::new_err(e.to_string()))?;
-    Ok(Some(CapturedTransitions{start_capture, end_capture, transitions}))
-    
 }
 
 #[pyfunction]
-fn asynchronous_serial_write(data_pin_number:u8, baudrate:u32, data:Vec<u8>) -> PyResult<Option<()>> {
-    let gpio = Gpio::new()
-        .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
-    
-    let pin = gpio.get(data_pin_number)
-        .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+fn asynchronous_serial_read(py: Python<'_>, threshold_pin_number: u8, data_pin_number:u8, timeout_ms: u64) -> PyResult<Option<CapturedTransitions>> {
+    // One-shot capture, use CaptureSession for repeated captures
+    CaptureSession::new(threshold_pin_number, data_pin_number)?.capture(py, timeout_ms)
+}
+
+// time before a deadline that is spun instead of slept, covers the sleep overshoot
+const DEFAULT_SPIN_US: u64 = 200;
+const TX_REALTIME_PRIORITY: c_int = 80;
+
+/// Sleeps until shortly before the deadline and spins for the rest.
+fn wait_until_ns(deadline_ns: u64, spin_ns: u64) {
+    loop {
+        let now = monotonic_ns();
+        if now >= deadline_ns {
+            return;
+        }
+        let remaining = deadline_ns - now;
+        if remaining > spin_ns {
+            sleep(Duration::from_nanos(remaining - spin_ns));
+        } else {
+            std::hint::spin_loop();
+        }
+    }
+}
 
-    let mut data_pin = pin.into_output();
+/// Switches the calling thread to SCHED_FIFO, returns the previous policy to restore,
+/// or None if not permitted (needs CAP_SYS_NICE).
+fn enter_realtime() -> Option<(c_int, libc::sched_param)> {
+    unsafe {
+        let thread = libc::pthread_self();
+        let mut policy: c_int = 0;
+        let mut previous: libc::sched_param = std::mem::zeroed();
+        if libc::pthread_getschedparam(thread, &mut policy, &mut previous) != 0 {
+            return None;
+        }
+        let mut param: libc::sched_param = std::mem::zeroed();
+        param.sched_priority = TX_REALTIME_PRIORITY;
+        if libc::pthread_setschedparam(thread, libc::SCHED_FIFO, &param) != 0 {
+            return None;
+        }
+        Some((policy, previous))
+    }
+}
+
+fn leave_realtime(previous: (c_int, libc::sched_param)) {
+    unsafe {
+        libc::pthread_setschedparam(libc::pthread_self(), previous.0, &previous.1);
+    }
+}
+
+/// Timing of a transmission in asynchronous serial mode.
+///
+/// jitter_ns holds for each edge how late the pin was set after its deadline.
+#[pyclass(frozen)]
+pub struct TransmitReport{
+    start_ns: u64,
+    end_ns: u64,
+    realtime: bool,
+    jitter_ns: Py<CaptureArray>,
+}
 
-    let bit_time = 1.0 / baudrate as f64;
+#[pymethods]
+impl TransmitReport{
+    /// Monotonic time of the first edge deadline in nanoseconds.
+    #[getter]
+    fn get_start_ns(&self) -> u64{
+        self.start_ns
+    }
+    /// Monotonic time the pin was set low after the last symbol.
+    #[getter]
+    fn get_end_ns(&self) -> u64{
+        self.end_ns
+    }
+    /// Whether the transmission ran with real-time priority.
+    #[getter]
+    fn get_realtime(&self) -> bool{
+        self.realtime
+    }
+    /// Lateness of each edge in nanoseconds (u64 array).
+    #[getter]
+    fn get_jitter_ns(&self, py: Python<'_>) -> Py<CaptureArray>{
+        self.jitter_ns.clone_ref(py)
+    }
+    #[getter]
+    fn get_max_jitter_ns(&self) -> u64{
+        self.jitter_ns.get().as_u64().iter().copied().max().unwrap_or(0)
+    }
+    #[getter]
+    fn get_mean_jitter_ns(&self) -> f64{
+        let jitter = self.jitter_ns.get().as_u64();
+        if jitter.is_empty() {
+            return 0.0;
+        }
+        jitter.iter().sum::<u64>() as f64 / jitter.len() as f64
+    }
+}
+
+/// Sets the pin at absolute deadlines from a monotonic start, so sleep overshoot
+/// doesn't accumulate. edges are (level, offset from the start in ns), end_offset_ns
+/// is the end of the last symbol, the pin is set low there.
+fn transmit_edges_non_py(data_pin_number: u8, edges: &[(u8, u64)], end_offset_ns: u64, realtime: bool, spin_ns: u64) -> PyResult<(u64, u64, bool, Vec<u64>)> {
+    let mut data_pin = Gpio::new()
+        .map_err(|err| PyRuntimeError::new_err(err.to_string()))?
+        .get(data_pin_number)
+        .map_err(|err| PyRuntimeError::new_err(err.to_string()))?
+        .into_output_low();
+
+    let previous = if realtime { enter_realtime() } else { None };
+    let mut jitter_ns: Vec<u64> = Vec::with_capacity(edges.len());
+    // the pin setup isn't part of the first symbol
+    let start_ns = monotonic_ns() + spin_ns;
+    for &(level, offset_ns) in edges {
+        let deadline_ns = start_ns + offset_ns;
+        wait_until_ns(deadline_ns, spin_ns);
+        if level == GPIO_LOW {
+            data_pin.set_low();
+        } else {
+            data_pin.set_high();
+        }
+        jitter_ns.push(monotonic_ns() - deadline_ns);
+    }
+    wait_until_ns(start_ns + end_offset_ns, spin_ns);
+    data_pin.set_low();
+    let end_ns = monotonic_ns();
+    let entered_realtime = previous.is_some();
+    if let Some(previous) = previous {
+        leave_realtime(previous);
+    }
+    Ok((start_ns, end_ns, entered_realtime, jitter_ns))
+}
+
+fn transmit_edges(py: Python<'_>, data_pin_number: u8, edges: Vec<(u8, u64)>, end_offset_ns: u64, realtime: bool, spin_us: u64) -> PyResult<TransmitReport> {
+    let (start_ns, end_ns, realtime, jitter_ns) = py.allow_threads(|| {
+        transmit_edges_non_py(data_pin_number, &edges, end_offset_ns, realtime, spin_us * 1000)
+    })?;
+    Ok(TransmitReport{
+        start_ns,
+        end_ns,
+        realtime,
+        jitter_ns: Py::new(py, CaptureArray::new(ArrayData::U64(jitter_ns)))?,
+    })
+}
+
+/// Transmits bytes in asynchronous serial mode, bits LSB first. Each bit edge is set at
+/// its absolute deadline, see asynchronous_serial_write_edges.
+#[pyfunction]
+#[pyo3(signature = (data_pin_number, baudrate, data, realtime=false, spin_us=DEFAULT_SPIN_US))]
+fn asynchronous_serial_write(py: Python<'_>, data_pin_number:u8, baudrate:u32, data: &Bound<'_, PyAny>, realtime: bool, spin_us: u64) -> PyResult<TransmitReport> {
+    let data = extract_data(data)?;
+    if baudrate == 0 {
+        return Err(PyRuntimeError::new_err("Invalid baudrate."));
+    }
+    // one edge per run of equal bits, deadlines from the bit index, no rounding drift
+    let bit_offset_ns = |bit_index: u64| bit_index * 1_000_000_000 / baudrate as u64;
+    let mut edges: Vec<(u8, u64)> = Vec::new();
+    let mut bit_index: u64 = 0;
     for byte in data{
         for i in 0..8{
-            // Write the bit to the data pin
             let bit = (byte >> i) & 1;
-            // Wait for the bit time
-            std::thread::sleep(Duration::from_secs_f64(bit_time));
-            // Write the bit to the data pin
-            match bit{
-                0 => data_pin.set_low(),
-                1 => data_pin.set_high(),
-                _ => return Err(PyRuntimeError::new_err("Invalid bit value.")),
-            };
+            if edges.last().map_or(true, |&(level, _)| level != bit) {
+                edges.push((bit, bit_offset_ns(bit_index)));
+            }
+            bit_index += 1;
         }
     }
-    Ok(Some(()))
+    transmit_edges(py, data_pin_number, edges, bit_offset_ns(bit_index), realtime, spin_us)
+}
+
+/// Transmits an edge list in asynchronous serial mode: (level, duration in ns) for each
+/// symbol. The pin is set at absolute deadlines from a monotonic start: coarse sleep,
+/// then spinning for the last spin_us. With realtime, the thread runs with SCHED_FIFO
+/// priority if permitted. Releases the GIL.
+#[pyfunction]
+#[pyo3(signature = (data_pin_number, edges, realtime=false, spin_us=DEFAULT_SPIN_US))]
+fn asynchronous_serial_write_edges(py: Python<'_>, data_pin_number:u8, edges: Vec<(u8, u64)>, realtime: bool, spin_us: u64) -> PyResult<TransmitReport> {
+    let mut offset_ns: u64 = 0;
+    let mut offsets: Vec<(u8, u64)> = Vec::with_capacity(edges.len());
+    for (level, duration_ns) in edges {
+        offsets.push((level, offset_ns));
+        offset_ns += duration_ns;
+    }
+    transmit_edges(py, data_pin_number, offsets, offset_ns, realtime, spin_us)
 }
 
 #[pyfunction]
-fn synchronous_serial_write(clock_pin_number: u8, data_pin_number:u8, data:Vec<u8>) -> PyResult<Option<()>> {
+fn synchronous_serial_write(clock_pin_number: u8, data_pin_number:u8, data: &Bound<'_, PyAny>) -> PyResult<Option<()>> {
+    let data = extract_data(data)?;
     
     let mut data_pin = Gpio::new()
         .map_err(|err| PyRuntimeError::new_err(err.to_string()))?
@@ -208,10 +1173,19 @@ fn synchronous_serial_write(clock_pin_number: u8, data_pin_number:u8, data:Vec<u
 }
 
 #[pyfunction]
-fn synchronous_serial_read(clock_pin_number: u8, data_pin_number:u8, timeout_ms: u64, max_same_bits: u8) -> PyResult<Option<CapturedBits>> {
+fn synchronous_serial_read(py: Python<'_>, clock_pin_number: u8, data_pin_number:u8, timeout_ms: u64, max_same_bits: u8) -> PyResult<Option<CapturedBits>> {
     // Wait for the rising edge on GDO0
     
-    let mut bits: Vec<u8> = Vec::new();
+    let mut packed: Vec<u8> = Vec::new();
+    let mut bit_length: usize = 0;
+    let mut push_bit = |bit: u8| {
+        if bit_length % 8 == 0 {
+            packed.push(0);
+        }
+        let last = packed.len() - 1;
+        packed[last] |= bit << (7 - bit_length % 8);
+        bit_length += 1;
+    };
 
     let mut data_pin = Gpio::new()
         .map_err(|err| PyRuntimeError::new_err(err.to_string()))?
@@ -230,7 +1204,7 @@ fn synchronous_serial_read(clock_pin_number: u8, data_pin_number:u8, timeout_ms:
 
     let _ = wait_for_interrupt_non_py(&mut data_pin, Duration::from_millis(timeout_ms), Trigger::RisingEdge).ok_or_else(|| PyRuntimeError::new_err("Timeout waiting for rising edge"))?;
     
-    bits.push(1);
+    push_bit(1);
 
     let start_capture = SystemTime::now()
         .duration_since(UNIX_EPOCH)
@@ -241,7 +1215,7 @@ fn synchronous_serial_read(clock_pin_number: u8, data_pin_number:u8, timeout_ms:
 
         let bit = data_pin.read();
         if bit == Level::High{
-            bits.push(1);
+            push_bit(1);
             if last_bit == 1{
                 same_bits += 1;
             }else{
@@ -249,7 +1223,7 @@ fn synchronous_serial_read(clock_pin_number: u8, data_pin_number:u8, timeout_ms:
                 last_bit = 1;
             }
         }else{
-            bits.push(0);
+            push_bit(0);
             if last_bit == 0{
                 same_bits += 1;
             }else{
@@ -266,7 +1240,8 @@ fn synchronous_serial_read(clock_pin_number: u8, data_pin_number:u8, timeout_ms:
         .duration_since(UNIX_EPOCH)
         .map_err(|e| pyo3::exceptions::PyValueError::new_err(e.to_string()))?;
 
-    Ok(Some(CapturedBits{start_capture, end_capture, bits}))
+    let packed = Py::new(py, CaptureArray::new(ArrayData::U8(packed)))?;
+    Ok(Some(CapturedBits{start_capture, end_capture, packed, bit_length}))
 
 }
 
@@ -274,9 +1249,15 @@ fn synchronous_serial_read(clock_pin_number: u8, data_pin_number:u8, timeout_ms:
 fn rust_rpi_cc1101_driver(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(asynchronous_serial_read, m)?)?;
     m.add_function(wrap_pyfunction!(asynchronous_serial_write, m)?)?;
+    m.add_function(wrap_pyfunction!(asynchronous_serial_write_edges, m)?)?;
     m.add_function(wrap_pyfunction!(synchronous_serial_read, m)?)?;
     m.add_function(wrap_pyfunction!(synchronous_serial_write, m)?)?;
     m.add_function(wrap_pyfunction!(wait_for_interrupt, m)?)?;
+    m.add_class::<SpiDevice>()?;
+    m.add_class::<CaptureSession>()?;
+    m.add_class::<CaptureArray>()?;
+    m.add_class::<BackgroundCapture>()?;
+    m.add_class::<TransmitReport>()?;
 
     m.add("TRIGGER_DISABLED", TRIGGER_DISABLED)?;
     m.add("TRIGGER_RISING_EDGE", TRIGGER_RISING_EDGE)?;
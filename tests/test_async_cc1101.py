@@ -0,0 +1,88 @@
+import unittest
+from unittest import mock
+import asyncio
+import sys
+import os
+sys.path.append(os.path.abspath('src/epCC1101'))
+from epCC1101 import Cc1101, AsyncCc1101, NormalTxPacket, addresses as addr
+from epCC1101.emulator import Driver, Medium
+
+class TestAsyncCc1101(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.medium = Medium()
+        self.driver = Driver(gdo0=23, medium=self.medium)
+        self.cc1101 = Cc1101(driver=self.driver)
+        self.configure(self.cc1101)
+        self.radio = AsyncCc1101(self.cc1101)
+
+    def configure(self, cc1101):
+        cc1101.configurator.set_GDOx_config(0, 0x06)
+        cc1101.configurator.set_data_rate_baud(4800)
+        cc1101.configurator.set_packet_length_mode(1)
+        cc1101.configurator.set_packet_length(60)
+        cc1101.configurator.set_append_status_enabled(1)
+        cc1101.set_configuration()
+
+    async def test_receive(self):
+        self.driver.chip.inject(bytes([3, 0x11, 0x22, 0x33]), delay=0.001)
+        with mock.patch.object(self.driver, "wait_for_edge", wraps=self.driver.wait_for_edge) as wait_for_edge:
+            packet = await self.radio.receive(timeout_ms=1000)
+        self.assertEqual(packet.payload, bytes([0x11, 0x22, 0x33]))
+        # RPi.GPIO.wait_for_edge raises TypeError for a float timeout
+        self.assertTrue(all(isinstance(call.args[2], int) for call in wait_for_edge.call_args_list))
+        self.assertTrue(packet._crc_ok)
+        self.assertEqual(self.cc1101.get_marc_state(), addr.MARCSTATE_IDLE)
+
+    async def test_receive_fifo_threshold(self):
+        driver = Driver(gdo0=25, gdo2=26, medium=self.medium)
+        cc1101 = Cc1101(driver=driver)
+        self.configure(cc1101)
+        cc1101.configurator.set_GDOx_config(2, 0x00)
+        cc1101.configurator.set_fifo_threshold(7) # 32 bytes
+        cc1101.configurator.set_packet_length(136)
+        cc1101.set_configuration()
+        radio = AsyncCc1101(cc1101)
+
+        driver.chip.inject(bytes([136] + [i & 0xFF for i in range(136)]), delay=0.001)
+        with mock.patch.object(driver, "read_status_register", wraps=driver.read_status_register) as read_status_register:
+            packet = await radio.receive(timeout_ms=1000)
+        self.assertEqual(packet.payload, bytes([i & 0xFF for i in range(136)]))
+        self.assertTrue(packet._crc_ok)
+        self.assertEqual(driver.chip.rx_overflows, 0)
+        # woken by GDO2, the chunks are read without polling RXBYTES
+        self.assertLess(read_status_register.call_count, 3)
+
+    async def test_receive_timeout(self):
+        self.assertIsNone(await self.radio.receive(timeout_ms=100))
+
+    async def test_transmit(self):
+        receiver = Driver(gdo0=24, medium=self.medium)
+        cc1101_receiver = Cc1101(driver=receiver)
+        self.configure(cc1101_receiver)
+        cc1101_receiver.set_receive_mode()
+        await self.radio.transmit(NormalTxPacket(list(range(40))))
+        self.assertEqual(self.medium.frames[-1].data, bytes([40] + list(range(40))))
+        self.assertEqual(self.cc1101.get_marc_state(), addr.MARCSTATE_IDLE)
+
+    async def test_packets_do_not_block_the_loop(self):
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        self.driver.chip.inject(bytes([1, 0x01]), delay=0.050)
+        self.driver.chip.inject(bytes([1, 0x02]), delay=0.200)
+        payloads = []
+        async for packet in self.radio.packets(timeout_ms=1000):
+            payloads.append(packet.payload)
+            if len(payloads) == 2:
+                break
+        task.cancel()
+        self.assertEqual(payloads, [bytes([0x01]), bytes([0x02])])
+        self.assertGreater(ticks, 1)
+
+if __name__ == '__main__':
+    unittest.main()
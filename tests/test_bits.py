@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath('src/epCC1101'))
+from epCC1101.bits import PackedBits
+from epCC1101 import bits as bits_module
+from epCC1101.packet import SyncRxPacket, Princeton25bit_Protocol
+
+class TestPackedBits(unittest.TestCase):
+    def setUp(self):
+        self.list_bits = [1, 1, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1]
+        self.bits = PackedBits.from_bits(self.list_bits)
+
+    def test_packing(self):
+        self.assertEqual(self.bits.data, bytes([0xE8, 0x88]))
+        self.assertEqual(len(self.bits), 13)
+        self.assertEqual(PackedBits(b"\xe8\x88", 13), self.bits)
+
+    def test_sequence(self):
+        self.assertEqual(list(self.bits), self.list_bits)
+        self.assertEqual([self.bits[i] for i in range(-13, 13)], self.list_bits * 2)
+        with self.assertRaises(IndexError):
+            self.bits[13]
+
+    def test_slicing(self):
+        for start in range(14):
+            for stop in range(start, 14):
+                self.assertEqual(list(self.bits[start:stop]), self.list_bits[start:stop])
+        self.assertEqual(list(self.bits[::3]), self.list_bits[::3])
+        self.assertEqual(self.bits[4:8], [1, 0, 0, 0])
+
+    def test_int_and_str(self):
+        self.assertEqual(int(self.bits), 0b1110100010001)
+        self.assertEqual(self.bits.to_str(), "1110100010001")
+        self.assertEqual(PackedBits.from_int(0b101, 5).to_str(), "00101")
+        self.assertEqual(PackedBits().to_str(), "")
+
+    def test_find(self):
+        self.assertEqual(self.bits.find([1, 0, 0, 0]), 4)
+        self.assertEqual(self.bits.find("1000", 5), 8)
+        self.assertEqual(self.bits.find([0, 0, 0, 0]), -1)
+        self.assertIn([1, 1, 1, 0], self.bits)
+        self.assertIn(0, self.bits)
+
+    @unittest.skipIf(bits_module.numpy is None, "numpy not installed")
+    def test_to_numpy(self):
+        self.assertEqual(self.bits.to_numpy().tolist(), self.list_bits)
+
+class TestSyncRxPacket(unittest.TestCase):
+    def test_princeton_parse(self):
+        protocol = Princeton25bit_Protocol()
+        logical_values = {"address": 0xABC, "data": 0x5A}
+        physical_bytes = protocol.get_physical_bytes(logical_values)
+        # leading noise before the first symbol
+        packet = SyncRxPacket(PackedBits(bytes([0x00] + physical_bytes)), timestamp=0)
+        self.assertEqual(protocol.parse(packet.get_bitstream()), logical_values)
+        self.assertEqual(protocol.parse(list(packet.get_bitstream())), logical_values)
+
+if __name__ == '__main__':
+    unittest.main()
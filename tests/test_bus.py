@@ -0,0 +1,90 @@
+import unittest
+from unittest import mock
+import threading
+import time
+import sys
+import os
+sys.path.append(os.path.abspath('src/epCC1101'))
+from epCC1101 import BusArbiter, addresses as addr
+from epCC1101.stubs import spidev
+import epCC1101.rpi_driver as rpi_driver
+
+class TestBusArbiter(unittest.TestCase):
+    def wait_for_waiting(self, arbiter, count):
+        deadline = time.time() + 1
+        while arbiter.get_metrics()["waiting"] < count:
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.001)
+
+    def test_shared_per_bus(self):
+        self.assertIs(BusArbiter.get(10), BusArbiter.get(10))
+        self.assertIsNot(BusArbiter.get(10), BusArbiter.get(11))
+
+    def test_reentrant(self):
+        arbiter = BusArbiter(0)
+        with arbiter:
+            with arbiter:
+                pass
+        self.assertEqual(arbiter.get_metrics()["acquisitions"], 1)
+        self.assertEqual(arbiter.get_metrics()["contentions"], 0)
+
+    def test_release_without_acquire(self):
+        with self.assertRaises(RuntimeError):
+            BusArbiter(0).release()
+
+    def test_first_come_first_served(self):
+        arbiter = BusArbiter(0)
+        order = []
+        def worker(i):
+            with arbiter:
+                order.append(i)
+
+        threads = []
+        arbiter.acquire()
+        for i in range(4):
+            thread = threading.Thread(target=worker, args=(i,))
+            thread.start()
+            threads.append(thread)
+            self.wait_for_waiting(arbiter, i + 1)
+        arbiter.release()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(order, [0, 1, 2, 3])
+        metrics = arbiter.get_metrics()
+        self.assertEqual(metrics["acquisitions"], 5)
+        self.assertEqual(metrics["contentions"], 4)
+        self.assertGreater(metrics["max_wait_ns"], 0)
+        self.assertEqual(metrics["waiting"], 0)
+
+    def test_drivers_share_arbiter(self):
+        with mock.patch.object(rpi_driver, "spidev", spidev):
+            driver_0 = rpi_driver.Driver(spi_bus=12, cs_pin=0)
+            driver_1 = rpi_driver.Driver(spi_bus=12, cs_pin=1)
+        self.assertIs(driver_0.lock(), driver_1.lock())
+        driver_0.arbiter.reset_metrics()
+
+        def worker(driver):
+            for _ in range(100):
+                self.assertEqual(driver.read_status_register(addr.VERSION), 0x14)
+
+        threads = [threading.Thread(target=worker, args=(driver,)) for driver in [driver_0, driver_1]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(driver_0.arbiter.get_metrics()["acquisitions"], 200)
+
+    def test_transaction_holds_bus(self):
+        with mock.patch.object(rpi_driver, "spidev", spidev):
+            driver = rpi_driver.Driver(spi_bus=13, cs_pin=0)
+        driver.arbiter.reset_metrics()
+        with driver.transaction() as transaction:
+            transaction.read_burst(addr.IOCFG2, 3)
+            transaction.write_burst(addr.SYNC1, [0x12, 0x34])
+            transaction.read_byte(addr.SYNC1)
+        self.assertEqual(transaction.results, [[0x29, 0x2E, 0x3F], None, 0x12])
+        self.assertEqual(driver.arbiter.get_metrics()["acquisitions"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
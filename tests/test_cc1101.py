@@ -19,6 +19,15 @@ class TestCc1101(unittest.TestCase):
         version = self.cc1101.get_chip_version()
         self.assertIn(version, [0x04, 0x14])
 
+    def test_transaction(self):
+        partnum, version, _ = self.driver.transaction()\
+            .read_status_register(addr.PARTNUM)\
+            .read_status_register(addr.VERSION)\
+            .command_strobe(addr.SNOP)\
+            .execute()
+        self.assertEqual(partnum, 0x00)
+        self.assertIn(version, [0x04, 0x14])
+
     def test_default_configuration(self):
         self.assertEqual(self.cc1101.configurator.get_GDOx_config(2), 0x29)
         self.assertEqual(self.cc1101.configurator.get_GDOx_config(1), 0x2E)
@@ -95,6 +104,28 @@ class TestCc1101(unittest.TestCase):
         for i in range(1, 8):
             self.assertEqual(patable[i], 0x00)
 
+    def test_set_configuration_partial_write(self):
+        self.cc1101.configurator.set_channel_number(0x05)
+        self.cc1101.configurator.set_sync_word([0xAB, 0xCD])
+        self.cc1101.set_configuration()
+        registers, _ = self.cc1101.get_configuration()
+        self.assertEqual(registers[addr.CHANNR], 0x05)
+        self.assertEqual(registers[addr.SYNC1], 0xAB)
+        self.assertEqual(registers[addr.SYNC0], 0xCD)
+        self.assertEqual(registers[addr.IOCFG2], 0x29)
+
+    def test_get_dirty_register_ranges(self):
+        shadow = [0x00] * 47
+        registers = [0x00] * 47
+        self.assertEqual(Cc1101._get_dirty_register_ranges(shadow, registers), [])
+        registers[addr.CHANNR] = 0x05
+        self.assertEqual(Cc1101._get_dirty_register_ranges(shadow, registers), [(addr.CHANNR, addr.CHANNR+1)])
+        registers[addr.SYNC1] = 0x01
+        registers[addr.PKTCTRL1] = 0x01
+        self.assertEqual(Cc1101._get_dirty_register_ranges(shadow, registers), [(addr.SYNC1, addr.SYNC1+1), (addr.PKTCTRL1, addr.PKTCTRL1+1), (addr.CHANNR, addr.CHANNR+1)])
+        registers[addr.PKTLEN] = 0x01
+        self.assertEqual(Cc1101._get_dirty_register_ranges(shadow, registers), [(addr.SYNC1, addr.PKTCTRL1+1), (addr.CHANNR, addr.CHANNR+1)])
+
     def test_set_idle_mode(self):
         self.cc1101.set_idle_mode()
         state = self.cc1101.get_marc_state()
@@ -0,0 +1,68 @@
+import unittest
+import random
+import sys
+import os
+sys.path.append(os.path.abspath('src/epCC1101'))
+from epCC1101 import coding
+
+def reference_crc16(data, crc=0xFFFF):
+    # bit by bit
+    for byte in data:
+        for i in range(8):
+            bit = (byte >> (7 - i)) & 1
+            crc = ((crc << 1) & 0xFFFF) ^ (0x8005 if (crc >> 15) ^ bit else 0)
+    return crc
+
+class TestCrc16(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.data = bytes(rng.randrange(256) for _ in range(100))
+
+    def test_check_value(self):
+        self.assertEqual(coding.crc16(b"123456789"), 0xAEE7)
+        self.assertEqual(coding.crc16(b""), 0xFFFF)
+
+    def test_matches_reference(self):
+        for length in range(len(self.data)):
+            self.assertEqual(coding.crc16(self.data[:length]), reference_crc16(self.data[:length]))
+
+    def test_incremental(self):
+        crc = coding.Crc16()
+        for i in range(0, len(self.data), 7):
+            crc.update(memoryview(self.data)[i:i + 7])
+        self.assertEqual(crc.value, coding.crc16(self.data))
+        self.assertEqual(crc.digest(), coding.append_crc(self.data)[-2:])
+
+    def test_check_crc(self):
+        frame = coding.append_crc(list(self.data))
+        self.assertTrue(coding.check_crc(frame))
+        self.assertFalse(coding.check_crc(frame[:-1] + bytes([frame[-1] ^ 1])))
+        self.assertFalse(coding.check_crc(b"\x00"))
+
+class TestPn9(unittest.TestCase):
+    def test_sequence(self):
+        # first bytes of the sequence in the CC1101 data sheet / DN509
+        self.assertEqual(coding.pn9(8), bytes.fromhex("ffe11d9aed853324"))
+        self.assertEqual(coding.pn9(1000)[511:], coding.pn9(1000)[:489])
+        self.assertEqual(coding.pn9(3, 510), coding.pn9(600)[510:513])
+
+    def test_whiten(self):
+        data = bytes(range(256)) * 3
+        self.assertEqual(coding.whiten(coding.whiten(data)), data)
+        self.assertEqual(coding.whiten(bytes(5)), coding.pn9(5))
+        pn9 = coding.Pn9()
+        self.assertEqual(b"".join(pn9.apply(data[i:i + 100]) for i in range(0, len(data), 100)), coding.whiten(data))
+        pn9.reset()
+        self.assertEqual(pn9.apply(b"\x00"), b"\xff")
+
+    def test_frame(self):
+        data = b"\x05hello"
+        raw = coding.encode_frame(data)
+        self.assertEqual(len(raw), len(data) + 2)
+        self.assertEqual(coding.decode_frame(raw), (data, True))
+        self.assertEqual(coding.decode_frame(raw[:-1] + b"\x00")[1], False)
+        self.assertEqual(coding.decode_frame(coding.encode_frame(data, whitening=False), whitening=False), (data, True))
+        self.assertEqual(coding.decode_frame(data, crc=False, whitening=False), (data, True))
+
+if __name__ == '__main__':
+    unittest.main()
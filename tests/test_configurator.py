@@ -275,6 +275,42 @@ class TestCc1101Configurator(unittest.TestCase):
         self.assertEqual(configurator._registers[addr.CHANNR], 0x34)
         self.assertEqual(configurator.get_channel_number(), 0x34)
 
+    def test_txoff_mode(self):
+        configurator = Cc1101Configurator()
+
+        configurator.set_txoff_mode(2)
+        self.assertEqual(configurator._registers[addr.MCSM1], 0x32)
+        self.assertEqual(configurator.get_txoff_mode(), 2)
+
+        configurator.set_rxoff_mode(3)
+        configurator.set_txoff_mode(1)
+        self.assertEqual(configurator._registers[addr.MCSM1], 0x3D)
+        self.assertEqual(configurator.get_txoff_mode(), 1)
+
+    def test_fifo_threshold(self):
+        configurator = Cc1101Configurator()
+
+        configurator.set_fifo_threshold(7)
+        self.assertEqual(configurator._registers[addr.FIFOTHR], 0x07)
+        self.assertEqual(configurator.get_rx_fifo_threshold_bytes(), 32)
+        self.assertEqual(configurator.get_tx_fifo_threshold_bytes(), 33)
+
+        configurator.set_fifo_threshold(15)
+        self.assertEqual(configurator._registers[addr.FIFOTHR], 0x0F)
+        self.assertEqual(configurator.get_rx_fifo_threshold_bytes(), 64)
+        self.assertEqual(configurator.get_tx_fifo_threshold_bytes(), 1)
+
+    def test_rxoff_mode(self):
+        configurator = Cc1101Configurator()
+
+        configurator.set_rxoff_mode(3)
+        self.assertEqual(configurator._registers[addr.MCSM1], 0x3C)
+        self.assertEqual(configurator.get_rxoff_mode(), 3)
+
+        configurator.set_rxoff_mode(0)
+        self.assertEqual(configurator._registers[addr.MCSM1], 0x30)
+        self.assertEqual(configurator.get_rxoff_mode(), 0)
+
     def test_sample_1(self):
         configurator = Cc1101Configurator(preset=presets.rf_setting_sample_1)
 
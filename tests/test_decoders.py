@@ -0,0 +1,92 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import sys
+import os
+sys.path.append(os.path.abspath('src/epCC1101'))
+from epCC1101.decoders import DecodePipeline, DecodeResult, register_decoder, unregister_decoder, get_decoder, get_decoder_names
+from epCC1101.packet import Protocol, Princeton25bit_Protocol, KiaEv6_Protocol, SyncRxPacket, NormalRxPacket
+from epCC1101 import manchester
+from epCC1101.bits import PackedBits
+
+class FirstByte(Protocol):
+    def decode(self, packet):
+        if not isinstance(packet, NormalRxPacket):
+            return None
+        return {"first": packet._payload[0]}
+
+class Failing(Protocol):
+    def decode(self, packet):
+        raise ValueError("broken")
+
+class TestDecoders(unittest.TestCase):
+    def setUp(self):
+        self.protocol = Princeton25bit_Protocol()
+        self.values = [{"address": 0x123, "data": i} for i in range(10)]
+        self.packets = [SyncRxPacket(PackedBits(bytes([0x00] + self.protocol.get_physical_bytes(values))), timestamp=0) for values in self.values]
+
+    def test_registry(self):
+        self.assertIn("princeton25bit", get_decoder_names())
+        self.assertIsInstance(get_decoder("princeton25bit"), Princeton25bit_Protocol)
+        register_decoder("first_byte")(FirstByte)
+        try:
+            with self.assertRaises(ValueError):
+                register_decoder("first_byte", FirstByte)
+            self.assertIsInstance(get_decoder("first_byte"), FirstByte)
+        finally:
+            unregister_decoder("first_byte")
+        self.assertNotIn("first_byte", get_decoder_names())
+        with self.assertRaises(KeyError):
+            get_decoder("first_byte")
+
+    def test_kia_ev6(self):
+        self.assertIn("kia_ev6", get_decoder_names())
+        data = bytes(range(12))
+        # the Manchester symbols start at the second bit
+        encoded = int.from_bytes(manchester.encode(data), "big")
+        payload = ((encoded >> 1) | (1 << 191)).to_bytes(24, "big")
+        raw = payload + (bytes([0xAA, 0xAA, 0x12, 0x34]) + payload) * 4
+        packet = NormalRxPacket(raw, len(raw), 0, 0, 1, timestamp=0)
+        results = DecodePipeline(["kia_ev6"]).decode(packet)
+        # the last byte is cut by the offset
+        self.assertEqual(results, [DecodeResult("kia_ev6", {"data": data[:11], "payload": payload, "quality": 4}, packet)])
+        broken = NormalRxPacket(raw[:-1] + b"\x00", len(raw), 0, 0, 1, timestamp=0)
+        self.assertEqual(get_decoder("kia_ev6").decode(broken)["quality"], 3)
+        invalid = NormalRxPacket(b"\x00" + raw[1:], len(raw), 0, 0, 1, timestamp=0)
+        self.assertIsNone(get_decoder("kia_ev6").decode(invalid))
+        self.assertIsNone(KiaEv6_Protocol().decode(self.packets[0]))
+
+    def test_fan_out(self):
+        pipeline = DecodePipeline(["princeton25bit", FirstByte(), Failing()])
+        normal = NormalRxPacket(bytes([7, 8]), 2, 0, 0, 1, timestamp=0)
+        self.assertEqual(pipeline.decode(normal), [DecodeResult("FirstByte", {"first": 7}, normal)])
+        results = pipeline.decode(self.packets[0])
+        self.assertEqual(results, [DecodeResult("princeton25bit", self.values[0], self.packets[0])])
+
+    def test_decoder_names(self):
+        with self.assertRaises(ValueError):
+            DecodePipeline([Princeton25bit_Protocol(), Princeton25bit_Protocol(data_bits=4)])
+        with self.assertRaises(ValueError):
+            DecodePipeline(["princeton25bit", ("princeton25bit", FirstByte())])
+        pipeline = DecodePipeline([("princeton_8", Princeton25bit_Protocol()), ("princeton_4", Princeton25bit_Protocol(address_bits=16, data_bits=4))])
+        results = sorted(pipeline.decode(self.packets[3]))
+        self.assertEqual([result.decoder for result in results], ["princeton_4", "princeton_8"])
+        self.assertEqual(results[0].values, {"address": 0x1230, "data": 3})
+        self.assertEqual(results[1].values, self.values[3])
+
+    def test_thread_pool(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            with DecodePipeline(["princeton25bit"], executor=executor) as pipeline:
+                results = list(pipeline.results(self.packets))
+        self.assertEqual(sorted(result.values["data"] for result in results), list(range(10)))
+        self.assertEqual(pipeline.pending, 0)
+
+    def test_process_pool(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            pipeline = DecodePipeline(["princeton25bit"], executor=executor)
+            for packet in self.packets:
+                pipeline.submit(packet)
+            results = pipeline.drain(timeout=30)
+        self.assertEqual(sorted(result.values["data"] for result in results), list(range(10)))
+
+if __name__ == '__main__':
+    unittest.main()
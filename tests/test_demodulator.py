@@ -0,0 +1,162 @@
+import unittest
+from unittest import mock
+import array
+import random
+import sys
+import os
+sys.path.append(os.path.abspath('src/epCC1101'))
+from epCC1101 import demodulator
+from epCC1101.bits import PackedBits
+from epCC1101.packet import AsyncRxPacket, Princeton25bit_Protocol
+
+def to_edges(bits, symbol_time_ns, drift=0.0, jitter_ns=0, seed=1):
+    # edges of an NRZ signal, the symbol time changes by drift per symbol
+    rng = random.Random(seed)
+    levels, timestamps_ns = [], []
+    t = 1e6
+    previous = None
+    for bit in bits:
+        if bit != previous:
+            levels.append(bit)
+            timestamps_ns.append(round(t + rng.uniform(-jitter_ns, jitter_ns)))
+            previous = bit
+        t += symbol_time_ns
+        symbol_time_ns *= 1 + drift
+    levels.append(1 - previous)
+    timestamps_ns.append(round(t))
+    return levels, timestamps_ns
+
+def random_bits(count, seed):
+    rng = random.Random(seed)
+    return [1] + [rng.randrange(2) for _ in range(count - 1)]
+
+def from_runs(runs):
+    # bits with the given run lengths, starting with 1
+    return [bit for i, run in enumerate(runs) for bit in [1 - i % 2] * run]
+
+class TestDemodulator(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(2)
+        self.bits = [1] + [rng.randrange(2) for _ in range(400)]
+
+    def run_both(self, test):
+        test()
+        with mock.patch.object(demodulator, "numpy", None):
+            test()
+
+    def test_estimate_symbol_time(self):
+        levels, timestamps_ns = to_edges(self.bits, 360_000, jitter_ns=20_000)
+        def test():
+            _, durations = demodulator.pulses(levels, timestamps_ns)
+            self.assertAlmostEqual(demodulator.estimate_symbol_time(durations), 360_000, delta=2_000)
+            # only pulses of 2 and 3 symbols
+            self.assertAlmostEqual(demodulator.estimate_symbol_time([720_000, 1_080_000] * 10), 360_000)
+        self.run_both(test)
+
+    def test_estimate_symbol_time_long_runs(self):
+        def test():
+            # 4 and 5 symbols are exactly tolerance apart
+            durations = [360_000] * 10 + [720_000] * 10 + [1_440_000] * 3 + [1_800_000] * 3
+            self.assertAlmostEqual(demodulator.estimate_symbol_time(durations), 360_000)
+            for seed in range(20):
+                rng = random.Random(seed)
+                bits = from_runs([rng.choice([1, 2, 3, 4, 5, 6]) for _ in range(100)])
+                levels, timestamps_ns = to_edges(bits, 360_000, jitter_ns=20_000 if seed % 2 else 0, seed=seed)
+                self.assertEqual(demodulator.nrz(levels, timestamps_ns), bits)
+        self.run_both(test)
+
+    def test_nrz(self):
+        levels, timestamps_ns = to_edges(self.bits, 360_000, jitter_ns=50_000)
+        self.run_both(lambda: self.assertEqual(demodulator.nrz(levels, timestamps_ns, 360_000), self.bits))
+        self.run_both(lambda: self.assertEqual(demodulator.nrz(levels, timestamps_ns), self.bits))
+
+    def test_nrz_drift(self):
+        # the transmitter clock is 2% slow at the end, rounding each pulse with the
+        # nominal symbol time fails
+        def test():
+            for seed in range(10):
+                bits = random_bits(401, seed)
+                levels, timestamps_ns = to_edges(bits, 360_000, drift=0.00005, seed=seed)
+                self.assertEqual(demodulator.nrz(levels, timestamps_ns, 360_000), bits)
+                self.assertNotEqual(demodulator.nrz(levels, timestamps_ns, 360_000, gain=0, phase_gain=0), bits)
+        self.run_both(test)
+
+    def test_nrz_clock_offset(self):
+        # constant offset, the symbol time converges to the one of the transmitter
+        def test():
+            for seed in range(20):
+                bits = random_bits(300, seed)
+                for offset in [0.99, 1.01]:
+                    levels, timestamps_ns = to_edges(bits, 360_000 * offset, seed=seed)
+                    self.assertEqual(demodulator.nrz(levels, timestamps_ns, 360_000), bits)
+                    _, symbol_time_ns = demodulator.recover_clock(demodulator.pulses(levels, timestamps_ns)[1], 360_000)
+                    self.assertAlmostEqual(symbol_time_ns, 360_000 * offset, delta=360_000 * 0.003)
+        self.run_both(test)
+
+    def test_nrz_jitter(self):
+        # edge jitter of up to 10% of a symbol on long frames, with and without offset
+        def test():
+            for seed in range(5):
+                bits = random_bits(2000, seed)
+                for offset in [1, 1.01]:
+                    levels, timestamps_ns = to_edges(bits, 360_000 * offset, jitter_ns=36_000, seed=seed)
+                    self.assertEqual(demodulator.nrz(levels, timestamps_ns, 360_000), bits)
+                    self.assertEqual(demodulator.nrz(levels, timestamps_ns), bits)
+        self.run_both(test)
+
+    def test_nrz_glitch(self):
+        levels = [1, 0, 1, 0, 1]
+        timestamps_ns = [0, 2_000_000, 2_050_000, 4_000_000, 5_000_000]
+        # the glitch is dropped, its time belongs to the next pulse
+        self.run_both(lambda: self.assertEqual(demodulator.nrz(levels, timestamps_ns, 1_000_000), [1, 1, 1, 1, 0]))
+
+    def test_pwm(self):
+        # PT2262 style: 1 is 3 units high and 1 low, 0 is 1 high and 3 low
+        levels, timestamps_ns = [], []
+        t = 0
+        for bit in [1, 0, 0, 1, 1]:
+            high = 3 if bit else 1
+            levels += [1, 0]
+            timestamps_ns += [t, t + high * 350_000]
+            t += 4 * 350_000
+        self.run_both(lambda: self.assertEqual(demodulator.pwm(levels, timestamps_ns), [1, 0, 0, 1, 1]))
+
+    def test_ppm(self):
+        levels, timestamps_ns = [], []
+        t = 0
+        for bit in [0, 1, 1, 0, 1]:
+            levels += [1, 0]
+            timestamps_ns += [t, t + 500_000]
+            t += 500_000 + (2_000_000 if bit else 1_000_000)
+        levels.append(1)
+        timestamps_ns.append(t)
+        self.run_both(lambda: self.assertEqual(demodulator.ppm(levels, timestamps_ns), [0, 1, 1, 0, 1]))
+
+    def test_empty(self):
+        def test():
+            self.assertEqual(len(demodulator.nrz([], [])), 0)
+            self.assertEqual(len(demodulator.pwm([1], [0])), 0)
+            self.assertEqual(len(demodulator.ppm([1], [0])), 0)
+        self.run_both(test)
+
+    def test_zero_width_pulses(self):
+        def test():
+            self.assertIsNone(demodulator.estimate_symbol_time([0, 0, 0]))
+            self.assertEqual(demodulator.estimate_symbol_time([0, 360_000, 0, 720_000, 360_000]), 360_000)
+            self.assertEqual(len(demodulator.nrz([1, 0, 1], [0, 0, 0])), 0)
+            # the zero width pulse has no bits
+            self.assertEqual(demodulator.nrz([1, 0, 1, 0], [0, 0, 1_000_000, 2_000_000]), [0, 1])
+        self.run_both(test)
+
+class TestAsyncRxPacketDemodulation(unittest.TestCase):
+    def test_princeton(self):
+        protocol = Princeton25bit_Protocol()
+        values = {"address": 0x123, "data": 0x45}
+        bits = list(PackedBits(bytes(protocol.get_physical_bytes(values))))
+        levels, timestamps_ns = to_edges(bits, 1e9 / protocol.data_rate, jitter_ns=30_000)
+        packet = AsyncRxPacket(levels=array.array("B", levels), timestamps_ns=array.array("Q", timestamps_ns), timestamp=0)
+        self.assertEqual(packet.get_bitstream(protocol.data_rate), bits[:len(packet.get_bitstream(protocol.data_rate))])
+        self.assertEqual(protocol.decode(packet), protocol.parse(bits))
+
+if __name__ == '__main__':
+    unittest.main()
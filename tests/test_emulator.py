@@ -0,0 +1,238 @@
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+import sys
+import os
+sys.path.append(os.path.abspath('src/epCC1101'))
+from epCC1101 import Cc1101, NormalTxPacket, addresses as addr
+from epCC1101.emulator import Driver, Medium
+
+class TestEmulator(unittest.TestCase):
+    def setUp(self):
+        self.medium = Medium()
+        self.driver = Driver(gdo0=23, medium=self.medium)
+        self.cc1101 = Cc1101(driver=self.driver)
+        self.configure(self.cc1101)
+
+    def configure(self, cc1101, data_rate=4800):
+        cc1101.configurator.set_GDOx_config(0, 0x06)
+        cc1101.configurator.set_data_rate_baud(data_rate)
+        cc1101.configurator.set_packet_length_mode(1)
+        cc1101.configurator.set_packet_length(60)
+        cc1101.configurator.set_append_status_enabled(1)
+        cc1101.set_configuration()
+
+    def assert_int_timeouts(self, wait_for_edge):
+        # RPi.GPIO.wait_for_edge raises TypeError for a float timeout
+        for call in wait_for_edge.call_args_list:
+            timeout = call.kwargs["timeout"] if "timeout" in call.kwargs else call.args[2]
+            self.assertIsInstance(timeout, int)
+
+    def test_chip_id(self):
+        self.assertEqual(self.cc1101.get_chip_partnum(), 0x00)
+        self.assertEqual(self.cc1101.get_chip_version(), 0x14)
+
+    def test_receive_variable_length(self):
+        self.driver.chip.inject(bytes([3, 0x11, 0x22, 0x33]), delay=0.001, rssi=0x40, lqi=0x20)
+        packet = self.cc1101.receive(timeout_ms=1000)
+        self.assertEqual(packet.payload, bytes([0x11, 0x22, 0x33]))
+        self.assertEqual(packet._rssi, 0x40)
+        self.assertEqual(packet._lqi, 0x20)
+        self.assertTrue(packet._crc_ok)
+        self.assertEqual(self.cc1101.get_marc_state(), addr.MARCSTATE_IDLE)
+
+    def test_receive_timeout(self):
+        start = self.driver.now
+        self.assertIsNone(self.cc1101.receive(timeout_ms=100))
+        self.assertGreaterEqual(self.driver.now - start, 0.1)
+
+    def test_receive_address_check(self):
+        self.cc1101.configurator.set_address_check_mode(1)
+        self.cc1101.configurator.set_address(0x42)
+        self.cc1101.set_configuration()
+        self.driver.chip.inject(bytes([2, 0x41, 0x01]), delay=0.001)
+        self.assertIsNone(self.cc1101.receive(timeout_ms=1000))
+        self.driver.chip.inject(bytes([2, 0x42, 0x02]), delay=0.001)
+        packet = self.cc1101.receive(timeout_ms=1000)
+        self.assertEqual(packet.payload, bytes([0x42, 0x02]))
+
+    def test_receive_fifo_threshold(self):
+        driver = Driver(gdo0=25, gdo2=26, medium=self.medium)
+        cc1101 = Cc1101(driver=driver)
+        self.configure(cc1101)
+        cc1101.configurator.set_GDOx_config(2, 0x00)
+        cc1101.configurator.set_fifo_threshold(7) # 32 bytes
+        cc1101.configurator.set_packet_length(136)
+        cc1101.set_configuration()
+
+        driver.chip.inject(bytes([136] + [i & 0xFF for i in range(136)]), delay=0.001)
+        packet = cc1101.receive(timeout_ms=1000)
+        self.assertEqual(packet.payload, bytes([i & 0xFF for i in range(136)]))
+        self.assertTrue(packet._crc_ok)
+        self.assertEqual(driver.chip.rx_overflows, 0)
+
+        driver.chip.inject(bytes([3, 1, 2, 3]), delay=0.001)
+        packet = cc1101.receive(timeout_ms=1000)
+        self.assertEqual(packet.payload, bytes([1, 2, 3]))
+
+    def test_receive_stream_back_to_back(self):
+        # one packet takes 14 ms at 4800 baud, the next one starts right after it
+        for i in range(3):
+            self.driver.chip.inject(bytes([2, i, 0x55]), delay=0.005 + i * 0.015)
+        with mock.patch.object(self.driver, "wait_for_edge", wraps=self.driver.wait_for_edge) as wait_for_edge:
+            payloads = [packet.payload for packet in self.cc1101.receive_stream(timeout_ms=100)]
+        self.assertEqual(payloads, [bytes([0, 0x55]), bytes([1, 0x55]), bytes([2, 0x55])])
+        self.assert_int_timeouts(wait_for_edge)
+        self.assertEqual(self.cc1101.configurator.get_rxoff_mode(), 0)
+        self.assertEqual(self.driver.chip.registers[addr.MCSM1], 0x30)
+        self.assertEqual(self.cc1101.get_marc_state(), addr.MARCSTATE_IDLE)
+
+    def test_receive_stream_fixed_length(self):
+        self.cc1101.configurator.set_packet_length_mode(0)
+        self.cc1101.configurator.set_packet_length(4)
+        self.cc1101.set_configuration()
+        self.driver.chip.inject(bytes([1, 2, 3, 4]), delay=0.005)
+        self.driver.chip.inject(bytes([5, 6, 7, 8]), delay=0.020)
+        stream = self.cc1101.receive_stream(timeout_ms=100)
+        self.assertEqual(next(stream).payload, bytes([1, 2, 3, 4]))
+        self.assertEqual(next(stream).payload, bytes([5, 6, 7, 8]))
+        stream.close()
+        self.assertEqual(self.cc1101.get_marc_state(), addr.MARCSTATE_IDLE)
+
+    def test_receive_stream_overflow(self):
+        self.cc1101.configurator.set_packet_length(100)
+        self.cc1101.set_configuration()
+        self.driver.fifo_rw_interval = 0.5
+        self.driver.chip.inject(bytes([100] + list(range(100))), delay=0.005)
+        self.driver.chip.inject(bytes([1, 0x42]), delay=0.5)
+        # polling too slowly, the 100 byte packet overflows the RX FIFO
+        stream = self.cc1101.receive_stream(timeout_ms=1000)
+        self.assertEqual(next(stream).payload, bytes([0x42]))
+        stream.close()
+        self.assertEqual(self.driver.chip.rx_overflows, 1)
+
+    def test_receive_bursts(self):
+        class Capture:
+            def __init__(self, bursts):
+                self.bursts = bursts
+                self.overruns = 0
+                self.stopped = False
+            def next_burst(self, timeout_ms):
+                return self.bursts.pop(0) if self.bursts else None
+            def stop(self):
+                self.stopped = True
+        bursts = [SimpleNamespace(levels=[1, 0, 1], timestamps_ns=[1000 + 500 * i for i in range(3)], start_capture_ns=1000, start_capture=0.0) for _ in range(5)]
+        capture = Capture(bursts)
+        driver = Driver(gdo0=23, gdo2=24, medium=self.medium)
+        cc1101 = Cc1101(driver=driver)
+        cc1101.configurator.set_packet_format(3)
+        cc1101.configurator.set_GDOx_config(0, 0x0E)
+        cc1101.configurator.set_GDOx_config(2, 0x0D)
+        cc1101.set_configuration()
+        with mock.patch.object(driver, "start_background_capture", return_value=capture) as start:
+            packets = list(cc1101.receive_bursts(timeout_ms=100))
+        start.assert_called_once_with(23, 24, capacity=65536)
+        self.assertEqual(len(packets), 5)
+        self.assertEqual(packets[0].edges, [(1, 0.0), (0, 5e-07), (1, 1e-06)])
+        self.assertTrue(capture.stopped)
+        self.assertEqual(cc1101.get_marc_state(), addr.MARCSTATE_IDLE)
+
+    def test_transmit_to_second_chip(self):
+        receiver = Driver(gdo0=24, medium=self.medium)
+        cc1101_receiver = Cc1101(driver=receiver)
+        self.configure(cc1101_receiver)
+        cc1101_receiver.set_receive_mode()
+        self.cc1101.transmit(NormalTxPacket(list(range(40))))
+        self.assertEqual(self.cc1101.get_marc_state(), addr.MARCSTATE_IDLE)
+        self.assertEqual(self.medium.frames[-1].data, bytes([40] + list(range(40))))
+        self.assertEqual(receiver.chip.rx_fifo, bytes([40] + list(range(40)) + [0x30, 0x90]))
+
+    def test_transmit_without_gdo0(self):
+        # the TX FIFO is refilled and the end of the packet detected from the chip status
+        self.cc1101.configurator.set_packet_length(200)
+        self.cc1101.set_configuration()
+        self.driver.gdo0 = None
+        self.cc1101.transmit(NormalTxPacket(list(range(200))))
+        self.assertEqual(self.driver.chip.tx_underflows, 0)
+        self.assertEqual(self.medium.frames[-1].data, bytes([200] + list(range(200))))
+        self.assertEqual(self.cc1101.get_marc_state(), addr.MARCSTATE_IDLE)
+
+    def test_chip_status(self):
+        status = self.cc1101.get_chip_status()
+        self.assertTrue(status.chip_ready)
+        self.assertEqual(status.state, addr.STATUS_STATE_IDLE)
+        self.assertEqual(status.fifo_bytes, 15)
+        self.driver.write_burst(addr.TXFIFO, [1, 2, 3])
+        # status of the last byte, before it was written
+        self.assertEqual(self.driver.chip_status.fifo_bytes, 15)
+        self.cc1101.set_receive_mode()
+        self.assertEqual(self.cc1101.get_chip_status(read=True).state, addr.STATUS_STATE_RX)
+
+    def test_transmit_many(self):
+        receiver = Driver(gdo0=24, medium=self.medium)
+        cc1101_receiver = Cc1101(driver=receiver)
+        self.configure(cc1101_receiver)
+        packets = [NormalTxPacket([i] * 20) for i in range(5)]
+        start = self.driver.now
+        with mock.patch.object(self.driver, "wait_for_edge", wraps=self.driver.wait_for_edge) as wait_for_edge:
+            timestamps = self.cc1101.transmit_many(packets)
+        self.assert_int_timeouts(wait_for_edge)
+        self.assertEqual(len(timestamps), 5)
+        self.assertEqual(timestamps, sorted(timestamps))
+        frames = self.medium.frames[-5:]
+        self.assertEqual([frame.data for frame in frames], [bytes([20] + [i] * 20) for i in range(5)])
+        # the next packet follows after a preamble, without going through IDLE
+        for previous, frame in zip(frames, frames[1:]):
+            self.assertLess(frame.sync_time - previous.end_time, 0.02)
+        self.assertLess(self.driver.now - start, 5 * 0.05)
+        self.assertEqual(self.driver.chip.tx_underflows, 0)
+        self.assertEqual(self.cc1101.configurator.get_txoff_mode(), 0)
+        self.assertEqual(self.cc1101.get_marc_state(), addr.MARCSTATE_IDLE)
+
+    def test_transmit_many_fstxon(self):
+        packets = [NormalTxPacket([i] * 50) for i in range(3)]
+        timestamps = self.cc1101.transmit_many(packets, txoff_mode=1)
+        self.assertEqual(len(timestamps), 3)
+        self.assertEqual([frame.data for frame in self.medium.frames[-3:]], [bytes([50] + [i] * 50) for i in range(3)])
+
+    def test_transmit_stream(self):
+        data = bytes(i * 7 & 0xFF for i in range(1000))
+        self.cc1101.transmit_stream(data)
+        frame = self.medium.frames[-1]
+        self.assertEqual(frame.data, data)
+        self.assertTrue(frame.complete)
+        self.assertEqual(self.driver.chip.tx_underflows, 0)
+        self.assertEqual(self.cc1101.configurator.get_packet_length_mode(), 1)
+        self.assertEqual(self.driver.chip.configurator.get_packet_length(), 60)
+        self.assertEqual(self.cc1101.get_marc_state(), addr.MARCSTATE_IDLE)
+
+    def test_transmit_stream_tx_threshold(self):
+        driver = Driver(gdo0=25, gdo2=26, medium=self.medium)
+        cc1101 = Cc1101(driver=driver)
+        self.configure(cc1101)
+        cc1101.configurator.set_GDOx_config(2, 0x02)
+        cc1101.configurator.set_fifo_threshold(7)
+        cc1101.set_configuration()
+        data = bytes(i & 0xFF for i in range(512))
+        # iterable of chunks, e.g. a file read in blocks
+        cc1101.transmit_stream((data[i:i+100] for i in range(0, len(data), 100)), length=len(data))
+        self.assertEqual(self.medium.frames[-1].data, data)
+        self.assertEqual(driver.chip.tx_underflows, 0)
+
+    def test_tx_fifo_underflow(self):
+        # at 250 kBaud, the SPI bus at 55.7 kHz can't keep up with the transmitter
+        self.configure(self.cc1101, data_rate=250000)
+        self.cc1101.transmit(NormalTxPacket(list(range(60))))
+        self.assertEqual(self.driver.chip.tx_underflows, 1)
+
+    def test_rx_fifo_overflow(self):
+        self.cc1101.configurator.set_packet_length(100)
+        self.cc1101.set_configuration()
+        self.driver.chip.inject(bytes([100] + list(range(100))), delay=0.001)
+        self.cc1101.set_receive_mode()
+        self.driver.wait_for_edge(23, 32, timeout=1000)
+        self.assertEqual(self.driver.chip.rx_overflows, 1)
+        self.assertEqual(self.cc1101.get_marc_state(), addr.MARCSTATE_RXFIFO_OVERFLOW)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import random
+import sys
+import os
+sys.path.append(os.path.abspath('src/epCC1101'))
+from epCC1101 import manchester
+from epCC1101.bits import PackedBits
+from epCC1101.packet import NormalRxPacket, SyncRxPacket
+
+def reference_decode(data, bit_offset=0):
+    # bit by bit, like the KIA EV6 example did (01 -> 0, 10 -> 1)
+    raw = "".join(f"{x:08b}" for x in data)[bit_offset:]
+    count = len(raw) // 16
+    bits, errors = "", ""
+    for i in range(0, count * 16, 2):
+        bits += raw[i]
+        errors += "1" if raw[i] == raw[i + 1] else "0"
+    to_bytes = lambda s: bytes(int(s[i:i+8], 2) for i in range(0, len(s), 8))
+    return to_bytes(bits), to_bytes(errors)
+
+class TestManchester(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(1)
+        self.data = bytes(self.random.randrange(256) for _ in range(64))
+
+    def test_encode(self):
+        self.assertEqual(manchester.encode(b"\x5a"), b"\x66\x99")
+        self.assertEqual(manchester.encode([0x5a], inverted=True), b"\x99\x66")
+        self.assertEqual(len(manchester.encode(self.data)), 128)
+
+    def test_round_trip(self):
+        for inverted in [False, True]:
+            raw = manchester.encode(self.data, inverted)
+            decoded, errors = manchester.decode_with_errors(memoryview(raw), inverted=inverted)
+            self.assertEqual(decoded, self.data)
+            self.assertEqual(manchester.count_errors(errors), 0)
+
+    def test_matches_reference(self):
+        raw = bytes(self.random.randrange(256) for _ in range(24))
+        for bit_offset in range(17):
+            self.assertEqual(manchester.decode_with_errors(raw, bit_offset), reference_decode(raw, bit_offset))
+
+    def test_error_mask(self):
+        raw = bytearray(manchester.encode(b"\x00\xff"))
+        raw[0] = 0b00011111  # symbols 00 01 11 11
+        decoded, errors = manchester.decode_with_errors(raw)
+        self.assertEqual(decoded, b"\x30\xff")
+        self.assertEqual(errors, b"\xb0\x00")
+        self.assertEqual(manchester.count_errors(errors), 3)
+
+    def test_bit_offset(self):
+        bits = PackedBits.from_bits("1" + manchester_str(b"\x12\x34") + "101")
+        self.assertEqual(manchester.align(bits), 1)
+        self.assertEqual(manchester.decode(bits, 1), b"\x12\x34")
+        self.assertEqual(manchester.decode(bits.data, 1), b"\x12\x34")
+        self.assertEqual(manchester.decode(b"\x66"), b"")
+
+    def test_packets(self):
+        raw = manchester.encode(b"\xab\xcd")
+        packet = NormalRxPacket(raw, len(raw), 0, 0, 1, timestamp=0)
+        self.assertEqual(packet.manchester_decode(), (b"\xab\xcd", b"\x00\x00"))
+        packet = SyncRxPacket("0" + manchester_str(b"\xab\xcd"), timestamp=0)
+        self.assertEqual(packet.manchester_decode(), (b"\xab\xcd", b"\x00\x00"))
+
+def manchester_str(data):
+    return "".join(f"{x:016b}" for x in map(lambda x: int.from_bytes(manchester.encode([x]), "big"), data))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from unittest import mock
+import array
+import random
+import sys
+import os
+sys.path.append(os.path.abspath('src/epCC1101'))
+from epCC1101 import packet
+from epCC1101.packet import AsyncRxPacket, AsyncTxPacket, Princeton25bit_Protocol
+from epCC1101.bits import PackedBits
+
+class TestAsyncRxPacket(unittest.TestCase):
+    def test_edges_from_arrays(self):
+        # arrays like the buffers of a capture, edge times in nanoseconds
+        levels = array.array("B", [1, 0, 1])
+        timestamps_ns = array.array("Q", [5_000_000, 5_250_000, 6_000_000])
+        packet = AsyncRxPacket(levels=memoryview(levels), timestamps_ns=memoryview(timestamps_ns), start_ns=5_000_000, timestamp=0)
+        self.assertEqual(packet.edges, [(1, 0.0), (0, 0.00025), (1, 0.001)])
+
+    def test_edges_from_tuples(self):
+        packet = AsyncRxPacket(edges=[(1, 0.0), (0, 0.00025)], timestamp=0)
+        self.assertEqual(packet.edges, [(1, 0.0), (0, 0.00025)])
+
+class TestAsyncTxPacket(unittest.TestCase):
+    def test_edge_list(self):
+        self.assertTrue(AsyncTxPacket([(1, 0.00036), (0, 0.00108)]).is_edge_list())
+        self.assertFalse(AsyncTxPacket([0x55, 0xAA]).is_edge_list())
+        self.assertFalse(AsyncTxPacket([]).is_edge_list())
+
+class TestPrinceton25bitProtocol(unittest.TestCase):
+    def setUp(self):
+        self.protocol = Princeton25bit_Protocol()
+        rng = random.Random(1)
+        self.values = []
+        self.bitstreams = []
+        for _ in range(50):
+            values = {"address": rng.randrange(4096), "data": rng.randrange(256)}
+            noise = [0x00] * rng.randrange(3)
+            self.values.append(values)
+            self.bitstreams.append(PackedBits(bytes(noise + self.protocol.get_physical_bytes(values))))
+        # not a packet
+        self.values.append(None)
+        self.bitstreams.append(PackedBits(bytes(8)))
+
+    def test_parse_many(self):
+        self.assertEqual(self.protocol.parse_many(self.bitstreams), self.values)
+        self.assertEqual(self.protocol.parse_many([list(bits) for bits in self.bitstreams]), self.values)
+        self.assertEqual(self.protocol.parse_many([]), [])
+
+    def test_parse_many_without_numpy(self):
+        with mock.patch.object(packet, "numpy", None):
+            self.assertEqual(self.protocol.parse_many(self.bitstreams), self.values)
+
+    def test_parse(self):
+        self.assertEqual(self.protocol.parse(self.bitstreams[0]), self.values[0])
+        self.assertEqual(len(self.protocol._logical_bits), 25)
+        self.assertIsNone(self.protocol.parse(self.bitstreams[-1]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+from unittest import mock
+import sys
+import os
+sys.path.append(os.path.abspath('src/epCC1101'))
+from epCC1101 import Cc1101, addresses as addr
+from epCC1101.stubs import spidev
+import epCC1101.rpi_driver as rpi_driver
+from epCC1101.tracing import Tracer
+
+class TestSpidevEmulator(unittest.TestCase):
+    def setUp(self):
+        with mock.patch.object(rpi_driver, "spidev", spidev):
+            self.driver = rpi_driver.Driver(spi_bus=0, cs_pin=0, gdo0=23)
+        self.spi = self.driver.spi
+        self.chip = self.spi.chip
+        self.cc1101 = Cc1101(driver=self.driver)
+
+    def test_chip_id(self):
+        self.assertEqual(self.cc1101.get_chip_partnum(), 0x00)
+        self.assertEqual(self.cc1101.get_chip_version(), 0x14)
+
+    def test_single_and_burst_access(self):
+        self.driver.write_burst(addr.SYNC1, [0x12, 0x34])
+        self.assertEqual(self.driver.read_byte(addr.SYNC1), 0x12)
+        self.assertEqual(self.driver.read_burst(addr.SYNC1, 2), [0x12, 0x34])
+        # single read with burst bit on a status register address
+        self.assertEqual(self.driver.read_status_register(addr.MARCSTATE), addr.MARCSTATE_IDLE)
+
+    def test_status_byte(self):
+        self.driver.write_burst(addr.TXFIFO, [1, 2, 3])
+        # header status on write reports free TX bytes, saturating at 15
+        self.assertEqual(self.spi.xfer2([addr.SNOP])[0] & 0x0F, 0x0F)
+        self.assertEqual(self.driver.read_status_register(addr.TXBYTES), 3)
+        self.spi.xfer2([addr.SRX])
+        self.assertEqual(self.spi.xfer2([addr.SNOP | addr.SPI_READ_MASK])[0] & 0x70, 0x10)
+
+    def test_last_status(self):
+        self.driver.write_burst(addr.TXFIFO, list(range(60)))
+        # free space before the last byte was written
+        self.assertEqual(self.driver.chip_status.fifo_bytes, 5)
+        self.assertEqual(self.driver.command_strobe(addr.SRX) & addr.STATUS_STATE_MASK, 0x00)
+        self.assertEqual(self.driver.read_chip_status(read=True).state, addr.STATUS_STATE_RX)
+
+    def test_configuration_roundtrip(self):
+        self.cc1101.configurator.set_data_rate_baud(4800)
+        self.cc1101.configurator.set_patable([0x00, 0xC0, 0, 0, 0, 0, 0, 0])
+        self.cc1101.set_configuration(force=True)
+        self.assertEqual(self.chip.configurator.get_data_rate_baud(), self.cc1101.configurator.get_data_rate_baud())
+        self.assertEqual(self.chip.patable, [0x00, 0xC0, 0, 0, 0, 0, 0, 0])
+        self.cc1101.get_configuration()
+        self.assertEqual(self.cc1101.configurator._registers, self.chip.registers)
+
+    def test_empty_transaction(self):
+        self.driver.command_strobe(addr.SNOP)
+        status = self.driver.last_status
+        with self.driver.transaction() as transaction:
+            pass
+        self.assertEqual(transaction.results, [])
+        self.assertEqual(transaction.execute(), [])
+        self.assertEqual(self.driver.last_status, status)
+
+    def test_byte_count(self):
+        self.spi.reset_counters()
+        self.cc1101.set_configuration(force=True)
+        self.assertEqual(self.spi.transactions, 2)
+        self.assertEqual(self.spi.bytes, 1 + 0x2F + 1 + 8)
+
+    def test_tracing(self):
+        self.driver.tracer = Tracer()
+        self.driver.command_strobe(addr.SIDLE)
+        self.driver.read_byte(addr.SYNC1)
+        self.driver.execute_transaction([("command_strobe", (addr.SNOP,)), ("read_byte", (addr.SYNC0,))])
+        events = self.driver.tracer.dump()
+        self.assertEqual([event.register for event in events], [addr.SIDLE, addr.SYNC1 | addr.SPI_READ_MASK, addr.SNOP])
+        self.assertEqual(events[1].tx, bytes([addr.SYNC1 | addr.SPI_READ_MASK, 0]))
+        self.assertEqual(events[2].tx, bytes([addr.SNOP, addr.SYNC0 | addr.SPI_READ_MASK, 0]))
+
+    def test_write_back(self):
+        frame = [addr.SYNC1 | addr.SPI_READ_MASK, 0]
+        response = self.spi.xfer2(frame)
+        self.assertIs(response, frame)
+        self.assertEqual(frame[1], self.chip.registers[addr.SYNC1])
+        self.assertIsInstance(self.spi.xfer2(bytes([addr.SNOP])), list)
+
+    def test_patable_wraps(self):
+        self.driver.write_burst(addr.PATABLE, list(range(1, 11)))
+        self.assertEqual(self.chip.patable, [9, 10, 3, 4, 5, 6, 7, 8])
+
+    def test_capture_sessions_released(self):
+        with mock.patch.object(rpi_driver, "CaptureSession") as CaptureSession, \
+                mock.patch.object(rpi_driver, "BackgroundCapture"):
+            session = CaptureSession.return_value
+            self.driver.asynchronous_serial_read(26, 25, 100)
+            self.driver.asynchronous_serial_read(26, 25, 100)
+            self.assertEqual(CaptureSession.call_count, 1)
+            # the background capture claims the same pins
+            self.driver.start_background_capture(26, 25)
+            session.close.assert_called_once()
+            self.driver.asynchronous_serial_read(26, 25, 100)
+            self.assertEqual(CaptureSession.call_count, 2)
+            self.driver.set_pin_mode(25, 0)
+            self.assertEqual(session.close.call_count, 2)
+            self.driver.set_pin_mode(25, 0)
+            self.assertEqual(session.close.call_count, 2)
+
+class BytesSpiDevice:
+    """SpiDevice of the Rust backend on the emulator, reads return bytes like pyo3."""
+    def __init__(self, spi_bus, cs_pin, spi_speed_hz):
+        self.spi = spidev.SpiDev()
+        self.spi.open(spi_bus, cs_pin)
+
+    def read_byte(self, register):
+        return self.spi.xfer2([register | addr.SPI_READ_MASK, 0])[1]
+
+    def read_status_register(self, register):
+        return self.spi.xfer2([register | addr.SPI_READ_BURST_MASK, 0])[1]
+
+    def read_burst(self, register, length):
+        return bytes(self.spi.xfer2([register | addr.SPI_READ_BURST_MASK] + [0]*length)[1:])
+
+    def command_strobe(self, register):
+        return self.spi.xfer2([register])[0]
+
+    def write_burst(self, register, data):
+        return self.spi.xfer2([register | addr.SPI_WRITE_BURST_MASK] + list(data))[-1]
+
+    def xfer2_batch(self, frames):
+        return [bytes(self.spi.xfer2(list(frame))) for frame in frames]
+
+class TestRustDriverEmulator(unittest.TestCase):
+    def setUp(self):
+        with mock.patch.object(rpi_driver, "SpiDevice", BytesSpiDevice):
+            self.driver = rpi_driver.RustDriver(spi_bus=0, cs_pin=0, gdo0=23)
+        self.cc1101 = Cc1101(driver=self.driver)
+
+    def test_get_configuration_then_set(self):
+        self.cc1101.get_configuration()
+        self.cc1101.configurator.set_data_rate_baud(4800)
+        self.cc1101.configurator.set_patable([0x00, 0xC0, 0, 0, 0, 0, 0, 0])
+        self.cc1101.set_configuration()
+        self.assertEqual(self.driver.spi.spi.chip.configurator.get_data_rate_baud(), self.cc1101.configurator.get_data_rate_baud())
+
+    def test_empty_transaction(self):
+        self.driver.command_strobe(addr.SNOP)
+        status = self.driver.last_status
+        self.assertEqual(self.driver.execute_transaction([]), [])
+        self.assertEqual(self.driver.last_status, status)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import sys
+import os
+import io
+import json
+sys.path.append(os.path.abspath('src/epCC1101'))
+from epCC1101.tracing import Tracer, TRACE_SPI, TRACE_STATE
+
+class TestTracer(unittest.TestCase):
+    def test_record(self):
+        tracer = Tracer(size=4)
+        tracer.record(TRACE_SPI, 0xFB, [0xFB, 0x00], [0x0F, 0x03])
+        events = tracer.dump()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].kind, TRACE_SPI)
+        self.assertEqual(events[0].register, 0xFB)
+        self.assertEqual(events[0].tx, bytes([0xFB, 0x00]))
+        self.assertEqual(events[0].rx, bytes([0x0F, 0x03]))
+
+    def test_ring_buffer(self):
+        tracer = Tracer(size=3)
+        for i in range(5):
+            tracer.record(TRACE_STATE, info=str(i))
+        events = tracer.dump()
+        self.assertEqual(len(tracer), 3)
+        self.assertEqual([event.info for event in events], ["2", "3", "4"])
+        timestamps = [event.timestamp_ns for event in events]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_clear(self):
+        tracer = Tracer(size=3)
+        tracer.record(TRACE_STATE, info="idle")
+        tracer.clear()
+        self.assertEqual(tracer.dump(), [])
+
+    def test_export(self):
+        tracer = Tracer(size=3)
+        tracer.record(TRACE_SPI, 0x3F, b"\x3f\x01", b"\x0f\x00")
+        fp = io.StringIO()
+        tracer.export(fp)
+        event = json.loads(fp.getvalue().splitlines()[0])
+        self.assertEqual(event["kind"], TRACE_SPI)
+        self.assertEqual(event["tx"], "3f01")
+
+if __name__ == '__main__':
+    unittest.main()
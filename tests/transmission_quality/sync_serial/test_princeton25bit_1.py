@@ -46,20 +46,18 @@ def tansmitter_func():
 
 
 def receiver_func():
-    global done
     packets = []
-    while not done:
-        try:
-            logger.info("Waiting for Packet...")
-            packet = cc1101_receiver.receive(timeout_ms=10000, max_same_bits=4)
+    logger.info("Waiting for Packets...")
+    # captured in the background, repeats sent while a packet is parsed are not lost
+    try:
+        for packet in cc1101_receiver.receive_bursts(timeout_ms=10000, max_same_bits=4):
             logical_values = protocol.parse(packet.get_bitstream())
             if logical_values:
                 logger.info(f"Address: {logical_values['address']:06x}, Data: {logical_values['data']:02x}")
                 packets.append(logical_values)
             logger.info(packet)
-        except Exception as e:
-            logger.error(f"Error: {e}")
-            break
+    except Exception as e:
+        logger.error(f"Error: {e}")
 
     logger.info(f"Received {len(packets)} packets.")
     packet_numbers = {}